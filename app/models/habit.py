@@ -4,7 +4,7 @@ Habit model for the Personal Productivity Dashboard.
 Linked to the existing UserModel via user_id.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Date, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from models.base import BaseModel
@@ -14,11 +14,28 @@ from models.user import UserModel
 class Habit(BaseModel):
     __tablename__ = "habits"
 
+    __table_args__ = (
+        Index("ix_habits_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_habits_user_id_change_seq", "user_id", "change_seq", "id"),
+    )
+
     # Inherits id, created_at, updated_at from BaseModel
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
 
+    # Maintained on each check-in (app/services/checkins.py), so listing
+    # habits with their streaks never reads the check-in history.
+    # current_streak is the run of consecutive days ending at last_checkin_date.
+    current_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    longest_streak = Column(Integer, nullable=False, default=0, server_default="0")
+    total_checkins = Column(Integer, nullable=False, default=0, server_default="0")
+    last_checkin_date = Column(Date, nullable=True)
+
+    # Version of the habit list (app/services/etags.py) when this row was last
+    # written; GET /sync returns the rows above the client's last version
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Optional relationship back to the user
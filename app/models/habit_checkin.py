@@ -0,0 +1,24 @@
+"""
+HabitCheckin model: one row per day a habit was done.
+
+The streak columns on Habit are derived from these rows and kept in step by
+app/services/checkins.py.
+"""
+
+from sqlalchemy import Column, Date, ForeignKey, Integer, UniqueConstraint
+
+from models.base import BaseModel
+from models.user import UserModel  # noqa: F401  (users table for the foreign key)
+from app.models.habit import Habit  # noqa: F401  (habits table for the foreign key)
+
+
+class HabitCheckin(BaseModel):
+    __tablename__ = "habit_checkins"
+
+    # Also the index for the streak walks: (habit_id, date) in date order
+    __table_args__ = (UniqueConstraint("habit_id", "date", name="uq_habit_checkins_habit_id_date"),)
+
+    # Inherits id, created_at, updated_at from BaseModel
+    habit_id = Column(Integer, ForeignKey("habits.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    date = Column(Date, nullable=False)
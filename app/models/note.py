@@ -4,24 +4,102 @@ Note model for the Personal Productivity Dashboard.
 Linked to the existing UserModel via user_id.
 """
 
-from sqlalchemy import Column, Integer, String, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import DDL, Column, Integer, String, ForeignKey, Index, event, text
+from sqlalchemy.orm import deferred, relationship
 
 from models.base import BaseModel
 from models.user import UserModel
 
 
+# Characters of the content kept in `preview` for the note list
+PREVIEW_LENGTH = 200
+
+
+def _summary(content: str | None) -> dict:
+    return {
+        "preview": content[:PREVIEW_LENGTH] if content is not None else None,
+        "content_length": len(content) if content is not None else 0,
+    }
+
+
+def _preview(context):
+    return _summary(context.get_current_parameters().get("content"))["preview"]
+
+
+def _content_length(context):
+    return _summary(context.get_current_parameters().get("content"))["content_length"]
+
+
 class Note(BaseModel):
     __tablename__ = "notes"
 
+    __table_args__ = (
+        Index("ix_notes_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_notes_user_id_change_seq", "user_id", "change_seq", "id"),
+    )
+
     # Inherits id, created_at, updated_at from BaseModel
     title = Column(String, nullable=False)
-    content = Column(String, nullable=True)
+    # Bodies can be hundreds of KB: not loaded with the object unless asked
+    # for (load_only / undefer); the note list only reads the two columns after it
+    content = deferred(Column(String, nullable=True))
+
+    # Derived from `content`: on insert by these defaults, on update by
+    # `update_values`, which every UPDATE of notes must go through (an
+    # onupdate default would also fire, with no content, on title-only updates)
+    preview = Column(String, nullable=True, default=_preview)
+    content_length = Column(Integer, nullable=False, default=_content_length, server_default="0")
+
+    # Version of the note list (app/services/etags.py) when this row was last
+    # written; GET /sync returns the rows above the client's last version
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Optional relationship back to the user
     user = relationship(UserModel, backref="notes")
 
+    @staticmethod
+    def update_values(values: dict) -> dict:
+        """
+        `values` for an UPDATE, plus preview and content_length if they set content.
+        """
+        if "content" not in values:
+            return values
+        return {**values, **_summary(values["content"])}
+
+
+# Full-text index for GET /notes/search (app/services/note_search.py). It lives
+# only in the database and is maintained there on every write, whichever code
+# path runs it: an external-content FTS5 table plus triggers on SQLite, a
+# generated tsvector column with a GIN index on Postgres (12+).
+# migrations/versions/0004_note_search.py creates the same objects.
+SQLITE_SEARCH_DDL = (
+    "CREATE VIRTUAL TABLE notes_fts USING fts5("
+    "title, content, content='notes', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN "
+    "INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+)
 
+POSTGRES_SEARCH_DDL = (
+    "ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    "CREATE INDEX ix_notes_search_vector ON notes USING GIN (search_vector)",
+)
 
+for statement in SQLITE_SEARCH_DDL:
+    event.listen(Note.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_SEARCH_DDL:
+    event.listen(Note.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(
+    Note.__table__, "before_drop", DDL("DROP TABLE IF EXISTS notes_fts").execute_if(dialect="sqlite")
+)
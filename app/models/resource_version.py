@@ -0,0 +1,24 @@
+"""
+Per-user version counter for each list resource (tasks, habits, notes).
+
+Every create/update/delete bumps the user's counter for that resource in the
+same transaction, so a list response can be identified by (user, resource,
+version, query) without reading the rows themselves. See app/services/etags.py.
+
+`purged_seq` is the highest change_seq of the user's tombstones for that
+resource that were purged (see `purge_tombstones` in app/services/sync.py).
+"""
+
+from sqlalchemy import Column, ForeignKey, Integer, String
+
+from models.base import Base
+from models.user import UserModel  # noqa: F401  (users table for the foreign key)
+
+
+class ResourceVersion(Base):
+    __tablename__ = "resource_versions"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    resource = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    purged_seq = Column(Integer, nullable=False, default=0, server_default="0")
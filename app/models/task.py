@@ -4,7 +4,7 @@ Task model for the Personal Productivity Dashboard.
 Linked to the existing UserModel via user_id.
 """
 
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, Index
 from sqlalchemy.orm import relationship
 
 from models.base import BaseModel
@@ -14,11 +14,22 @@ from models.user import UserModel
 class Task(BaseModel):
     __tablename__ = "tasks"
 
+    __table_args__ = (
+        # Serves the per-user keyset pagination in GET /tasks/ and the
+        # user_id lookups in update/delete.
+        Index("ix_tasks_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_tasks_user_id_change_seq", "user_id", "change_seq", "id"),
+    )
+
     # Inherits id, created_at, updated_at from BaseModel
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
     is_completed = Column(Boolean, default=False)
 
+    # Version of the task list (app/services/etags.py) when this row was last
+    # written; GET /sync returns the rows above the client's last version
+    change_seq = Column(Integer, nullable=False, default=0, server_default="0")
+
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     # Optional relationship back to the user (not strictly required for CRUD, but helpful)
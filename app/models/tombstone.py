@@ -0,0 +1,54 @@
+"""
+Tombstone model: a record that a task, habit or note was deleted.
+
+Deletes remove the row itself, so GET /sync could not tell a client which
+items are gone. Every delete leaves a tombstone with the list version of the
+delete (see `change_seq` on the Task, Habit and Note models). Tombstones
+older than SYNC_TOMBSTONE_RETENTION_DAYS are purged by purge_tombstones.py.
+"""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+
+from models.base import Base
+from models.user import UserModel  # noqa: F401  (users table for the foreign key)
+
+
+class utc_now(FunctionElement):
+    """
+    The database's current time in UTC, without time zone. `func.now()` is
+    in the server's time zone on Postgres, which need not be UTC.
+    """
+
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utc_now)
+def _utc_now(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is UTC
+    return "CURRENT_TIMESTAMP"
+
+
+@compiles(utc_now, "postgresql")
+def _utc_now_postgresql(element, compiler, **kw):
+    return "timezone('utc', now())"
+
+
+class Tombstone(Base):
+    __tablename__ = "tombstones"
+
+    __table_args__ = (
+        Index("ix_tombstones_user_id_resource_change_seq", "user_id", "resource", "change_seq", "item_id"),
+        Index("ix_tombstones_deleted_at", "deleted_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    # Table name of the deleted item: tasks, habits or notes
+    resource = Column(String, nullable=False)
+    item_id = Column(Integer, nullable=False)
+    change_seq = Column(Integer, nullable=False)
+    # UTC; compared with utc_now() by purge_tombstones
+    deleted_at = Column(DateTime, default=utc_now())
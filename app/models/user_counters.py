@@ -0,0 +1,23 @@
+"""
+Per-user counts shown in the dashboard header (GET /dashboard/summary).
+
+Kept up to date by every task, habit and note write in the same transaction
+(app/services/counters.py), so reading them is a primary-key lookup.
+`reconcile_counters.py` rebuilds them from the tables if they ever drift.
+"""
+
+from sqlalchemy import Column, ForeignKey, Integer
+
+from models.base import Base
+from models.user import UserModel  # noqa: F401  (users table for the foreign key)
+
+
+class UserCounters(Base):
+    __tablename__ = "user_counters"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    open_tasks = Column(Integer, nullable=False, default=0)
+    completed_tasks = Column(Integer, nullable=False, default=0)
+    active_habits = Column(Integer, nullable=False, default=0)
+    inactive_habits = Column(Integer, nullable=False, default=0)
+    notes = Column(Integer, nullable=False, default=0)
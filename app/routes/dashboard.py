@@ -0,0 +1,28 @@
+"""
+Dashboard routes for the Personal Productivity Dashboard.
+
+Protected by the existing JWT `get_current_user` dependency.
+"""
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from dependencies.get_current_user import get_current_user
+from app.schemas.dashboard import DashboardSummary
+from app.services.counters import read_counters
+from app.services.user_cache import CurrentUser
+
+router = APIRouter(prefix="/dashboard", tags=["dashboard"])
+
+
+@router.get("/summary", response_model=DashboardSummary)
+async def dashboard_summary(
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Open/completed tasks, active/inactive habits and notes of the logged-in
+    user, read from the counters every write keeps up to date.
+    """
+    return await read_counters(db, current_user.id)
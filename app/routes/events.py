@@ -0,0 +1,34 @@
+"""
+Event stream route for the Personal Productivity Dashboard.
+
+Authenticated with the same JWT as every other route.
+"""
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+from fastapi.security import HTTPAuthorizationCredentials
+
+from database import session_scope
+from dependencies.get_current_user import security, user_from_token
+from app.services.events import event_hub
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/events")
+async def events(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Server-Sent Events stream of the logged-in user's task, habit and note
+    changes, one `data:` line per committed write. Fetch the changes with
+    GET /sync; on a `reconnect` event, reconnect and sync.
+    """
+    # Its own short session: a request-scoped one would stay open (and hold
+    # a pooled connection) for as long as the stream runs
+    async with session_scope() as db:
+        current_user = await user_from_token(credentials.credentials, db)
+
+    return StreamingResponse(
+        event_hub.stream(current_user.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
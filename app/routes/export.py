@@ -0,0 +1,31 @@
+"""
+Export route for the Personal Productivity Dashboard.
+
+Protected by the existing JWT `get_current_user` dependency.
+"""
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+
+from dependencies.get_current_user import get_current_user
+from app.services.export import stream_export
+from app.services.user_cache import CurrentUser
+
+router = APIRouter(tags=["export"])
+
+
+@router.get("/export")
+async def export_everything(
+    compress: bool = Query(False, description="gzip the download"),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Download all tasks, habits and notes of the logged-in user as NDJSON,
+    one `{"type": ..., "data": ...}` object per line, streamed as it is read.
+    """
+    filename = "export.ndjson.gz" if compress else "export.ndjson"
+    return StreamingResponse(
+        stream_export(current_user.id, compress=compress),
+        media_type="application/gzip" if compress else "application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
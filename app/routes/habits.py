@@ -4,68 +4,124 @@ Habit routes (CRUD) for the Personal Productivity Dashboard.
 All routes are protected using the existing JWT `get_current_user` dependency.
 """
 
-from typing import List
+from datetime import date, datetime, timezone
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from dependencies.get_current_user import get_current_user
-from models.user import UserModel
 from app.models.habit import Habit
-from app.schemas.habit import HabitCreate, HabitRead
+from app.schemas.habit import (
+    HabitBatchRequest,
+    HabitBatchResponse,
+    HabitCheckinCreate,
+    HabitCreate,
+    HabitPage,
+    HabitRead,
+)
+from app.services.batch import run_batch
+from app.services.checkins import check_in, delete_checkins, undo_check_in
+from app.services.counters import count_write
+from app.services.etags import bump_version, etag_matches, etag_response, list_etag, not_modified
+from app.services.events import publish_change
+from app.services.fieldsets import FIELDS_DESCRIPTION, only_fields, page_schema_for, parse_fields
+from app.services.pagination import paginate
+from app.services.response_cache import response_cache
+from app.services.serialization import dump_page
+from app.services.sync import record_deletes
+from app.services.user_cache import CurrentUser
+from app.services.writes import delete_returning, insert_returning, update_returning
+from config.environment import default_page_size
 
 router = APIRouter(prefix="/habits", tags=["habits"])
 
 
 @router.post("/", response_model=HabitRead, status_code=status.HTTP_201_CREATED)
-def create_habit(
+async def create_habit(
     habit_in: HabitCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Create a new habit for the logged-in user.
     """
-    habit = Habit(
-        title=habit_in.title,
-        description=habit_in.description,
-        is_active=habit_in.is_active,
-        user_id=current_user.id,
-    )
-
-    db.add(habit)
-    db.commit()
-    db.refresh(habit)
+    change_seq = await bump_version(db, current_user.id, Habit)
+    values = {**habit_in.model_dump(), "user_id": current_user.id, "change_seq": change_seq}
+    await count_write(db, current_user.id, Habit, values=values)
+    habit = await insert_returning(db, Habit, values)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Habit)
+    await publish_change(current_user.id, Habit, change_seq, created=[habit["id"]])
 
     return habit
 
 
-@router.get("/", response_model=List[HabitRead])
-def get_my_habits(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+@router.post("/batch", response_model=HabitBatchResponse)
+async def batch_habits(
+    batch: HabitBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Get all habits that belong to the logged-in user.
+    Create, update and delete many habits of the logged-in user in one
+    transaction. Each operation gets its own result (status, id and item).
     """
-    habits = db.query(Habit).filter(Habit.user_id == current_user.id).all()
-    return habits
+    results = await run_batch(
+        db, Habit, HabitRead, current_user.id, batch.operations, before_delete=delete_checkins
+    )
+    return {"results": results}
+
+
+@router.get("/", response_model=HabitPage)
+async def get_my_habits(
+    request: Request,
+    limit: int = Query(default_page_size, ge=1),
+    after: str | None = Query(None),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Get one page of the habits that belong to the logged-in user, oldest first.
+    `limit` is capped at the server's maximum page size; `fields` picks the
+    fields of each item (only those columns are loaded).
+    Send the ETag back in If-None-Match to get 304 while nothing has changed.
+    """
+    names = parse_fields(fields, HabitRead)
+    etag = await list_etag(db, request, current_user.id, Habit)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key(current_user.id, Habit, etag)
+    body = await response_cache.get(cache_key)
+    if body is None:
+        statement = only_fields(select(Habit).where(Habit.user_id == current_user.id), Habit, names)
+        habits, next_cursor = await paginate(db, statement, Habit, limit=limit, after=after)
+        body = dump_page(page_schema_for(HabitPage, names), habits, next_cursor)
+        await response_cache.set(current_user.id, Habit, cache_key, body)
+
+    return etag_response(body, etag)
 
 
 @router.put("/{habit_id}", response_model=HabitRead)
-def update_habit(
+async def update_habit(
     habit_id: int,
     habit_in: HabitCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Update an existing habit that belongs to the logged-in user.
     """
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id, Habit.user_id == current_user.id
-    ).first()
+    # Counters read the old row, so they go before the update. On a 404
+    # nothing is committed and the session rolls all three back.
+    change_seq = await bump_version(db, current_user.id, Habit)
+    await count_write(db, current_user.id, Habit, row_id=habit_id, values=habit_in.model_dump())
+    habit = await update_returning(
+        db, Habit, habit_id, current_user.id, {**habit_in.model_dump(), "change_seq": change_seq}
+    )
 
     if habit is None:
         raise HTTPException(
@@ -73,40 +129,66 @@ def update_habit(
             detail="Habit not found",
         )
 
-    habit.title = habit_in.title
-    habit.description = habit_in.description
-    habit.is_active = habit_in.is_active
-
-    db.commit()
-    db.refresh(habit)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Habit)
+    await publish_change(current_user.id, Habit, change_seq, updated=[habit_id])
 
     return habit
 
 
 @router.delete("/{habit_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_habit(
+async def delete_habit(
     habit_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Delete a habit that belongs to the logged-in user.
     """
-    habit = db.query(Habit).filter(
-        Habit.id == habit_id, Habit.user_id == current_user.id
-    ).first()
+    change_seq = await bump_version(db, current_user.id, Habit)
+    await count_write(db, current_user.id, Habit, row_id=habit_id)
+    await delete_checkins(db, current_user.id, [habit_id])
+    deleted = await delete_returning(db, Habit, habit_id, current_user.id)
 
-    if habit is None:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Habit not found",
         )
 
-    db.delete(habit)
-    db.commit()
+    await record_deletes(db, current_user.id, Habit, [habit_id], change_seq)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Habit)
+    await publish_change(current_user.id, Habit, change_seq, deleted=[habit_id])
 
     # No content to return for a successful delete
     return None
 
 
+@router.post("/{habit_id}/checkins", response_model=HabitRead)
+async def check_in_habit(
+    habit_id: int,
+    checkin: HabitCheckinCreate | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Mark a habit of the logged-in user as done on `day` (default: today, UTC)
+    and return it with its updated streaks. Checking in twice is a no-op.
+    """
+    day = checkin.day if checkin is not None and checkin.day is not None else datetime.now(timezone.utc).date()
+    return await check_in(db, current_user.id, habit_id, day)
 
+
+@router.delete("/{habit_id}/checkins/{day}", response_model=HabitRead)
+async def undo_habit_check_in(
+    habit_id: int,
+    day: date,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Undo the check-in of a habit on `day` (YYYY-MM-DD) and return the habit
+    with its updated streaks.
+    """
+    return await undo_check_in(db, current_user.id, habit_id, day)
@@ -0,0 +1,52 @@
+"""
+Import routes for the Personal Productivity Dashboard.
+
+Protected by the existing JWT `get_current_user` dependency.
+"""
+
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from dependencies.get_current_user import get_current_user
+from app.schemas.imports import ImportReport
+from app.services.importer import import_jobs, run_import
+from app.services.user_cache import CurrentUser
+
+router = APIRouter(tags=["import"])
+
+
+@router.post("/import", response_model=ImportReport)
+async def import_items(
+    request: Request,
+    record_type: Literal["task", "habit", "note"] | None = Query(
+        None, alias="type", description="type of every record, if the file has no type field"
+    ),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Import tasks, habits and notes from an NDJSON (default) or CSV
+    (`Content-Type: text/csv`) upload, gzipped or not. The body is processed
+    while it arrives; invalid lines are reported and skipped.
+    """
+    content_type = request.headers.get("content-type", "")
+    gzipped = (
+        request.headers.get("content-encoding", "").lower() == "gzip"
+        or content_type.startswith("application/gzip")
+    )
+    file_format = "csv" if content_type.startswith("text/csv") else "ndjson"
+
+    job = import_jobs.start(current_user.id, file_format)
+    await run_import(db, job, request.stream(), gzipped=gzipped, default_type=record_type)
+    return job.report()
+
+
+@router.get("/import", response_model=list[ImportReport])
+async def my_imports(current_user: CurrentUser = Depends(get_current_user)):
+    """
+    Progress of the logged-in user's running and recent imports (this server process).
+    """
+    return [job.report() for job in import_jobs.for_user(current_user.id)]
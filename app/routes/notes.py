@@ -4,67 +4,162 @@ Note routes (CRUD) for the Personal Productivity Dashboard.
 All routes are protected using the existing JWT `get_current_user` dependency.
 """
 
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from dependencies.get_current_user import get_current_user
-from models.user import UserModel
 from app.models.note import Note
-from app.schemas.note import NoteCreate, NoteRead
+from app.schemas.note import (
+    NoteBatchRequest,
+    NoteBatchResponse,
+    NoteCreate,
+    NotePage,
+    NoteRead,
+    NoteSearchPage,
+    NoteSummary,
+)
+from app.services.batch import run_batch
+from app.services.counters import count_write
+from app.services.etags import bump_version, etag_matches, etag_response, list_etag, not_modified
+from app.services.events import publish_change
+from app.services.fieldsets import FIELDS_DESCRIPTION, only_fields, page_schema_for, parse_fields
+from app.services.note_search import search_notes
+from app.services.pagination import paginate
+from app.services.response_cache import response_cache
+from app.services.serialization import dump_page
+from app.services.sync import record_deletes
+from app.services.user_cache import CurrentUser
+from app.services.writes import delete_returning, insert_returning, update_returning
+from config.environment import default_page_size
 
 router = APIRouter(prefix="/notes", tags=["notes"])
 
 
 @router.post("/", response_model=NoteRead, status_code=status.HTTP_201_CREATED)
-def create_note(
+async def create_note(
     note_in: NoteCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Create a new note for the logged-in user.
     """
-    note = Note(
-        title=note_in.title,
-        content=note_in.content,
-        user_id=current_user.id,
-    )
-
-    db.add(note)
-    db.commit()
-    db.refresh(note)
+    change_seq = await bump_version(db, current_user.id, Note)
+    values = {**note_in.model_dump(), "user_id": current_user.id, "change_seq": change_seq}
+    await count_write(db, current_user.id, Note, values=values)
+    note = await insert_returning(db, Note, values)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Note)
+    await publish_change(current_user.id, Note, change_seq, created=[note["id"]])
 
     return note
 
 
-@router.get("/", response_model=List[NoteRead])
-def get_my_notes(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+@router.post("/batch", response_model=NoteBatchResponse)
+async def batch_notes(
+    batch: NoteBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Create, update and delete many notes of the logged-in user in one
+    transaction. Each operation gets its own result (status, id and item).
+    """
+    results = await run_batch(db, Note, NoteRead, current_user.id, batch.operations)
+    return {"results": results}
+
+
+@router.get("/", response_model=NotePage)
+async def get_my_notes(
+    request: Request,
+    limit: int = Query(default_page_size, ge=1),
+    after: str | None = Query(None),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Get one page of the notes that belong to the logged-in user, oldest first,
+    as summaries without the content (GET /notes/{note_id} has it).
+    `limit` is capped at the server's maximum page size; `fields` picks the
+    fields of each item (only those columns are loaded).
+    Send the ETag back in If-None-Match to get 304 while nothing has changed.
+    """
+    names = parse_fields(fields, NoteSummary)
+    etag = await list_etag(db, request, current_user.id, Note)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key(current_user.id, Note, etag)
+    body = await response_cache.get(cache_key)
+    if body is None:
+        statement = only_fields(select(Note).where(Note.user_id == current_user.id), Note, names)
+        notes, next_cursor = await paginate(db, statement, Note, limit=limit, after=after)
+        body = dump_page(page_schema_for(NotePage, names), notes, next_cursor)
+        await response_cache.set(current_user.id, Note, cache_key, body)
+
+    return etag_response(body, etag)
+
+
+@router.get("/search", response_model=NoteSearchPage)
+async def search_my_notes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(default_page_size, ge=1),
+    after: str | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Get all notes that belong to the logged-in user.
+    Full-text search in the titles and contents of the logged-in user's notes,
+    best match first. Pass `next_cursor` back as `after` for the next page.
     """
-    notes = db.query(Note).filter(Note.user_id == current_user.id).all()
-    return notes
+    hits, next_cursor = await search_notes(db, current_user.id, q, limit=limit, after=after)
+    return {"items": hits, "next_cursor": next_cursor}
+
+
+@router.get("/{note_id}", response_model=NoteRead)
+async def get_note(
+    note_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Get one note of the logged-in user, with its full content.
+    """
+    note = (
+        await db.execute(
+            select(*Note.__table__.c).where(Note.id == note_id, Note.user_id == current_user.id)
+        )
+    ).mappings().one_or_none()
+
+    if note is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Note not found",
+        )
+
+    return note
 
 
 @router.put("/{note_id}", response_model=NoteRead)
-def update_note(
+async def update_note(
     note_id: int,
     note_in: NoteCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Update an existing note that belongs to the logged-in user.
     """
-    note = db.query(Note).filter(
-        Note.id == note_id, Note.user_id == current_user.id
-    ).first()
+    # Counters read the old row, so they go before the update. On a 404
+    # nothing is committed and the session rolls all three back.
+    change_seq = await bump_version(db, current_user.id, Note)
+    await count_write(db, current_user.id, Note, row_id=note_id, values=note_in.model_dump())
+    note = await update_returning(
+        db, Note, note_id, current_user.id, {**note_in.model_dump(), "change_seq": change_seq}
+    )
 
     if note is None:
         raise HTTPException(
@@ -72,36 +167,36 @@ def update_note(
             detail="Note not found",
         )
 
-    note.title = note_in.title
-    note.content = note_in.content
-
-    db.commit()
-    db.refresh(note)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Note)
+    await publish_change(current_user.id, Note, change_seq, updated=[note_id])
 
     return note
 
 
 @router.delete("/{note_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_note(
+async def delete_note(
     note_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Delete a note that belongs to the logged-in user.
     """
-    note = db.query(Note).filter(
-        Note.id == note_id, Note.user_id == current_user.id
-    ).first()
+    change_seq = await bump_version(db, current_user.id, Note)
+    await count_write(db, current_user.id, Note, row_id=note_id)
+    deleted = await delete_returning(db, Note, note_id, current_user.id)
 
-    if note is None:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Note not found",
         )
 
-    db.delete(note)
-    db.commit()
+    await record_deletes(db, current_user.id, Note, [note_id], change_seq)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Note)
+    await publish_change(current_user.id, Note, change_seq, deleted=[note_id])
 
     # No content to return for a successful delete
     return None
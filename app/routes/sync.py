@@ -0,0 +1,33 @@
+"""
+Sync route for the Personal Productivity Dashboard.
+
+Protected by the existing JWT `get_current_user` dependency.
+"""
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_db
+from dependencies.get_current_user import get_current_user
+from app.schemas.sync import SyncResponse
+from app.services.serialization import dump_json
+from app.services.sync import sync_changes
+from app.services.user_cache import CurrentUser
+from config.environment import sync_page_size
+
+router = APIRouter(tags=["sync"])
+
+
+@router.get("/sync", response_model=SyncResponse)
+async def sync(
+    since: str | None = Query(None, description="next_token of the previous sync; omit for a full sync"),
+    limit: int = Query(sync_page_size, ge=1, le=sync_page_size),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Tasks, habits and notes of the logged-in user created, updated or deleted
+    since `since`, and the token to pass next time.
+    """
+    changes = await sync_changes(db, current_user.id, since, limit)
+    return Response(dump_json(SyncResponse, changes), media_type="application/json")
@@ -4,68 +4,118 @@ Task routes (CRUD) for the Personal Productivity Dashboard.
 All routes are protected using the existing JWT `get_current_user` dependency.
 """
 
-from typing import List
-
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from database import get_db
 from dependencies.get_current_user import get_current_user
-from models.user import UserModel
 from app.models.task import Task
-from app.schemas.task import TaskCreate, TaskRead
+from app.schemas.task import (
+    TaskBatchRequest,
+    TaskBatchResponse,
+    TaskCreate,
+    TaskPage,
+    TaskRead,
+)
+from app.services.batch import run_batch
+from app.services.counters import count_write
+from app.services.etags import bump_version, etag_matches, etag_response, list_etag, not_modified
+from app.services.events import publish_change
+from app.services.fieldsets import FIELDS_DESCRIPTION, only_fields, page_schema_for, parse_fields
+from app.services.pagination import paginate
+from app.services.response_cache import response_cache
+from app.services.serialization import dump_page
+from app.services.sync import record_deletes
+from app.services.user_cache import CurrentUser
+from app.services.writes import delete_returning, insert_returning, update_returning
+from config.environment import default_page_size
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
 @router.post("/", response_model=TaskRead, status_code=status.HTTP_201_CREATED)
-def create_task(
+async def create_task(
     task_in: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Create a new task for the logged-in user.
     """
-    task = Task(
-        title=task_in.title,
-        description=task_in.description,
-        is_completed=task_in.is_completed,
-        user_id=current_user.id,
-    )
-
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+    change_seq = await bump_version(db, current_user.id, Task)
+    values = {**task_in.model_dump(), "user_id": current_user.id, "change_seq": change_seq}
+    await count_write(db, current_user.id, Task, values=values)
+    task = await insert_returning(db, Task, values)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Task)
+    await publish_change(current_user.id, Task, change_seq, created=[task["id"]])
 
     return task
 
 
-@router.get("/", response_model=List[TaskRead])
-def get_my_tasks(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+@router.post("/batch", response_model=TaskBatchResponse)
+async def batch_tasks(
+    batch: TaskBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+):
+    """
+    Create, update and delete many tasks of the logged-in user in one
+    transaction. Each operation gets its own result (status, id and item).
+    """
+    results = await run_batch(db, Task, TaskRead, current_user.id, batch.operations)
+    return {"results": results}
+
+
+@router.get("/", response_model=TaskPage)
+async def get_my_tasks(
+    request: Request,
+    limit: int = Query(default_page_size, ge=1),
+    after: str | None = Query(None),
+    fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
-    Get all tasks that belong to the logged-in user.
+    Get one page of the tasks that belong to the logged-in user, oldest first.
+    `limit` is capped at the server's maximum page size; `fields` picks the
+    fields of each item (only those columns are loaded).
+    Send the ETag back in If-None-Match to get 304 while nothing has changed.
     """
-    tasks = db.query(Task).filter(Task.user_id == current_user.id).all()
-    return tasks
+    names = parse_fields(fields, TaskRead)
+    etag = await list_etag(db, request, current_user.id, Task)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    cache_key = response_cache.key(current_user.id, Task, etag)
+    body = await response_cache.get(cache_key)
+    if body is None:
+        statement = only_fields(select(Task).where(Task.user_id == current_user.id), Task, names)
+        tasks, next_cursor = await paginate(db, statement, Task, limit=limit, after=after)
+        body = dump_page(page_schema_for(TaskPage, names), tasks, next_cursor)
+        await response_cache.set(current_user.id, Task, cache_key, body)
+
+    return etag_response(body, etag)
 
 
 @router.put("/{task_id}", response_model=TaskRead)
-def update_task(
+async def update_task(
     task_id: int,
     task_in: TaskCreate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Update an existing task that belongs to the logged-in user.
     """
-    task = db.query(Task).filter(
-        Task.id == task_id, Task.user_id == current_user.id
-    ).first()
+    # Counters read the old row, so they go before the update. On a 404
+    # nothing is committed and the session rolls all three back.
+    change_seq = await bump_version(db, current_user.id, Task)
+    await count_write(db, current_user.id, Task, row_id=task_id, values=task_in.model_dump())
+    task = await update_returning(
+        db, Task, task_id, current_user.id, {**task_in.model_dump(), "change_seq": change_seq}
+    )
 
     if task is None:
         raise HTTPException(
@@ -73,37 +123,36 @@ def update_task(
             detail="Task not found",
         )
 
-    task.title = task_in.title
-    task.description = task_in.description
-    task.is_completed = task_in.is_completed
-
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Task)
+    await publish_change(current_user.id, Task, change_seq, updated=[task_id])
 
     return task
 
 
 @router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_task(
+async def delete_task(
     task_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
 ):
     """
     Delete a task that belongs to the logged-in user.
     """
-    task = db.query(Task).filter(
-        Task.id == task_id, Task.user_id == current_user.id
-    ).first()
+    change_seq = await bump_version(db, current_user.id, Task)
+    await count_write(db, current_user.id, Task, row_id=task_id)
+    deleted = await delete_returning(db, Task, task_id, current_user.id)
 
-    if task is None:
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found",
         )
 
-    db.delete(task)
-    db.commit()
+    await record_deletes(db, current_user.id, Task, [task_id], change_seq)
+    await db.commit()
+    await response_cache.invalidate(current_user.id, Task)
+    await publish_change(current_user.id, Task, change_seq, deleted=[task_id])
 
     # No content to return for a successful delete
     return None
@@ -0,0 +1,46 @@
+"""
+Shared pieces of the POST /tasks|habits|notes/batch schemas.
+
+Each resource subclasses these with its own `data` and `item` types
+(see TaskBatchOperation / TaskBatchResult in app/schemas/task.py).
+"""
+
+from typing import Literal
+
+from pydantic import BaseModel, model_validator
+
+
+class BatchOperation(BaseModel):
+    """
+    One operation in a batch.
+    - create: needs `data`, no `id`
+    - update: needs `id` and `data` (the full object, like PUT)
+    - delete: needs `id`
+    """
+
+    op: Literal["create", "update", "delete"]
+    id: int | None = None
+
+    @model_validator(mode="after")
+    def check_fields(self):
+        data = getattr(self, "data", None)
+        if self.op == "create" and self.id is not None:
+            raise ValueError("create operations must not have an id")
+        if self.op in ("update", "delete") and self.id is None:
+            raise ValueError(f"{self.op} operations need an id")
+        if self.op in ("create", "update") and data is None:
+            raise ValueError(f"{self.op} operations need data")
+        return self
+
+
+class BatchResult(BaseModel):
+    """
+    The outcome of one operation, in the same order as the request.
+    `status` is the HTTP status the single-item endpoint would have returned.
+    """
+
+    index: int
+    op: str
+    status: int
+    id: int | None = None
+    detail: str | None = None
@@ -0,0 +1,17 @@
+"""
+Pydantic schemas for the dashboard endpoints.
+"""
+
+from pydantic import BaseModel
+
+
+class DashboardSummary(BaseModel):
+    """
+    Counts for the dashboard header.
+    """
+
+    open_tasks: int
+    completed_tasks: int
+    active_habits: int
+    inactive_habits: int
+    notes: int
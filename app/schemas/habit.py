@@ -2,9 +2,12 @@
 Pydantic schemas for Habit.
 """
 
-from datetime import datetime
+from datetime import date, datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.batch import BatchOperation, BatchResult
+from config.environment import batch_max_operations
 
 
 class HabitBase(BaseModel):
@@ -21,13 +24,63 @@ class HabitCreate(HabitBase):
 
 
 class HabitRead(HabitBase):
+    """
+    `current_streak` counts the consecutive days up to `last_checkin_date`;
+    the streak is broken if that day is before yesterday in the user's time
+    zone.
+    """
+
     id: int
     user_id: int
+    current_streak: int = 0
+    longest_streak: int = 0
+    total_checkins: int = 0
+    last_checkin_date: date | None = None
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class HabitCheckinCreate(BaseModel):
+    """
+    The day the habit was done, in the user's time zone. Defaults to today (UTC).
+    """
+
+    day: date | None = None
+
+
+class HabitPage(BaseModel):
+    """
+    One page of habits. Pass `next_cursor` back as `after` to get the next page;
+    it is null on the last page.
+    """
+
+    items: list[HabitRead]
+    next_cursor: str | None = None
+
+
+class HabitChanges(BaseModel):
+    """
+    Habits created or updated (current state) and ids of habits deleted
+    since the sync token.
+    """
+
+    changed: list[HabitRead]
+    deleted: list[int]
+
+
+class HabitBatchOperation(BatchOperation):
+    data: HabitCreate | None = None
+
+
+class HabitBatchRequest(BaseModel):
+    operations: list[HabitBatchOperation] = Field(min_length=1, max_length=batch_max_operations)
+
 
+class HabitBatchResult(BatchResult):
+    item: HabitRead | None = None
 
 
+class HabitBatchResponse(BaseModel):
+    results: list[HabitBatchResult]
@@ -0,0 +1,30 @@
+"""
+Pydantic schemas for POST /import.
+"""
+
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ImportLineError(BaseModel):
+    line: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    """
+    Progress of one import. `imported` counts records per type; only the first
+    IMPORT_MAX_ERRORS errors are listed, `failed` counts all of them.
+    """
+
+    id: str
+    status: str
+    format: str
+    started_at: datetime
+    finished_at: datetime | None = None
+    lines: int
+    imported: dict[str, int]
+    failed: int
+    errors: list[ImportLineError]
+    errors_truncated: bool
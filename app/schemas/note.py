@@ -4,7 +4,10 @@ Pydantic schemas for Note.
 
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.batch import BatchOperation, BatchResult
+from config.environment import batch_max_operations
 
 
 class NoteBase(BaseModel):
@@ -25,8 +28,78 @@ class NoteRead(NoteBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NoteSummary(BaseModel):
+    """
+    A note in the list: `preview` is the start of the content and
+    `content_length` its length in characters. GET /notes/{id} has the
+    full content.
+    """
+
+    id: int
+    user_id: int
+    title: str
+    preview: str | None = None
+    content_length: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class NotePage(BaseModel):
+    """
+    One page of notes. Pass `next_cursor` back as `after` to get the next page;
+    it is null on the last page.
+    """
+
+    items: list[NoteSummary]
+    next_cursor: str | None = None
+
+
+class NoteSearchHit(BaseModel):
+    """
+    A note matching a search. `title_highlight` and `snippet` are
+    HTML-escaped text with the matching words wrapped in <mark></mark>;
+    higher `score` is a better match.
+    """
+
+    id: int
+    title_highlight: str
+    snippet: str
+    score: float
+    created_at: datetime
+    updated_at: datetime
+
+
+class NoteSearchPage(BaseModel):
+    items: list[NoteSearchHit]
+    next_cursor: str | None = None
+
+
+class NoteChanges(BaseModel):
+    """
+    Notes created or updated (current state) and ids of notes deleted
+    since the sync token.
+    """
+
+    changed: list[NoteRead]
+    deleted: list[int]
+
+
+class NoteBatchOperation(BatchOperation):
+    data: NoteCreate | None = None
+
+
+class NoteBatchRequest(BaseModel):
+    operations: list[NoteBatchOperation] = Field(min_length=1, max_length=batch_max_operations)
+
 
+class NoteBatchResult(BatchResult):
+    item: NoteRead | None = None
 
 
+class NoteBatchResponse(BaseModel):
+    results: list[NoteBatchResult]
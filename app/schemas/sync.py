@@ -0,0 +1,25 @@
+"""
+Pydantic schemas for GET /sync.
+"""
+
+from pydantic import BaseModel
+
+from app.schemas.habit import HabitChanges
+from app.schemas.note import NoteChanges
+from app.schemas.task import TaskChanges
+
+
+class SyncResponse(BaseModel):
+    """
+    Changes since the `since` token. Keep `next_token` for the next sync;
+    while `has_more` is true, call again with it right away. `full_resync`
+    means the old token was too old: drop the local copies and rebuild them
+    from this response and the pages after it.
+    """
+
+    tasks: TaskChanges
+    habits: HabitChanges
+    notes: NoteChanges
+    next_token: str
+    has_more: bool
+    full_resync: bool = False
@@ -6,7 +6,10 @@ These define what data the API accepts and returns for tasks.
 
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.schemas.batch import BatchOperation, BatchResult
+from config.environment import batch_max_operations
 
 
 class TaskBase(BaseModel):
@@ -28,8 +31,40 @@ class TaskRead(TaskBase):
     created_at: datetime
     updated_at: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TaskPage(BaseModel):
+    """
+    One page of tasks. Pass `next_cursor` back as `after` to get the next page;
+    it is null on the last page.
+    """
+
+    items: list[TaskRead]
+    next_cursor: str | None = None
+
+
+class TaskChanges(BaseModel):
+    """
+    Tasks created or updated (current state) and ids of tasks deleted
+    since the sync token.
+    """
+
+    changed: list[TaskRead]
+    deleted: list[int]
+
+
+class TaskBatchOperation(BatchOperation):
+    data: TaskCreate | None = None
+
+
+class TaskBatchRequest(BaseModel):
+    operations: list[TaskBatchOperation] = Field(min_length=1, max_length=batch_max_operations)
+
 
+class TaskBatchResult(BatchResult):
+    item: TaskRead | None = None
 
 
+class TaskBatchResponse(BaseModel):
+    results: list[TaskBatchResult]
@@ -0,0 +1,151 @@
+"""
+Batch create/update/delete for tasks, habits and notes.
+
+A client syncing many changes used to send one request per item, each with
+its own transaction and round trips. `run_batch` applies a whole batch in
+one transaction with a fixed number of statements, however many items it has:
+- one SELECT to check which ids belong to the user
+- one multi-row INSERT ... RETURNING for the creates
+- one executemany UPDATE (plus a SELECT to return the new rows)
+- one DELETE ... WHERE id IN (...)
+
+Creates run first, then updates, then deletes. Results come back in request
+order; an update or delete of an id the user does not own gets a 404 result
+without failing the rest of the batch. The dashboard counters move by the
+net change of the whole batch, in one more statement.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.orm import undefer
+
+from app.services.counters import BUCKETS, adjust_counters, bucket
+from app.services.etags import bump_version
+from app.services.events import publish_change
+from app.services.response_cache import response_cache
+from app.services.sync import record_deletes
+from app.services.writes import update_values
+
+
+def _not_found(model) -> str:
+    return f"{model.__name__} not found"
+
+
+async def run_batch(db, model, read_schema, user_id: int, operations, before_delete=None) -> list[dict]:
+    """
+    Apply `operations` (BatchOperation subclasses) for `user_id` and commit.
+
+    Returns one result dict per operation. Items are serialized with
+    `read_schema` before the commit expires them. `before_delete(db, user_id,
+    ids)`, if given, runs before the rows are deleted, e.g. to remove
+    dependent rows.
+    """
+    targeted = [operation.id for operation in operations if operation.op != "create"]
+    if len(targeted) != len(set(targeted)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Each id may appear in only one update or delete operation",
+        )
+
+    if not operations:
+        return []
+
+    # First, so that on Postgres the version row lock orders concurrent
+    # writers before the old buckets below are read
+    change_seq = await bump_version(db, user_id, model)
+
+    # id -> the counter the row is in now
+    flag = BUCKETS[model][0]
+    owned: dict[int, str] = {}
+    if targeted:
+        columns = [model.id] if flag is None else [model.id, getattr(model, flag)]
+        rows = await db.execute(select(*columns).where(model.user_id == user_id, model.id.in_(targeted)))
+        owned = {row.id: bucket(model, row._mapping) for row in rows}
+
+    creates = [(index, op) for index, op in enumerate(operations) if op.op == "create"]
+    updates = [(index, op) for index, op in enumerate(operations) if op.op == "update" and op.id in owned]
+    deletes = [op.id for op in operations if op.op == "delete" and op.id in owned]
+
+    results: list[dict | None] = [None] * len(operations)
+
+    if creates:
+        created = (
+            await db.execute(
+                # Deferred columns (Note.content) too: the items are full Read schemas
+                insert(model).options(undefer("*")).returning(model, sort_by_parameter_order=True),
+                [{**op.data.model_dump(), "user_id": user_id, "change_seq": change_seq} for _, op in creates],
+            )
+        ).scalars().all()
+        for (index, op), row in zip(creates, created):
+            results[index] = {
+                "index": index, "op": op.op, "status": status.HTTP_201_CREATED,
+                "id": row.id, "item": read_schema.model_validate(row, from_attributes=True),
+            }
+
+    if updates:
+        await db.execute(
+            update(model)
+            .where(model.user_id == user_id)
+            .execution_options(synchronize_session=None),
+            [
+                {"id": op.id, **update_values(model, op.data.model_dump()), "change_seq": change_seq}
+                for _, op in updates
+            ],
+        )
+        updated = (
+            await db.execute(
+                select(model)
+                .options(undefer("*"))
+                .where(model.id.in_([op.id for _, op in updates]))
+                .execution_options(populate_existing=True)
+            )
+        ).scalars().all()
+        rows = {row.id: row for row in updated}
+        for index, op in updates:
+            results[index] = {
+                "index": index, "op": op.op, "status": status.HTTP_200_OK,
+                "id": op.id, "item": read_schema.model_validate(rows[op.id], from_attributes=True),
+            }
+
+    if deletes:
+        if before_delete is not None:
+            await before_delete(db, user_id, deletes)
+        await db.execute(
+            delete(model)
+            .where(model.user_id == user_id, model.id.in_(deletes))
+            .execution_options(synchronize_session=False)
+        )
+        await record_deletes(db, user_id, model, deletes, change_seq)
+
+    for index, op in enumerate(operations):
+        if results[index] is not None:
+            continue
+        if op.id in owned:
+            results[index] = {"index": index, "op": op.op, "status": status.HTTP_204_NO_CONTENT, "id": op.id}
+        else:
+            results[index] = {
+                "index": index, "op": op.op, "status": status.HTTP_404_NOT_FOUND,
+                "id": op.id, "detail": _not_found(model),
+            }
+
+    deltas: dict[str, int] = {}
+    for counter, change in (
+        *((bucket(model, op.data.model_dump()), 1) for _, op in creates),
+        *((bucket(model, op.data.model_dump()), 1) for _, op in updates),
+        *((owned[op.id], -1) for _, op in updates),
+        *((owned[row_id], -1) for row_id in deletes),
+    ):
+        deltas[counter] = deltas.get(counter, 0) + change
+    await adjust_counters(db, user_id, deltas)
+
+    await db.commit()
+    await response_cache.invalidate(user_id, model)
+    await publish_change(
+        user_id,
+        model,
+        change_seq,
+        created=[result["id"] for result in results if result["op"] == "create"],
+        updated=[op.id for _, op in updates],
+        deleted=deletes,
+    )
+    return results
@@ -0,0 +1,231 @@
+"""
+Habit check-ins and the streaks derived from them.
+
+A check-in is one `habit_checkins` row per (habit, day). The habit itself
+carries current_streak, longest_streak, total_checkins and
+last_checkin_date, so GET /habits/ lists streaks without touching the
+history. Each check-in or undo updates those columns from their old values:
+
+- checking in the day after last_checkin_date (the normal case) extends the
+  current streak; any later day starts a new one; no history is read
+- checking in an earlier day (backfilling) can join two runs, so the runs
+  right before and after that day are measured by walking the
+  (habit_id, date) index, one page of dates at a time, until the first gap
+- undoing a day shortens or splits the run it was in the same way; only when
+  that run was the longest one is the whole history of the habit rescanned
+
+Every write starts with `bump_version`, which on Postgres locks the user's
+version row (SQLite has a single writer anyway), so concurrent check-ins of
+one user run one after the other and the streak columns do not race.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, func, literal, select
+
+from app.models.habit import Habit
+from app.models.habit_checkin import HabitCheckin
+from app.services.etags import bump_version
+from app.services.events import publish_change
+from app.services.response_cache import response_cache
+from app.services.writes import update_returning, upsert_insert
+
+# Dates fetched per query while walking a run
+RUN_PAGE_SIZE = 366
+
+ONE_DAY = timedelta(days=1)
+
+
+async def _run_length(db, habit_id: int, start: date, step: int) -> int:
+    """
+    Number of consecutive checked-in days from `start` going backwards
+    (step=-1) or forwards (step=1); 0 if `start` itself is not checked in.
+    """
+    column = HabitCheckin.date
+    length, expected = 0, start
+    while True:
+        statement = select(column).where(HabitCheckin.habit_id == habit_id)
+        if step < 0:
+            statement = statement.where(column <= expected).order_by(column.desc())
+        else:
+            statement = statement.where(column >= expected).order_by(column)
+        dates = (await db.execute(statement.limit(RUN_PAGE_SIZE))).scalars().all()
+        for day in dates:
+            if day != expected:
+                return length
+            length += 1
+            expected += step * ONE_DAY
+        if len(dates) < RUN_PAGE_SIZE:
+            return length
+
+
+async def _longest_run(db, habit_id: int) -> int:
+    dates = (
+        await db.stream(
+            select(HabitCheckin.date)
+            .where(HabitCheckin.habit_id == habit_id)
+            .order_by(HabitCheckin.date)
+            .execution_options(yield_per=RUN_PAGE_SIZE)
+        )
+    )
+    longest = current = 0
+    previous = None
+    async for rows in dates.partitions():
+        for (day,) in rows:
+            current = current + 1 if previous is not None and day == previous + ONE_DAY else 1
+            longest = max(longest, current)
+            previous = day
+    return longest
+
+
+async def _locked_habit(db, user_id: int, habit_id: int):
+    habit = (
+        await db.execute(
+            select(*Habit.__table__.c)
+            .where(Habit.id == habit_id, Habit.user_id == user_id)
+            .with_for_update()
+        )
+    ).one_or_none()
+    if habit is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Habit not found",
+        )
+    return habit
+
+
+async def _save(db, user_id: int, habit_id: int, change_seq: int, values: dict) -> dict:
+    habit = await update_returning(db, Habit, habit_id, user_id, {**values, "change_seq": change_seq})
+    await db.commit()
+    await response_cache.invalidate(user_id, Habit)
+    await publish_change(user_id, Habit, change_seq, updated=[habit_id])
+    return habit
+
+
+async def check_in(db, user_id: int, habit_id: int, day: date) -> dict:
+    """
+    Record that `user_id` did habit `habit_id` on `day` and return the
+    updated habit. Checking in a day twice changes nothing.
+    """
+    # A day ahead of UTC is still "today" somewhere
+    if day > datetime.now(timezone.utc).date() + ONE_DAY:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot check in a future day",
+        )
+
+    change_seq = await bump_version(db, user_id, Habit)
+
+    # Ownership check and insert in one statement: nothing is inserted for
+    # somebody else's habit or a day that is already checked in
+    table = HabitCheckin.__table__
+    owned = select(Habit.id, literal(user_id), literal(day)).where(Habit.id == habit_id, Habit.user_id == user_id)
+    statement = upsert_insert(db, table).from_select(["habit_id", "user_id", "date"], owned)
+    inserted = (
+        await db.execute(statement.on_conflict_do_nothing(index_elements=["habit_id", "date"]).returning(table.c.id))
+    ).scalar_one_or_none()
+
+    habit = await _locked_habit(db, user_id, habit_id)
+    if inserted is None:
+        # Already checked in: nothing to save, not even the version bump
+        await db.rollback()
+        return dict(habit._mapping)
+
+    current, last = habit.current_streak, habit.last_checkin_date
+    if last is None or day > last:
+        current = current + 1 if last == day - ONE_DAY else 1
+        run = current
+        last = day
+    else:
+        before = await _run_length(db, habit_id, day - ONE_DAY, -1)
+        after = await _run_length(db, habit_id, day + ONE_DAY, 1)
+        run = before + 1 + after
+        if day + after * ONE_DAY == last:
+            # The backfilled day joins onto the current streak
+            current = run
+
+    return await _save(
+        db,
+        user_id,
+        habit_id,
+        change_seq,
+        {
+            "current_streak": current,
+            "longest_streak": max(habit.longest_streak, run),
+            "total_checkins": habit.total_checkins + 1,
+            "last_checkin_date": last,
+        },
+    )
+
+
+async def undo_check_in(db, user_id: int, habit_id: int, day: date) -> dict:
+    """
+    Remove the check-in of habit `habit_id` on `day` and return the updated
+    habit. 404 if the habit or the check-in does not exist.
+    """
+    change_seq = await bump_version(db, user_id, Habit)
+    deleted = (
+        await db.execute(
+            delete(HabitCheckin)
+            .where(
+                HabitCheckin.habit_id == habit_id,
+                HabitCheckin.user_id == user_id,
+                HabitCheckin.date == day,
+            )
+            .returning(HabitCheckin.id)
+            .execution_options(synchronize_session=False)
+        )
+    ).scalar_one_or_none()
+    if deleted is None:
+        await _locked_habit(db, user_id, habit_id)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Check-in not found",
+        )
+
+    habit = await _locked_habit(db, user_id, habit_id)
+    current, last = habit.current_streak, habit.last_checkin_date
+
+    # `day` was in a run of `before` days, itself, then `after` days
+    before = await _run_length(db, habit_id, day - ONE_DAY, -1)
+    after = await _run_length(db, habit_id, day + ONE_DAY, 1)
+
+    if day == last:
+        if before:
+            last = day - ONE_DAY
+            current = before
+        else:
+            last = await db.scalar(select(func.max(HabitCheckin.date)).where(HabitCheckin.habit_id == habit_id))
+            current = await _run_length(db, habit_id, last, -1) if last is not None else 0
+    elif day + after * ONE_DAY == last:
+        # `day` was inside the current streak, which now starts the day after
+        current = after
+
+    longest = habit.longest_streak
+    if before + 1 + after == longest:
+        longest = await _longest_run(db, habit_id)
+
+    return await _save(
+        db,
+        user_id,
+        habit_id,
+        change_seq,
+        {
+            "current_streak": current,
+            "longest_streak": longest,
+            "total_checkins": habit.total_checkins - 1,
+            "last_checkin_date": last,
+        },
+    )
+
+
+async def delete_checkins(db, user_id: int, habit_ids: list[int]) -> None:
+    """
+    Delete the check-ins of habits that are about to be deleted.
+    """
+    await db.execute(
+        delete(HabitCheckin)
+        .where(HabitCheckin.user_id == user_id, HabitCheckin.habit_id.in_(habit_ids))
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,145 @@
+"""
+Dashboard counters: open/completed tasks, active/inactive habits and notes.
+
+The dashboard header used to download all three lists to count them. Now
+every write adjusts the user's row in `user_counters` (see
+app/models/user_counters.py) in the same transaction, so GET
+/dashboard/summary is a primary-key lookup.
+
+Each counted row sits in exactly one counter ("bucket"): a task is open or
+completed, a habit active or inactive, a note is a note. A write moves one
+row between buckets:
+- create: +1 for the new bucket
+- update: +1 for the new bucket, -1 for the old one
+- delete: -1 for the old bucket
+The old bucket is read inside the same statement (a COUNT over that one row
+by primary key), so this costs one upsert and no extra round trip.
+
+On Postgres, call it after `bump_version`: that upsert locks the user's
+version row, so concurrent writes to the same list are serialized and each
+one sees the previous one's result.
+
+`rebuild_counters` recounts everything; `reconcile_counters.py` runs it.
+"""
+
+from sqlalchemy import func, literal, select, true
+
+from app.models.habit import Habit
+from app.models.note import Note
+from app.models.task import Task
+from app.models.user_counters import UserCounters
+from app.services.writes import upsert_insert
+from models.user import UserModel
+
+# model -> (flag column name or None, counter when the flag is set, counter when not)
+BUCKETS = {
+    Task: ("is_completed", "completed_tasks", "open_tasks"),
+    Habit: ("is_active", "active_habits", "inactive_habits"),
+    Note: (None, "notes", None),
+}
+
+COUNTER_NAMES = ("open_tasks", "completed_tasks", "active_habits", "inactive_habits", "notes")
+
+
+def bucket(model, values: dict) -> str:
+    """
+    The counter a row with these column values is counted in.
+    """
+    flag, when_set, when_unset = BUCKETS[model]
+    if flag is None or values.get(flag):
+        return when_set
+    return when_unset
+
+
+def _bucket_condition(model, counter: str):
+    flag, when_set, when_unset = BUCKETS[model]
+    if flag is None:
+        return true()
+    # NULL counts as "not set"
+    is_set = func.coalesce(getattr(model, flag), False)
+    return is_set if counter == when_set else ~is_set
+
+
+def _model_counters(model) -> list[str]:
+    _, when_set, when_unset = BUCKETS[model]
+    return [counter for counter in (when_set, when_unset) if counter is not None]
+
+
+async def adjust_counters(db, user_id: int, deltas: dict) -> None:
+    """
+    Add `deltas` ({counter: int or SQL expression}) to the user's counters,
+    creating the row if needed.
+    """
+    deltas = {counter: delta for counter, delta in deltas.items() if not isinstance(delta, int) or delta}
+    if not deltas:
+        return
+    table = UserCounters.__table__
+    values = {counter: 0 for counter in COUNTER_NAMES}
+    values.update(deltas)
+    statement = upsert_insert(db, table).values(user_id=user_id, **values)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={counter: table.c[counter] + statement.excluded[counter] for counter in deltas},
+    )
+    await db.execute(statement)
+
+
+async def count_write(db, user_id: int, model, row_id: int | None = None, values: dict | None = None) -> None:
+    """
+    Adjust the counters for one create (`values`), update (`row_id` and
+    `values`) or delete (`row_id`) of `model`. Call it before the write
+    itself, so the old bucket is still readable.
+    """
+    if BUCKETS[model][0] is None and row_id is not None and values is not None:
+        # Only one bucket: an update cannot move the row
+        return
+    deltas = {}
+    for counter in _model_counters(model):
+        delta = literal(1 if values is not None and bucket(model, values) == counter else 0)
+        if row_id is not None:
+            old = (
+                select(func.count())
+                .select_from(model)
+                .where(model.id == row_id, model.user_id == user_id, _bucket_condition(model, counter))
+                .scalar_subquery()
+            )
+            delta = delta - old
+        deltas[counter] = delta
+    await adjust_counters(db, user_id, deltas)
+
+
+def _count(model, counter: str):
+    return (
+        select(func.count())
+        .select_from(model)
+        .where(model.user_id == UserModel.id, _bucket_condition(model, counter))
+        .scalar_subquery()
+    )
+
+
+async def rebuild_counters(db, user_id: int | None = None) -> None:
+    """
+    Recount every counter from the task, habit and note tables, for one user
+    or for all of them. Does not commit.
+    """
+    table = UserCounters.__table__
+    counts = {
+        counter: _count(model, counter)
+        for model in BUCKETS
+        for counter in _model_counters(model)
+    }
+    source = select(UserModel.id, *counts.values())
+    # SQLite needs a WHERE on INSERT ... SELECT ... ON CONFLICT to parse it
+    source = source.where(UserModel.id == user_id if user_id is not None else true())
+
+    statement = upsert_insert(db, table).from_select(["user_id", *counts], source)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id],
+        set_={counter: statement.excluded[counter] for counter in counts},
+    )
+    await db.execute(statement)
+
+
+async def read_counters(db, user_id: int) -> dict:
+    row = await db.get(UserCounters, user_id)
+    return {counter: getattr(row, counter) if row is not None else 0 for counter in COUNTER_NAMES}
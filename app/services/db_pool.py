@@ -0,0 +1,121 @@
+"""
+Connection pool settings and live pool statistics.
+
+The pool is configured from the DB_POOL_* environment variables (see
+config/environment.py). `instrumented_pool` wraps SQLAlchemy's QueuePool so
+every checkout is timed and failures are counted, and `pool_status` reports
+those numbers together with the pool's own gauges for GET /health/pool.
+"""
+
+import threading
+import time
+
+from sqlalchemy import exc
+
+from config.environment import (
+    db_max_overflow,
+    db_pool_pre_ping,
+    db_pool_recycle,
+    db_pool_size,
+    db_pool_timeout,
+)
+
+
+def pool_options() -> dict:
+    """
+    Keyword arguments for `create_engine` / `create_async_engine`.
+    """
+    return {
+        "pool_size": db_pool_size,
+        "max_overflow": db_max_overflow,
+        "pool_timeout": db_pool_timeout,
+        "pool_recycle": db_pool_recycle,
+        "pool_pre_ping": db_pool_pre_ping,
+    }
+
+
+class PoolStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.checkout_errors = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def record(self, waited: float, error: BaseException | None) -> None:
+        with self._lock:
+            self.wait_seconds_total += waited
+            self.wait_seconds_max = max(self.wait_seconds_max, waited)
+            if error is None:
+                self.checkouts += 1
+            elif isinstance(error, exc.TimeoutError):
+                self.checkout_timeouts += 1
+            else:
+                self.checkout_errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.checkout_timeouts + self.checkout_errors
+            return {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_errors": self.checkout_errors,
+                "wait_seconds_total": round(self.wait_seconds_total, 6),
+                "wait_seconds_avg": round(self.wait_seconds_total / attempts, 6) if attempts else 0.0,
+                "wait_seconds_max": round(self.wait_seconds_max, 6),
+            }
+
+
+class _InstrumentedPoolMixin:
+    stats: PoolStats
+
+    def connect(self):
+        # Includes waiting for a free slot, opening overflow connections and pre-ping
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except Exception as error:
+            self.stats.record(time.perf_counter() - started, error)
+            raise
+        self.stats.record(time.perf_counter() - started, None)
+        return connection
+
+
+def instrumented_pool(pool_class):
+    """
+    A subclass of `pool_class` with its own `PoolStats`. The stats live on the
+    class, so they survive `pool.recreate()` (which SQLAlchemy calls on dispose).
+    """
+    return type(
+        f"Instrumented{pool_class.__name__}",
+        (_InstrumentedPoolMixin, pool_class),
+        {"stats": PoolStats()},
+    )
+
+
+def pool_status(engine) -> dict:
+    """
+    Live gauges for one engine's pool plus its checkout statistics.
+    """
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+
+    # SingletonThreadPool / StaticPool (in-memory SQLite) have no size or overflow
+    if hasattr(pool, "checkedout"):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+                "max_overflow": pool._max_overflow,
+                "timeout_seconds": pool.timeout(),
+            }
+        )
+
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(stats.snapshot())
+
+    return status
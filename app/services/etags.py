@@ -0,0 +1,85 @@
+"""
+Conditional GET for the task, habit and note lists.
+
+The dashboard polls the three list endpoints every few seconds and nearly
+always gets the same data back. Each list response now carries a strong ETag
+built from the user's version counter for that resource (see
+app/models/resource_version.py) and the query string. When the client sends
+it back in If-None-Match and nothing has been written since, the route
+answers 304 after a single primary-key lookup, without loading or
+serializing any rows.
+
+Write handlers call `bump_version` in the same transaction as the write, so
+the ETag changes exactly when the list can have changed, in every worker
+process. The new version is also stamped on the written rows as their
+`change_seq`, which GET /sync pages by (app/services/sync.py).
+"""
+
+import hashlib
+
+from fastapi import Request, Response, status
+from sqlalchemy import select
+
+from app.models.resource_version import ResourceVersion
+from app.services.writes import upsert_insert
+
+CACHE_CONTROL = "private, no-cache"
+
+
+async def bump_version(db, user_id: int, model) -> int:
+    """
+    Add one to the user's version of `model`'s list (creating the row at 1)
+    and return the new version.
+    """
+    table = ResourceVersion.__table__
+    statement = upsert_insert(db, table).values(user_id=user_id, resource=model.__tablename__, version=1)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.resource],
+        set_={"version": table.c.version + 1},
+    )
+    return (await db.execute(statement.returning(table.c.version))).scalar_one()
+
+
+async def list_etag(db, request: Request, user_id: int, model) -> str:
+    """
+    The ETag for this user's list of `model` as requested (limit, cursor, ...).
+    """
+    version = await db.scalar(
+        select(ResourceVersion.version).where(
+            ResourceVersion.user_id == user_id,
+            ResourceVersion.resource == model.__tablename__,
+        )
+    )
+    query = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{user_id}:{model.__tablename__}:{query}".encode()).hexdigest()[:16]
+    return f'"{version or 0}-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    True if the request's If-None-Match lists `etag` (or is "*").
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison, so W/"x" matches "x"
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def etag_response(body: bytes, etag: str) -> Response:
+    """
+    A 200 response for already serialized JSON `body`.
+    """
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
+
+
+def not_modified(etag: str) -> Response:
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL},
+    )
@@ -0,0 +1,223 @@
+"""
+Push of task, habit and note changes to connected clients (GET /events).
+
+Clients used to poll the three list endpoints to notice changes. Now they
+can keep one Server-Sent Events stream open and get a small event after
+every committed write:
+
+    data: {"resource": "tasks", "version": 42, "updated": [17]}
+
+`version` is the list version of the write (the `change_seq` GET /sync pages
+by), and the id lists are `created` / `updated` / `deleted`, each present only
+when not empty; an import chunk sends `imported` with a count instead. The
+event says what changed, not the new data: clients fetch that with GET /sync.
+
+Delivery:
+- writers `publish_change` after their commit; the event goes to the broker
+  on channel `events:<user id>`
+- each worker process subscribes to the channel of every user with an open
+  stream on it, and puts the event into each of that user's connections'
+  queues (`EVENTS_QUEUE_SIZE` events at most)
+- a connection whose queue is full is a slow consumer: it gets a final
+  `reconnect` event and is closed, instead of holding memory or slowing down
+  the other connections. It catches up with GET /sync after reconnecting.
+
+`Broker` is the pub/sub interface. `LocalBroker` is the in-process stand-in,
+which connects the writers and streams of one worker; with several workers,
+plug in a broker that forwards between processes (e.g. Redis PUBLISH /
+SUBSCRIBE behind the same three methods).
+"""
+
+import asyncio
+import json
+from abc import ABC, abstractmethod
+
+from config.environment import events_keepalive_seconds, events_queue_size
+
+KEEPALIVE_FRAME = b": keepalive\n\n"
+RECONNECT_FRAME = b"event: reconnect\ndata: {}\n\n"
+
+
+class Broker(ABC):
+    """
+    Pub/sub between the processes that write and the ones holding streams.
+    Handlers are called on the event loop and must not block.
+    """
+
+    @abstractmethod
+    async def publish(self, channel: str, message: bytes) -> None: ...
+
+    @abstractmethod
+    async def subscribe(self, channel: str, handler) -> None: ...
+
+    @abstractmethod
+    async def unsubscribe(self, channel: str, handler) -> None: ...
+
+
+class LocalBroker(Broker):
+    """
+    In-process stand-in for a shared broker, for development and single-worker runs.
+    """
+
+    def __init__(self):
+        self._handlers: dict[str, list] = {}
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for handler in list(self._handlers.get(channel, ())):
+            handler(message)
+
+    async def subscribe(self, channel: str, handler) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    async def unsubscribe(self, channel: str, handler) -> None:
+        handlers = self._handlers.get(channel, [])
+        if handler in handlers:
+            handlers.remove(handler)
+        if not handlers:
+            self._handlers.pop(channel, None)
+
+
+class Connection:
+    """
+    One open event stream and its bounded queue of SSE frames.
+    """
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def offer(self, frame: bytes) -> bool:
+        """
+        Queue `frame`; False if the queue is full (the consumer is too slow).
+        """
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self, last_frame: bytes) -> None:
+        """
+        End the stream after `last_frame`, dropping whatever was still queued.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(last_frame)
+
+
+class EventHub:
+    """
+    This process's open streams, grouped by user, fed from the broker.
+    """
+
+    def __init__(self, broker: Broker, queue_size: int, keepalive: float):
+        self.broker = broker
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self._connections: dict[int, set[Connection]] = {}
+        self._handlers: dict[int, object] = {}
+        # Everything here runs on the event loop, so no locking
+        self.published = 0
+        self.delivered = 0
+        self.slow_consumers = 0
+
+    @staticmethod
+    def channel(user_id: int) -> str:
+        return f"events:{user_id}"
+
+    async def publish(self, user_id: int, event: dict) -> None:
+        message = json.dumps(event, separators=(",", ":")).encode()
+        await self.broker.publish(self.channel(user_id), message)
+        self.published += 1
+
+    def _deliver(self, user_id: int, message: bytes) -> None:
+        frame = b"data: " + message + b"\n\n"
+        for connection in list(self._connections.get(user_id, ())):
+            if connection.closed:
+                continue
+            if connection.offer(frame):
+                self.delivered += 1
+            else:
+                self.slow_consumers += 1
+                connection.close(RECONNECT_FRAME)
+
+    async def connect(self, user_id: int) -> Connection:
+        connection = Connection(user_id, self.queue_size)
+        connections = self._connections.setdefault(user_id, set())
+        connections.add(connection)
+        if user_id not in self._handlers:
+            handler = self._handlers[user_id] = lambda message: self._deliver(user_id, message)
+            await self.broker.subscribe(self.channel(user_id), handler)
+        return connection
+
+    async def disconnect(self, connection: Connection) -> None:
+        connection.closed = True
+        connections = self._connections.get(connection.user_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self._connections[connection.user_id]
+            handler = self._handlers.pop(connection.user_id, None)
+            if handler is not None:
+                await self.broker.unsubscribe(self.channel(connection.user_id), handler)
+
+    async def stream(self, user_id: int):
+        """
+        The SSE body for one client: events as they come, a keepalive comment
+        when idle, until the client goes away or falls behind.
+        """
+        connection = await self.connect(user_id)
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    frame = await asyncio.wait_for(connection.queue.get(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    yield KEEPALIVE_FRAME
+                    continue
+                yield frame
+                if connection.closed and connection.queue.empty():
+                    # That was the reconnect event of a slow consumer
+                    return
+        finally:
+            await self.disconnect(connection)
+
+    def stats(self) -> dict:
+        return {
+            "connections": sum(len(connections) for connections in self._connections.values()),
+            "users": len(self._connections),
+            "published": self.published,
+            "delivered": self.delivered,
+            "slow_consumers_disconnected": self.slow_consumers,
+            "queue_size": self.queue_size,
+        }
+
+
+event_hub = EventHub(LocalBroker(), events_queue_size, events_keepalive_seconds)
+
+
+async def publish_change(
+    user_id: int,
+    model,
+    version: int,
+    created=(),
+    updated=(),
+    deleted=(),
+    imported: int = 0,
+) -> None:
+    """
+    Tell `user_id`'s open streams that their `model` list changed. Call after
+    the write has been committed.
+    """
+    event = {"resource": model.__tablename__, "version": version}
+    for key, ids in (("created", created), ("updated", updated), ("deleted", deleted)):
+        if ids:
+            event[key] = list(ids)
+    if imported:
+        event["imported"] = imported
+    await event_hub.publish(user_id, event)
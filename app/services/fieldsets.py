@@ -0,0 +1,73 @@
+"""
+Sparse fieldsets for the list endpoints (?fields=id,title,is_completed).
+
+Many views only need a few columns, while `Note.content` and the
+descriptions can be many kilobytes per row. With `fields` the list query
+loads only those columns (`load_only`), and the page is dumped with a
+trimmed copy of the Read schema, so the other columns are neither read from
+the table nor sent.
+
+`id` and `created_at` are always loaded because the next-page cursor is
+built from them, but they are only returned when asked for.
+"""
+
+import functools
+
+from fastapi import HTTPException, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy.orm import load_only
+
+from app.services.serialization import item_schema
+
+FIELDS_DESCRIPTION = "Comma-separated fields to return, e.g. id,title. All fields when omitted."
+
+# Needed by the keyset pagination cursor
+ALWAYS_LOADED = ("id", "created_at")
+
+
+def parse_fields(fields: str | None, read_schema) -> tuple[str, ...] | None:
+    """
+    The requested field names in the schema's order, or None for all fields.
+    400 for names the schema does not have.
+    """
+    if fields is None or not fields.strip():
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(read_schema.model_fields)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown field(s): {', '.join(sorted(unknown))}",
+        )
+    return tuple(name for name in read_schema.model_fields if name in requested)
+
+
+def only_fields(statement, model, names: tuple[str, ...] | None):
+    """
+    Restrict a `select(model)` statement to the columns behind `names`.
+    """
+    if names is None:
+        return statement
+    columns = dict.fromkeys((*ALWAYS_LOADED, *names))
+    return statement.options(load_only(*(getattr(model, name) for name in columns)))
+
+
+@functools.cache
+def page_schema_for(page_schema, names: tuple[str, ...] | None):
+    """
+    `page_schema` with its items trimmed to `names` (all of them for None).
+    One schema per combination, built on first use.
+    """
+    if names is None:
+        return page_schema
+    schema = item_schema(page_schema)
+    trimmed = create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in names},
+    )
+    return create_model(
+        f"{page_schema.__name__}Fields",
+        items=(list[trimmed], ...),
+        next_cursor=(str | None, None),
+    )
@@ -0,0 +1,285 @@
+"""
+Streaming import of tasks, habits and notes (POST /import).
+
+Exports from other tools can hold 50k+ items. The importer never holds the
+file: it reads the request body as it arrives, splits it into lines,
+validates each record with TaskCreate / HabitCreate / NoteCreate and inserts
+every `IMPORT_CHUNK_SIZE` valid records in one transaction. Memory use
+depends on the chunk size, not on the file size.
+
+Accepted formats (by Content-Type; `Content-Encoding: gzip` is also accepted):
+- NDJSON (default): one object per line, either `{"type": "task", "data": {...}}`
+  as written by GET /export, or the bare fields when `?type=` is given
+- CSV (text/csv): a header row, then one record per row; a `type` column
+  says task/habit/note unless `?type=` is given
+
+A bad line is recorded with its line number and skipped; the rest of the
+import goes on. Progress is kept on an `ImportJob`, which GET /import shows
+while the upload is still running. Between chunks the event loop serves
+other requests, and on SQLite each chunk holds the writer only briefly.
+"""
+
+import codecs
+import csv
+import io
+import json
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+
+from app.models.habit import Habit
+from app.models.note import Note
+from app.models.task import Task
+from app.schemas.habit import HabitCreate
+from app.schemas.note import NoteCreate
+from app.schemas.task import TaskCreate
+from app.services.counters import adjust_counters, bucket
+from app.services.etags import bump_version
+from app.services.events import publish_change
+from app.services.response_cache import response_cache
+from config.environment import import_chunk_size, import_max_errors, import_max_line_bytes
+
+IMPORTABLE = {
+    "task": (Task, TaskCreate),
+    "habit": (Habit, HabitCreate),
+    "note": (Note, NoteCreate),
+}
+
+# Finished jobs kept for GET /import, per process
+RECENT_JOBS = 100
+
+
+class ImportJob:
+    def __init__(self, user_id: int, file_format: str):
+        self.id = uuid.uuid4().hex
+        self.user_id = user_id
+        self.format = file_format
+        self.status = "running"
+        self.started_at = datetime.now(timezone.utc)
+        self.finished_at = None
+        self.lines = 0
+        self.imported = {kind: 0 for kind in IMPORTABLE}
+        self.failed = 0
+        self.errors: list[dict] = []
+
+    def error(self, line: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < import_max_errors:
+            self.errors.append({"line": line, "error": message})
+
+    def report(self) -> dict:
+        return {
+            "id": self.id,
+            "status": self.status,
+            "format": self.format,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "lines": self.lines,
+            "imported": dict(self.imported),
+            "failed": self.failed,
+            "errors": list(self.errors),
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+
+class ImportJobs:
+    def __init__(self, keep: int):
+        self.keep = keep
+        self._jobs: OrderedDict[str, ImportJob] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def start(self, user_id: int, file_format: str) -> ImportJob:
+        job = ImportJob(user_id, file_format)
+        with self._lock:
+            self._jobs[job.id] = job
+            finished = [key for key, old in self._jobs.items() if old.status != "running"]
+            for key in finished[: max(0, len(finished) - self.keep)]:
+                del self._jobs[key]
+        return job
+
+    def for_user(self, user_id: int) -> list[ImportJob]:
+        with self._lock:
+            return [job for job in self._jobs.values() if job.user_id == user_id]
+
+
+import_jobs = ImportJobs(keep=RECENT_JOBS)
+
+
+async def _decoded_lines(body, gzipped: bool):
+    """
+    (line number, text) for each line of the streamed body. A line longer
+    than IMPORT_MAX_LINE_BYTES comes back as None and is skipped.
+    """
+    decompressor = zlib.decompressobj(wbits=31) if gzipped else None
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    number = 0
+    oversized = False
+
+    async for chunk in body:
+        if decompressor is not None:
+            chunk = decompressor.decompress(chunk)
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            number += 1
+            yield number, None if oversized else line.rstrip("\r")
+            oversized = False
+        if len(buffer) > import_max_line_bytes:
+            buffer = ""
+            oversized = True
+
+    buffer += decoder.decode(b"", final=True)
+    if buffer or oversized:
+        number += 1
+        yield number, None if oversized else buffer.rstrip("\r")
+
+
+async def _ndjson_records(lines, default_type: str | None):
+    async for number, line in lines:
+        if line is None:
+            yield number, None, "Line too long"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            yield number, None, f"Invalid JSON: {error}"
+            continue
+        if not isinstance(record, dict):
+            yield number, None, "Expected a JSON object"
+            continue
+        if "type" in record and isinstance(record.get("data"), dict):
+            yield number, (record["type"], record["data"]), None
+        else:
+            yield number, (record.pop("type", default_type), record), None
+
+
+async def _csv_records(lines, default_type: str | None):
+    header = None
+    pending, start = [], 0
+    async for number, line in lines:
+        if line is None:
+            pending = []
+            yield number, None, "Line too long"
+            continue
+        if not pending:
+            start = number
+        pending.append(line)
+        # A quoted field can span lines; the record ends when the quotes balance
+        text = "\n".join(pending)
+        if text.count('"') % 2:
+            if len(text) > import_max_line_bytes:
+                pending = []
+                yield start, None, "Record too long"
+            continue
+        pending = []
+        if not text.strip():
+            continue
+
+        try:
+            row = next(csv.reader(io.StringIO(text)))
+        except csv.Error as error:
+            yield start, None, f"Invalid CSV: {error}"
+            continue
+        if header is None:
+            header = [name.strip() for name in row]
+            continue
+        if len(row) != len(header):
+            yield start, None, f"Expected {len(header)} fields, got {len(row)}"
+            continue
+
+        # Empty cells fall back to the schema defaults
+        record = {name: value for name, value in zip(header, row) if value != ""}
+        yield start, (record.pop("type", default_type), record), None
+
+
+def _format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+
+async def _insert_chunk(db, job: ImportJob, chunk: list[tuple[int, str, dict]]) -> None:
+    by_kind: dict[str, list[dict]] = {}
+    for _, kind, values in chunk:
+        by_kind.setdefault(kind, []).append({**values, "user_id": job.user_id})
+
+    versions = {}
+    try:
+        for kind, rows in by_kind.items():
+            model = IMPORTABLE[kind][0]
+            change_seq = versions[kind] = await bump_version(db, job.user_id, model)
+            await db.execute(insert(model.__table__), [{**row, "change_seq": change_seq} for row in rows])
+            deltas: dict[str, int] = {}
+            for row in rows:
+                counter = bucket(model, row)
+                deltas[counter] = deltas.get(counter, 0) + 1
+            await adjust_counters(db, job.user_id, deltas)
+        await db.commit()
+    except Exception as error:
+        await db.rollback()
+        for number, _, _ in chunk:
+            job.error(number, f"Not saved, the chunk failed: {error.__class__.__name__}")
+        return
+
+    for kind, rows in by_kind.items():
+        job.imported[kind] += len(rows)
+        await response_cache.invalidate(job.user_id, IMPORTABLE[kind][0])
+        await publish_change(job.user_id, IMPORTABLE[kind][0], versions[kind], imported=len(rows))
+
+
+async def run_import(db, job: ImportJob, body, *, gzipped: bool, default_type: str | None) -> ImportJob:
+    """
+    Read `body` (an async iterator of bytes) to the end and import it into
+    `job.user_id`'s account, one committed chunk at a time.
+    """
+    lines = _decoded_lines(body, gzipped)
+    if job.format == "csv":
+        records = _csv_records(lines, default_type)
+    else:
+        records = _ndjson_records(lines, default_type)
+
+    chunk: list[tuple[int, str, dict]] = []
+    try:
+        async for number, record, problem in records:
+            job.lines = number
+            if problem is not None:
+                job.error(number, problem)
+                continue
+
+            kind, data = record
+            if not isinstance(kind, str) or kind not in IMPORTABLE:
+                job.error(number, f"Unknown type {kind!r}, expected one of: {', '.join(IMPORTABLE)}")
+                continue
+            try:
+                values = IMPORTABLE[kind][1].model_validate(data).model_dump()
+            except ValidationError as error:
+                job.error(number, _format_validation_error(error))
+                continue
+
+            chunk.append((number, kind, values))
+            if len(chunk) >= import_chunk_size:
+                await _insert_chunk(db, job, chunk)
+                chunk = []
+
+        if chunk:
+            await _insert_chunk(db, job, chunk)
+        job.status = "finished"
+    except zlib.error:
+        job.error(job.lines + 1, "Body is not valid gzip")
+        job.status = "failed"
+    except BaseException:
+        # Client went away, server shutting down, ...; committed chunks stay
+        job.status = "failed"
+        raise
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+    return job
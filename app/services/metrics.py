@@ -0,0 +1,265 @@
+"""
+Prometheus metrics for GET /metrics.
+
+- http_requests_total{method, route, status}: requests by route template
+  (e.g. /tasks/{task_id}) and status class (2xx, 4xx, ...)
+- http_request_duration_seconds{method, route}: latency histogram
+- http_requests_in_flight: requests being handled right now
+- db_pool_*{engine}: the connection pool gauges and checkout counters of
+  GET /health/pool
+- password_hash_seconds{operation}: bcrypt time per hash / verify, and
+  password_hash_rejected_total for logins refused by a full hashing pool
+
+Recording a value is a dict update under an uncontended lock; nothing is
+formatted until /metrics is scraped.
+
+With several worker processes each one only sees its own requests, so set
+METRICS_DIR to a directory all of them can write (and empty it when the
+service starts). Every process then writes a snapshot of its metrics to
+`<pid>.json` there every METRICS_FLUSH_SECONDS, and /metrics adds up the
+files of all processes: counters and histograms of every process that ever
+ran, gauges of the ones still alive. Without METRICS_DIR, /metrics shows
+the answering process only.
+"""
+
+import json
+import os
+import threading
+
+from config.environment import metrics_dir, metrics_flush_seconds
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+HASH_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0)
+
+# name -> (type, help, histogram buckets)
+DEFINITIONS = {
+    "http_requests_total": ("counter", "HTTP requests by route template, method and status class.", None),
+    "http_request_duration_seconds": ("histogram", "HTTP request latency by route template and method.", REQUEST_BUCKETS),
+    "http_requests_in_flight": ("gauge", "HTTP requests being handled.", None),
+    "db_pool_size": ("gauge", "Connections the pool keeps open.", None),
+    "db_pool_checked_in": ("gauge", "Idle connections in the pool.", None),
+    "db_pool_checked_out": ("gauge", "Connections in use.", None),
+    "db_pool_overflow": ("gauge", "Connections opened above the pool size.", None),
+    "db_pool_checkouts_total": ("counter", "Successful connection checkouts.", None),
+    "db_pool_checkout_timeouts_total": ("counter", "Checkouts that timed out waiting for a connection.", None),
+    "db_pool_checkout_wait_seconds_total": ("counter", "Time spent waiting for connections.", None),
+    "password_hash_seconds": ("histogram", "bcrypt time per password hash or verify.", HASH_BUCKETS),
+    "password_hash_rejected_total": ("counter", "Password hashing jobs refused because the pool was full.", None),
+}
+
+
+def _key(name: str, labels: dict | None) -> tuple:
+    return name, tuple(sorted(labels.items())) if labels else ()
+
+
+class Registry:
+    """
+    This process's metric values.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+        # (name, labels) -> [count per bucket (the last one is +Inf), sum]
+        self._histograms: dict[tuple, list] = {}
+        # Called before every snapshot to set the values read from elsewhere
+        self._collectors = []
+
+    def inc(self, name: str, labels: dict | None = None, amount: float = 1) -> None:
+        key = _key(name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def set(self, name: str, labels: dict | None, value: float) -> None:
+        with self._lock:
+            self._values[_key(name, labels)] = value
+
+    def observe(self, name: str, labels: dict | None, value: float) -> None:
+        buckets = DEFINITIONS[name][2]
+        index = next((i for i, bound in enumerate(buckets) if value <= bound), len(buckets))
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [[0] * (len(buckets) + 1), 0.0]
+            histogram[0][index] += 1
+            histogram[1] += value
+
+    def add_collector(self, collector) -> None:
+        """
+        `collector(registry)` is called before every snapshot.
+        """
+        self._collectors.append(collector)
+
+    def snapshot(self) -> dict:
+        for collector in self._collectors:
+            collector(self)
+        with self._lock:
+            return {
+                "pid": os.getpid(),
+                "values": [[name, list(labels), value] for (name, labels), value in self._values.items()],
+                "histograms": [
+                    [name, list(labels), list(counts), total]
+                    for (name, labels), (counts, total) in self._histograms.items()
+                ],
+            }
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def merge(snapshots: list[dict]) -> tuple[dict, dict]:
+    """
+    Sum the snapshots of several processes: ({(name, labels): value},
+    {(name, labels): [bucket counts, sum]}). Gauges only count for live processes.
+    """
+    values: dict[tuple, float] = {}
+    histograms: dict[tuple, list] = {}
+    for snapshot in snapshots:
+        alive = snapshot["pid"] == os.getpid() or _alive(snapshot["pid"])
+        for name, labels, value in snapshot["values"]:
+            if name not in DEFINITIONS or (DEFINITIONS[name][0] == "gauge" and not alive):
+                continue
+            key = (name, tuple(tuple(label) for label in labels))
+            values[key] = values.get(key, 0) + value
+        for name, labels, counts, total in snapshot["histograms"]:
+            if name not in DEFINITIONS:
+                continue
+            key = (name, tuple(tuple(label) for label in labels))
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = [list(counts), total]
+            else:
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+    return values, histograms
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(labels, extra: tuple = ()) -> str:
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(values: dict, histograms: dict) -> str:
+    """
+    The text exposition format (version 0.0.4).
+    """
+    lines = []
+    for name, (kind, help_text, buckets) in DEFINITIONS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        if kind == "histogram":
+            for (series, labels), (counts, total) in sorted(histograms.items()):
+                if series != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*buckets, float("inf")), counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labels, (('le', _number(bound)),))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labels)} {_number(total)}")
+                lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+        else:
+            for (series, labels), value in sorted(values.items()):
+                if series == name:
+                    lines.append(f"{name}{_labels(labels)} {_number(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class Metrics:
+    """
+    The registry plus, with METRICS_DIR, the thread that writes its snapshots.
+    """
+
+    def __init__(self, directory: str | None, flush_seconds: float):
+        self.registry = Registry()
+        self.directory = directory
+        self.flush_seconds = flush_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _path(self, pid: int) -> str:
+        return os.path.join(self.directory, f"{pid}.json")
+
+    def flush(self) -> dict:
+        """
+        Write this process's snapshot (if METRICS_DIR is set) and return it.
+        """
+        snapshot = self.registry.snapshot()
+        if self.directory:
+            # Also when scraped before start(), e.g. without a lifespan
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(snapshot["pid"])
+            temporary = f"{path}.tmp"
+            with open(temporary, "w") as file:
+                json.dump(snapshot, file)
+            os.replace(temporary, path)
+        return snapshot
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            self.flush()
+
+    def start(self) -> None:
+        """
+        Start writing snapshots (with METRICS_DIR). Safe to call more than
+        once, and again after `stop()`.
+        """
+        if not self.directory or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.flush()
+
+    def _snapshots(self, own: dict) -> list[dict]:
+        snapshots = [own]
+        if not self.directory:
+            return snapshots
+        for entry in os.scandir(self.directory):
+            if not entry.name.endswith(".json") or entry.name == f"{own['pid']}.json":
+                continue
+            try:
+                with open(entry.path) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                # Being replaced right now; the next scrape reads it
+                continue
+        return snapshots
+
+    def exposition(self) -> str:
+        """
+        The /metrics body, over all processes.
+        """
+        return render(*merge(self._snapshots(self.flush())))
+
+
+metrics = Metrics(metrics_dir, metrics_flush_seconds)
+
+
+def status_class(status_code: int) -> str:
+    return f"{status_code // 100}xx"
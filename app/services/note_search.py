@@ -0,0 +1,190 @@
+"""
+Full-text search over a user's notes (GET /notes/search).
+
+Finding a note used to mean downloading all of them and filtering on the
+client. The search runs against the full-text index declared next to the
+Note model (FTS5 on SQLite, a tsvector column with a GIN index on Postgres),
+in two steps:
+
+1. rank every match of the query for this user and take one page of ids,
+   ordered by (sort_key, id); sort_key is the negated score, so the best
+   match comes first and the cursor works like the list endpoints' cursor
+2. highlight only the notes on that page: title with the matches marked and
+   a short snippet of the content around them
+
+Highlighting is the expensive part, so it never runs for rows that are not
+returned. The database marks the matches with control characters; the text
+is then HTML-escaped and only those markers become `<mark>` / `</mark>`, so
+clients can insert the result as HTML without note content being able to
+inject markup.
+"""
+
+import html
+import re
+
+from fastapi import HTTPException, status
+from sqlalchemy import column, func, literal_column, select, table, tuple_
+
+from app.models.note import Note
+from app.services.pagination import clamp_limit, decode_cursor, encode_cursor
+
+MARK_START = "<mark>"
+MARK_END = "</mark>"
+# What the database puts around matches: control characters that html.escape
+# keeps. The same characters in a note can at worst add <mark> tags, never
+# other markup.
+MATCH_START = "\x02"
+MATCH_END = "\x03"
+SNIPPET_ELLIPSIS = "…"
+SNIPPET_WORDS = 16
+
+# Must match the configuration of the generated column in app/models/note.py
+POSTGRES_CONFIG = "english"
+POSTGRES_HEADLINE_OPTIONS = (
+    f'StartSel="{MATCH_START}", StopSel="{MATCH_END}", FragmentDelimiter={SNIPPET_ELLIPSIS}, '
+    f"MaxFragments=2, MaxWords={SNIPPET_WORDS}, MinWords=5"
+)
+# Title matches count ten times as much as content matches
+SQLITE_WEIGHTS = (10.0, 1.0)
+
+notes_fts = table("notes_fts", column("rowid"))
+fts_table = literal_column("notes_fts")
+
+
+def marked_html(highlighted: str) -> str:
+    """
+    HTML for text the database highlighted with MATCH_START / MATCH_END.
+    """
+    escaped = html.escape(highlighted, quote=False)
+    return escaped.replace(MATCH_START, MARK_START).replace(MATCH_END, MARK_END)
+
+
+def fts5_query(q: str) -> str | None:
+    """
+    Turn free text into a safe FTS5 query in which every word must appear,
+    like websearch_to_tsquery on Postgres. Words are matched after stemming,
+    not as prefixes: a short prefix can expand to thousands of index terms.
+    None if there are no words.
+    """
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words)
+
+
+def _ranked_sqlite(user_id: int, match: str):
+    # bm25() is lower for better matches, so it is already an ascending sort key
+    sort_key = func.bm25(fts_table, *SQLITE_WEIGHTS)
+    return (
+        select(Note.id.label("id"), sort_key.label("sort_key"))
+        .select_from(notes_fts.join(Note, Note.id == notes_fts.c.rowid))
+        .where(fts_table.op("MATCH")(match), Note.user_id == user_id)
+    )
+
+
+def _highlighted_sqlite(ids: list[int], match: str):
+    return (
+        select(
+            Note.id,
+            Note.created_at,
+            Note.updated_at,
+            func.highlight(fts_table, 0, MATCH_START, MATCH_END).label("title_highlight"),
+            func.coalesce(
+                func.snippet(fts_table, 1, MATCH_START, MATCH_END, SNIPPET_ELLIPSIS, SNIPPET_WORDS), ""
+            ).label("snippet"),
+        )
+        .select_from(notes_fts.join(Note, Note.id == notes_fts.c.rowid))
+        .where(fts_table.op("MATCH")(match), notes_fts.c.rowid.in_(ids))
+    )
+
+
+def _search_vector():
+    return literal_column("notes.search_vector")
+
+
+def _ts_query(q: str):
+    return func.websearch_to_tsquery(POSTGRES_CONFIG, q)
+
+
+def _ranked_postgres(user_id: int, q: str):
+    sort_key = -func.ts_rank_cd(_search_vector(), _ts_query(q))
+    return select(Note.id.label("id"), sort_key.label("sort_key")).where(
+        Note.user_id == user_id, _search_vector().op("@@")(_ts_query(q))
+    )
+
+
+def _highlighted_postgres(ids: list[int], q: str):
+    def headline(text):
+        return func.ts_headline(POSTGRES_CONFIG, func.coalesce(text, ""), _ts_query(q), POSTGRES_HEADLINE_OPTIONS)
+
+    return select(
+        Note.id,
+        Note.created_at,
+        Note.updated_at,
+        headline(Note.title).label("title_highlight"),
+        headline(Note.content).label("snippet"),
+    ).where(Note.id.in_(ids))
+
+
+async def search_notes(db, user_id: int, q: str, limit: int, after: str | None = None):
+    """
+    One page of `user_id`'s notes matching `q`, best first.
+
+    Returns (hits, next_cursor); each hit is a dict with id, title_highlight,
+    snippet, score, created_at and updated_at.
+    """
+    limit = clamp_limit(limit)
+    dialect_name = db.get_bind().dialect.name
+
+    if dialect_name == "sqlite":
+        match = fts5_query(q)
+        if match is None:
+            return [], None
+        ranked = _ranked_sqlite(user_id, match).subquery()
+    elif dialect_name == "postgresql":
+        match = q
+        ranked = _ranked_postgres(user_id, q).subquery()
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail="Search is not available on this database",
+        )
+
+    page = select(ranked.c.id, ranked.c.sort_key)
+    if after is not None:
+        sort_key, note_id = decode_cursor(after, float)
+        page = page.where(tuple_(ranked.c.sort_key, ranked.c.id) > tuple_(sort_key, note_id))
+    page = page.order_by(ranked.c.sort_key, ranked.c.id).limit(limit + 1)
+    ranks = (await db.execute(page)).all()
+
+    next_cursor = None
+    if len(ranks) > limit:
+        ranks = ranks[:limit]
+        next_cursor = encode_cursor(ranks[-1].sort_key, ranks[-1].id)
+    if not ranks:
+        return [], None
+
+    ids = [row.id for row in ranks]
+    if dialect_name == "sqlite":
+        highlighted = _highlighted_sqlite(ids, match)
+    else:
+        highlighted = _highlighted_postgres(ids, match)
+    details = {row.id: row for row in (await db.execute(highlighted)).all()}
+
+    hits = []
+    for row in ranks:
+        detail = details.get(row.id)
+        if detail is None:
+            # Deleted between the two queries
+            continue
+        hits.append(
+            {
+                "id": row.id,
+                "title_highlight": marked_html(detail.title_highlight),
+                "snippet": marked_html(detail.snippet),
+                "score": round(-row.sort_key, 6),
+                "created_at": detail.created_at,
+                "updated_at": detail.updated_at,
+            }
+        )
+    return hits, next_cursor
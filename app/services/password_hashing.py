@@ -0,0 +1,168 @@
+"""
+Password hashing for the Personal Productivity Dashboard.
+
+bcrypt is deliberately slow (~250ms of CPU per call at the default cost).
+Running it in the request handlers used up the threads that every other
+endpoint shares, so a burst of logins stalled tasks, habits and notes.
+
+The async helpers here run hashing in a dedicated process pool instead:
+- `HASH_WORKERS` processes, so several logins use several cores
+- at most `HASH_QUEUE_LIMIT` jobs waiting or running; past that we refuse
+  quickly (`HashingPoolBusy`) instead of letting the backlog grow
+- `BCRYPT_ROUNDS` sets the cost; when it changes, `verify_password_async`
+  hands back a new hash so the stored one can be upgraded at login
+- if a worker dies, the pool is broken for good; it is replaced and the job
+  retried once, and if that fails too we refuse with `HashingPoolBroken`
+"""
+
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from passlib.context import CryptContext
+
+from app.services.metrics import metrics
+from config.environment import bcrypt_rounds, hash_queue_limit, hash_workers
+
+# min_rounds == max_rounds: a stored hash with any other cost "needs update"
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=bcrypt_rounds,
+    bcrypt__min_rounds=bcrypt_rounds,
+    bcrypt__max_rounds=bcrypt_rounds,
+)
+
+
+class HashingPoolBusy(Exception):
+    """
+    Raised when `HASH_QUEUE_LIMIT` hashing jobs are already waiting or running.
+    """
+
+
+class HashingPoolBroken(HashingPoolBusy):
+    """
+    Raised when the job failed in a fresh pool too, because its workers keep dying.
+    """
+
+
+def _hash_password(password: str) -> tuple[str, float]:
+    started = time.perf_counter()
+    return pwd_context.hash(password), time.perf_counter() - started
+
+
+def _verify_and_update(password: str, password_hash: str) -> tuple[bool, str | None, float]:
+    started = time.perf_counter()
+    verified, new_hash = pwd_context.verify_and_update(password, password_hash)
+    return verified, new_hash, time.perf_counter() - started
+
+
+# Label of each job in the password_hash_seconds metric
+OPERATIONS = {_hash_password: "hash", _verify_and_update: "verify"}
+
+
+class HashingPool:
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = None
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.busy_seconds = 0.0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # "spawn": forking a process that already runs threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Forget a broken executor, unless another job already replaced it.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func, *args):
+        with self._lock:
+            if self.pending >= self.queue_limit:
+                self.rejected += 1
+                metrics.registry.inc("password_hash_rejected_total")
+                raise HashingPoolBusy()
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+
+        try:
+            loop = asyncio.get_running_loop()
+            for retry in (False, True):
+                executor = self._get_executor()
+                try:
+                    *result, elapsed = await loop.run_in_executor(executor, func, *args)
+                    break
+                except BrokenProcessPool:
+                    # A worker died; the executor refuses every job from now on
+                    self._discard(executor)
+                    if retry:
+                        raise HashingPoolBroken() from None
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+        with self._lock:
+            self.completed += 1
+            self.busy_seconds += elapsed
+        metrics.registry.observe("password_hash_seconds", {"operation": OPERATIONS.get(func, func.__name__)}, elapsed)
+        return result
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self.pending,
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_hash_seconds": round(self.busy_seconds / self.completed, 4) if self.completed else 0.0,
+                "bcrypt_rounds": bcrypt_rounds,
+            }
+
+
+hashing_pool = HashingPool(workers=hash_workers, queue_limit=hash_queue_limit)
+
+
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a plain-text password in the hashing pool.
+    """
+    (password_hash,) = await hashing_pool.run(_hash_password, password)
+    return password_hash
+
+
+async def verify_password_async(password: str, password_hash: str) -> tuple[bool, str | None]:
+    """
+    Check a password in the hashing pool.
+
+    Returns (verified, new_hash). `new_hash` is set when the password is
+    correct but the stored hash uses a different bcrypt cost than `BCRYPT_ROUNDS`.
+    """
+    verified, new_hash = await hashing_pool.run(_verify_and_update, password, password_hash)
+    return verified, new_hash
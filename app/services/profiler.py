@@ -0,0 +1,184 @@
+"""
+On-demand profiling of a single request.
+
+A slow endpoint in production could not be profiled without redeploying.
+Now a request that carries a valid `X-Profile-Token` header runs with a
+sampling profiler: a thread records the stacks of the server's threads every
+PROFILE_INTERVAL_MS while the request runs, and writes them as collapsed
+stacks (`thread;outer;...;inner count` per line), which flamegraph.pl,
+speedscope and most flame graph viewers read directly. Next to each
+`.collapsed` file a `.json` file has the request id, method, path, route
+template, status and total time. Only the newest PROFILE_KEEP profiles are
+kept in PROFILE_DIR.
+
+The token is `<expiry unix time>.<HMAC-SHA256 of the expiry with
+PROFILE_SECRET>`; `python3 profile_token.py` makes one. The response of a
+profiled request has an `X-Profile-Id` header naming its files.
+
+Cost: without PROFILE_SECRET the middleware is not installed at all; with
+it, a request without the header costs one header lookup. One request is
+profiled at a time. The event loop thread is sampled as a whole, so
+requests running concurrently with the profiled one show up in its profile
+too; other threads are only recorded while they are not idle.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+
+from config.environment import profile_dir, profile_interval_ms, profile_keep, profile_secret
+
+TOKEN_HEADER = b"x-profile-token"
+
+# Innermost frames in these files mean the thread is waiting, not working
+_IDLE_FILES = ("threading.py", "queue.py", "selectors.py")
+
+
+def sign_token(secret: str, expires: int) -> str:
+    signature = hmac.new(secret.encode(), str(expires).encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{signature}"
+
+
+def verify_token(secret: str, token: str) -> bool:
+    expires, _, _ = token.partition(".")
+    if not expires.isdigit() or int(expires) < time.time():
+        return False
+    return hmac.compare_digest(sign_token(secret, int(expires)), token)
+
+
+class StackSampler:
+    """
+    Counts the collapsed stacks of every thread but its own, sampled every
+    `interval` seconds until `stop()`.
+    """
+
+    def __init__(self, interval: float, busy_thread_id: int):
+        self.interval = interval
+        self.busy_thread_id = busy_thread_id
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._labels: dict = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_qualname} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _sample(self) -> None:
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        own = threading.get_ident()
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == own:
+                continue
+            if thread_id != self.busy_thread_id and frame.f_code.co_filename.endswith(_IDLE_FILES):
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame.f_code))
+                frame = frame.f_back
+            stack.append(names.get(thread_id, f"thread-{thread_id}"))
+            self.stacks[";".join(reversed(stack))] += 1
+        self.samples += 1
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _write_profile(directory: str, name: str, collapsed: str, info: dict, keep: int) -> None:
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, f"{name}.collapsed"), "w") as file:
+        file.write(collapsed)
+    with open(os.path.join(directory, f"{name}.json"), "w") as file:
+        json.dump(info, file, indent=2)
+
+    # Names start with the UTC time, so they sort oldest first
+    profiles = sorted(entry[: -len(".json")] for entry in os.listdir(directory) if entry.endswith(".json"))
+    for old in profiles[: max(0, len(profiles) - keep)]:
+        for suffix in (".collapsed", ".json"):
+            try:
+                os.remove(os.path.join(directory, old + suffix))
+            except FileNotFoundError:
+                pass
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware that profiles requests with a valid X-Profile-Token.
+    """
+
+    def __init__(self, app, secret: str = profile_secret):
+        self.app = app
+        self.secret = secret
+        self.active = False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = next((value for key, value in scope["headers"] if key == TOKEN_HEADER), None)
+        if token is None or self.active or not verify_token(self.secret, token.decode("latin-1")):
+            await self.app(scope, receive, send)
+            return
+
+        self.active = True
+        try:
+            await self._profile(scope, receive, send)
+        finally:
+            self.active = False
+
+    async def _profile(self, scope, receive, send):
+        started_at = datetime.now(timezone.utc)
+        request_id = uuid.uuid4().hex[:12]
+        name = f"{started_at:%Y%m%dT%H%M%S.%fZ}-{request_id}"
+        status_code = None
+
+        async def send_with_id(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", name.encode())]}
+            await send(message)
+
+        sampler = StackSampler(profile_interval_ms / 1000, threading.get_ident())
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            total = time.perf_counter() - started
+            sampler.stop()
+            route = scope.get("route")
+            info = {
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": route.path if route is not None else None,
+                "status": status_code,
+                "started_at": started_at.isoformat(),
+                "total_ms": round(total * 1000, 3),
+                "samples": sampler.samples,
+                "interval_ms": profile_interval_ms,
+            }
+            await asyncio.to_thread(_write_profile, profile_dir, name, sampler.collapsed(), info, profile_keep)
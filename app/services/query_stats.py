@@ -0,0 +1,100 @@
+"""
+Number of SQL statements and database time per request.
+
+Nobody could tell how many statements an endpoint runs, so an N+1 (say,
+touching the `user` backref of every task in a list) went unnoticed until
+it was slow. Every engine in database.py now has cursor-execute listeners
+that add each statement and its duration to the current request's
+`QueryStats`. The request middleware starts one per request and reports it
+in the `Server-Timing` header (visible in the browser's network panel) and
+in the request log line, and logs a warning when a request runs more than
+QUERY_WARN_COUNT statements or spends more than QUERY_WARN_MS in them.
+
+The stats live in a context variable, which follows the request into
+SQLAlchemy's async greenlets and into the threadpool in sync mode.
+Statements run outside a request are not counted.
+"""
+
+import logging
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+
+from config.environment import query_warn_count, query_warn_ms
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    __slots__ = ("count", "seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    @property
+    def milliseconds(self) -> float:
+        return round(self.seconds * 1000, 3)
+
+    def fields(self) -> dict:
+        return {"db_queries": self.count, "db_ms": self.milliseconds}
+
+    def warn_if_over(self, method: str, route: str) -> None:
+        if self.count > query_warn_count or self.milliseconds > query_warn_ms:
+            logger.warning(
+                "request over the query budget",
+                extra={
+                    "method": method,
+                    "route": route,
+                    **self.fields(),
+                    "warn_count": query_warn_count,
+                    "warn_ms": query_warn_ms,
+                },
+            )
+
+    def server_timing(self, total_seconds: float) -> str:
+        """
+        The Server-Timing header value: database time and count, and the total.
+        """
+        return (
+            f'db;dur={self.milliseconds};desc="{self.count} queries", '
+            f"total;dur={round(total_seconds * 1000, 3)}"
+        )
+
+
+_current: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+def start_request() -> QueryStats:
+    """
+    Count the statements of the current request (and the tasks it starts) in
+    a new QueryStats.
+    """
+    stats = QueryStats()
+    _current.set(stats)
+    return stats
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and _current.get() is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current.get()
+    if stats is None:
+        return
+    stats.count += 1
+    started = getattr(context, "_query_started", None)
+    if started is not None:
+        stats.seconds += time.perf_counter() - started
+
+
+def instrument_queries(engine) -> None:
+    """
+    Count the statements `engine` (a sync Engine, or an AsyncEngine's
+    `sync_engine`) runs.
+    """
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
@@ -0,0 +1,210 @@
+"""
+Logging that stays off the event loop, and the per-request log line.
+
+Every log call used to format its line and write it to stderr on the
+calling thread, which for the request middleware and the auth routes is the
+event loop. Now the root logger has a single `QueueHandler`: a log call only
+merges the message and puts the record on a queue. A `QueueListener` thread
+formats the records (JSON or text) and writes them.
+
+If the writer cannot keep up and LOG_QUEUE_SIZE records are waiting, new
+records are dropped and counted (`stats()`) instead of blocking requests.
+
+Requests get one line each, with method, path, status and duration
+(measured with `time.perf_counter`). Successful requests can be sampled
+with LOG_SAMPLE_RATE; failed ones (status 400 and up, or an exception) and
+ones slower than LOG_SLOW_REQUEST_MS are always logged.
+"""
+
+import json
+import logging
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from config.environment import (
+    log_format,
+    log_level,
+    log_queue_size,
+    log_sample_rate,
+    log_slow_request_ms,
+)
+
+logger = logging.getLogger("app.requests")
+
+# Attributes every LogRecord has; anything else came in through `extra`
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+def _extra_fields(record: logging.LogRecord) -> dict:
+    return {key: value for key, value in record.__dict__.items() if key not in _RECORD_ATTRIBUTES}
+
+
+class TextFormatter(logging.Formatter):
+    """
+    The classic one-line format, with the `extra=` fields appended as key=value.
+    """
+
+    def __init__(self):
+        super().__init__(TEXT_FORMAT)
+
+    def formatMessage(self, record: logging.LogRecord) -> str:
+        line = super().formatMessage(record)
+        fields = _extra_fields(record)
+        if fields:
+            line += " " + " ".join(f"{key}={value}" for key, value in fields.items())
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    One JSON object per record: time, level, logger, message, the fields
+    passed with `extra=` and the traceback, if any.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(_extra_fields(record))
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    A QueueHandler that never blocks: when the queue is full the record is
+    dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the arguments into the message, so they cannot change
+        # before the record is written. The queue never leaves the process,
+        # so the traceback is kept and formatted by the listener thread.
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LogPipeline:
+    """
+    The root logger's queue handler and the thread that writes its records.
+    """
+
+    def __init__(self):
+        self.handler: DroppingQueueHandler | None = None
+        self.listener: QueueListener | None = None
+        self.output: logging.Handler | None = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """
+        Route all logging through the queue. Safe to call more than once.
+        """
+        with self._lock:
+            if self.listener is not None:
+                return
+            output = self.output = logging.StreamHandler(sys.stderr)
+            output.setFormatter(JsonFormatter() if log_format == "json" else TextFormatter())
+
+            log_queue: queue.Queue = queue.Queue(maxsize=log_queue_size)
+            self.handler = DroppingQueueHandler(log_queue)
+            root = logging.getLogger()
+            for handler in list(root.handlers):
+                root.removeHandler(handler)
+            root.addHandler(self.handler)
+            root.setLevel(log_level)
+
+            # Uvicorn's loggers write to their own stream handlers; send them
+            # through the queue too
+            for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+                uvicorn_logger = logging.getLogger(name)
+                uvicorn_logger.handlers.clear()
+                uvicorn_logger.propagate = True
+
+            self.listener = QueueListener(log_queue, output, respect_handler_level=True)
+            self.listener.start()
+
+    def stop(self) -> None:
+        """
+        Write out what is still queued and stop the writer thread. Until the
+        next `start()`, the root logger writes directly again.
+        """
+        with self._lock:
+            if self.listener is not None:
+                root = logging.getLogger()
+                root.removeHandler(self.handler)
+                self.listener.stop()
+                self.listener = None
+                root.addHandler(self.output)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.listener is not None,
+            "queued": self.handler.queue.qsize() if self.handler is not None else 0,
+            "queue_size": log_queue_size,
+            "dropped": self.handler.dropped if self.handler is not None else 0,
+            "sample_rate": log_sample_rate,
+            "slow_request_ms": log_slow_request_ms,
+        }
+
+
+log_pipeline = LogPipeline()
+
+
+def log_request(
+    method: str,
+    path: str,
+    status_code: int,
+    duration: float,
+    client: str,
+    error: BaseException | None = None,
+    extra: dict | None = None,
+) -> None:
+    """
+    The log line for one request; `duration` is in seconds and `extra` adds
+    fields. Successful, fast requests are sampled.
+    """
+    duration_ms = round(duration * 1000, 3)
+    slow = duration_ms >= log_slow_request_ms
+    failed = error is not None or status_code >= 400
+    if not (failed or slow) and log_sample_rate < 1 and random.random() >= log_sample_rate:
+        return
+
+    fields = {
+        "method": method,
+        "path": path,
+        "status": status_code,
+        "duration_ms": duration_ms,
+        "client": client,
+        **(extra or {}),
+    }
+    if error is not None:
+        logger.error("request failed: %s", error, exc_info=error, extra=fields)
+    elif status_code >= 500:
+        logger.error("request", extra=fields)
+    elif slow:
+        logger.warning("slow request", extra=fields)
+    else:
+        logger.info("request", extra=fields)
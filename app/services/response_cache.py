@@ -0,0 +1,283 @@
+"""
+Cache of serialized list responses (GET /tasks/, /habits/, /notes/).
+
+Lists are read far more often than they are written, and every read used to
+load the rows and serialize them again. Now the finished JSON bytes are kept
+per (user, resource, query) and served as they are.
+
+Keys include the list's ETag, which contains the user's version counter for
+that resource (app/services/etags.py). A write anywhere bumps the counter,
+so no worker can serve an entry from before the write. The write handlers
+also call `invalidate` so the dead entries free their memory right away.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- memory (default): this process only, LRU within RESPONSE_CACHE_MAX_BYTES
+- shared: any store with async get/set (`SharedStore`), shared by every
+  worker. `LocalSharedStore` is an in-process stand-in for development;
+  production would plug in e.g. a Redis client with the same two methods.
+  Entries expire after RESPONSE_CACHE_TTL seconds, and `invalidate` is left
+  to that expiry because the versioned keys are already unreachable.
+- off: nothing is cached
+"""
+
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+from config.environment import (
+    response_cache_backend,
+    response_cache_max_bytes,
+    response_cache_ttl,
+)
+
+
+class _LRUBytes:
+    """
+    An LRU map of str -> bytes bounded by the total size of keys and values.
+    `on_remove(key)` is called for every entry that goes, after the lock is
+    released, so it may take locks of its own.
+    """
+
+    def __init__(self, max_bytes: int, on_remove=None):
+        self.max_bytes = max_bytes
+        self.on_remove = on_remove
+        self._entries: OrderedDict[str, tuple[float | None, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def _size(key: str, value: bytes) -> int:
+        return len(key) + len(value)
+
+    def get(self, key: str) -> bytes | None:
+        removed = []
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is not None and expires_at <= time.monotonic():
+                    self._remove(key, removed)
+                    entry = None
+                else:
+                    self._entries.move_to_end(key)
+        self._removed(removed)
+        return entry[1] if entry is not None else None
+
+    def set(self, key: str, value: bytes, ttl: float | None = None) -> bool:
+        """
+        Store `value`; False if it is too large to be cached.
+        """
+        # One entry may not take more than a quarter of the budget
+        if self._size(key, value) * 4 > self.max_bytes:
+            return False
+        expires_at = time.monotonic() + ttl if ttl else None
+        removed = []
+        with self._lock:
+            # Replacing a value is not a removal: on_remove would forget the key
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= self._size(key, entry[1])
+            self._entries[key] = (expires_at, value)
+            self.bytes += self._size(key, value)
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest, removed)
+                self.evictions += 1
+        self._removed(removed)
+        return True
+
+    def delete(self, key: str) -> None:
+        removed = []
+        with self._lock:
+            self._remove(key, removed)
+        self._removed(removed)
+
+    def _remove(self, key: str, removed: list) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= self._size(key, entry[1])
+            removed.append(key)
+
+    def _removed(self, keys: list) -> None:
+        if self.on_remove is not None:
+            for key in keys:
+                self.on_remove(key)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class MemoryBackend:
+    def __init__(self, max_bytes: int):
+        self._store = _LRUBytes(max_bytes, on_remove=self._forget)
+        # (user_id, resource) -> keys, so a write can drop that list's pages
+        self._groups: dict[tuple[int, str], set[str]] = {}
+        self._key_groups: dict[str, tuple[int, str]] = {}
+        self._lock = threading.Lock()
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            group = self._key_groups.pop(key, None)
+            keys = self._groups.get(group)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._groups[group]
+
+    async def get(self, key: str) -> bytes | None:
+        return self._store.get(key)
+
+    async def set(self, group: tuple[int, str], key: str, value: bytes) -> None:
+        # Not stored if it was too large for the budget
+        if self._store.set(key, value):
+            with self._lock:
+                self._groups.setdefault(group, set()).add(key)
+                self._key_groups[key] = group
+
+    async def invalidate(self, group: tuple[int, str]) -> None:
+        with self._lock:
+            keys = self._groups.pop(group, ())
+        for key in keys:
+            self._store.delete(key)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._store),
+            "bytes": self._store.bytes,
+            "max_bytes": self._store.max_bytes,
+            "evictions": self._store.evictions,
+        }
+
+
+class SharedStore(ABC):
+    """
+    What the shared backend needs from a store. Values are bytes; `ttl` is in
+    seconds. A Redis client satisfies this with `get` and `set(key, value, ex=ttl)`
+    behind a thin wrapper.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes | None: ...
+
+    @abstractmethod
+    async def set(self, key: str, value: bytes, ttl: float) -> None: ...
+
+
+class LocalSharedStore(SharedStore):
+    """
+    In-process stand-in for a shared store, for development and single-worker runs.
+    """
+
+    def __init__(self, max_bytes: int):
+        self._store = _LRUBytes(max_bytes)
+
+    async def get(self, key: str) -> bytes | None:
+        return self._store.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._store.set(key, value, ttl)
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._store),
+            "bytes": self._store.bytes,
+            "max_bytes": self._store.max_bytes,
+            "evictions": self._store.evictions,
+        }
+
+
+class SharedBackend:
+    def __init__(self, store: SharedStore, ttl: float):
+        self.store = store
+        self.ttl = ttl
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.store.get(key)
+
+    async def set(self, group: tuple[int, str], key: str, value: bytes) -> None:
+        await self.store.set(key, value, self.ttl)
+
+    async def invalidate(self, group: tuple[int, str]) -> None:
+        # Keys carry the resource version; stale ones are unreachable and expire
+        return None
+
+    def stats(self) -> dict:
+        stats = {"ttl_seconds": self.ttl}
+        if hasattr(self.store, "stats"):
+            stats.update(self.store.stats())
+        return stats
+
+
+class ResponseCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def key(user_id: int, model, etag: str) -> str:
+        tag = etag.strip('"')
+        return f"list:{user_id}:{model.__tablename__}:{tag}"
+
+    async def get(self, key: str) -> bytes | None:
+        if self.backend is None:
+            return None
+        value = await self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    async def set(self, user_id: int, model, key: str, value: bytes) -> None:
+        if self.backend is not None:
+            await self.backend.set((user_id, model.__tablename__), key, value)
+
+    async def invalidate(self, user_id: int, model) -> None:
+        """
+        Drop the cached pages of this user's list of `model`. Call after a
+        write to it has been committed.
+        """
+        if self.backend is None:
+            return
+        await self.backend.invalidate((user_id, model.__tablename__))
+        with self._lock:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            stats = {
+                "backend": response_cache_backend,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+            }
+        if self.backend is not None:
+            stats.update(self.backend.stats())
+        return stats
+
+
+def _create_backend():
+    if response_cache_backend == "off":
+        return None
+    if response_cache_backend == "memory":
+        return MemoryBackend(response_cache_max_bytes)
+    if response_cache_backend == "shared":
+        return SharedBackend(LocalSharedStore(response_cache_max_bytes), response_cache_ttl)
+    raise ValueError(
+        f"RESPONSE_CACHE_BACKEND must be 'memory', 'shared' or 'off', got {response_cache_backend!r}"
+    )
+
+
+response_cache = ResponseCache(_create_backend())
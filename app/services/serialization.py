@@ -0,0 +1,126 @@
+"""
+JSON serialization of the Read schemas for the list, export and sync paths.
+
+Turning rows into JSON used to cost more CPU than the query: every row was
+validated into a TaskRead / HabitRead / NoteRead, then dumped. The rows come
+straight from our own tables, so there is nothing to validate on the way out.
+
+SERIALIZATION_MODE:
+- fast (default): the schema's fields are read from each row (ORM object,
+  Core row or dict) and dumped with orjson, without building a Pydantic
+  model. Produces the same JSON as the schema for the column types we use
+  (str, int, bool, date, datetime, None).
+- validated: each value is validated with a cached `TypeAdapter` and dumped
+  to JSON bytes by pydantic-core. Used when orjson is not installed.
+
+Single-item responses keep going through the route's `response_model`,
+which FastAPI already validates once and dumps to bytes with pydantic-core.
+benchmark_serialization.py compares the paths.
+"""
+
+import functools
+import typing
+from collections.abc import Mapping
+
+from pydantic import TypeAdapter
+
+from config.environment import serialization_mode
+
+try:
+    import orjson
+except ImportError:  # optional; falls back to the validated mode
+    orjson = None
+
+FAST = serialization_mode == "fast" and orjson is not None
+
+
+@functools.cache
+def type_adapter(tp) -> TypeAdapter:
+    """
+    One TypeAdapter per type: building one compiles a validator and a
+    serializer, which is far more expensive than using it.
+    """
+    return TypeAdapter(tp)
+
+
+@functools.cache
+def _field_names(schema) -> tuple[str, ...]:
+    return tuple(schema.model_fields)
+
+
+@functools.cache
+def _defaults(schema) -> dict:
+    return {
+        name: field.default
+        for name, field in schema.model_fields.items()
+        if not field.is_required()
+    }
+
+
+def item_schema(page_schema):
+    # items: list[TaskRead] -> TaskRead
+    return typing.get_args(page_schema.model_fields["items"].annotation)[0]
+
+
+def plain(schema, item) -> dict:
+    """
+    `item`'s values for the fields of `schema`, as a dict. `item` is an ORM
+    object, a Core row or a mapping and is trusted to have the right types.
+    """
+    if isinstance(item, Mapping):
+        values = item
+    elif hasattr(item, "_mapping"):
+        values = item._mapping
+    else:
+        # Loaded column values live in the instance dict; reading them there
+        # skips the ORM attribute machinery
+        values = item.__dict__
+    defaults = _defaults(schema)
+    result = {}
+    for name in _field_names(schema):
+        if name in values:
+            result[name] = values[name]
+        elif name in defaults:
+            result[name] = defaults[name]
+        else:
+            result[name] = getattr(item, name)
+    return result
+
+
+def dumps(value) -> bytes:
+    """
+    JSON bytes for plain data (dicts, lists, str, numbers, dates).
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return type_adapter(typing.Any).dump_json(value)
+
+
+def dump_json(tp, value) -> bytes:
+    """
+    JSON bytes for `value` as type `tp` (e.g. a response schema). In fast
+    mode `value` must already be plain data, e.g. built with `plain`.
+    """
+    if FAST:
+        return orjson.dumps(value)
+    adapter = type_adapter(tp)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def dump_page(page_schema, items, next_cursor) -> bytes:
+    """
+    JSON bytes for one list page, as the route's response_model would produce.
+    """
+    if FAST:
+        schema = item_schema(page_schema)
+        return orjson.dumps({"items": [plain(schema, item) for item in items], "next_cursor": next_cursor})
+    adapter = type_adapter(page_schema)
+    page = adapter.validate_python({"items": items, "next_cursor": next_cursor}, from_attributes=True)
+    return adapter.dump_json(page)
+
+
+def dump_item(schema, item) -> bytes:
+    """
+    JSON bytes for one row serialized as `schema`.
+    """
+    return dump_json(schema, plain(schema, item) if FAST else item)
@@ -0,0 +1,78 @@
+"""
+SQLite high-concurrency profile (SQLITE_PROFILE=concurrent, the default).
+
+Without it, concurrent writes from the request workers fail with "database is
+locked" and reads wait behind writes. The profile:
+- puts the database in WAL mode, so readers never block the writer or each other
+- sets synchronous=NORMAL, busy_timeout, mmap_size, cache_size and temp_store
+  on every new connection
+- sends every write through one dedicated writer connection (a pool of size 1),
+  so writes queue up in the pool instead of fighting over the database lock,
+  while reads are served by the normal reader pool
+"""
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import UpdateBase
+
+from config.environment import (
+    sqlite_busy_timeout_ms,
+    sqlite_cache_size_kib,
+    sqlite_mmap_size,
+)
+
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA busy_timeout={sqlite_busy_timeout_ms}",
+    f"PRAGMA mmap_size={sqlite_mmap_size}",
+    # A negative cache_size is in KiB rather than pages
+    f"PRAGMA cache_size=-{sqlite_cache_size_kib}",
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _apply_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for pragma in PRAGMAS:
+            cursor.execute(pragma)
+    finally:
+        cursor.close()
+
+
+def enable_sqlite_pragmas(engine) -> None:
+    """
+    Run the profile's PRAGMAs on every connection `engine` opens. For an
+    AsyncEngine, pass `async_engine.sync_engine`.
+    """
+    event.listen(engine, "connect", _apply_pragmas)
+
+
+class RoutingSession(Session):
+    """
+    A Session that flushes and runs INSERT/UPDATE/DELETE on the writer engine
+    and everything else on the reader engine.
+
+    Once a transaction has written, its later reads also go to the writer, so
+    they see the uncommitted changes. Raw `text()` statements count as reads;
+    send writes through the ORM or Core insert()/update()/delete() so they are
+    serialized.
+    """
+
+    def __init__(self, *args, writer=None, reader=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writer = writer
+        self.reader = reader
+        self._wrote = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or isinstance(clause, UpdateBase):
+            self._wrote = True
+        return self.writer if self._wrote else self.reader
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _reset_routing(session, transaction):
+    if transaction.parent is None:
+        session._wrote = False
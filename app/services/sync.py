@@ -0,0 +1,219 @@
+"""
+Delta sync of tasks, habits and notes (GET /sync).
+
+The mobile app used to download all three lists on every start. Now it keeps
+an opaque token and asks only for what changed since then:
+
+- every write stamps the rows it creates or updates with the new version of
+  that list (`change_seq`, the value `bump_version` returns)
+- every delete leaves a `Tombstone` with that version
+- the token holds, per resource, how far the client has read in the order
+  (change_seq, kind, id), where kind is 0 for a row and 1 for a tombstone
+
+A sync reads the user's current versions first and returns, per resource, the
+rows and tombstones after the token's position up to that version, at most
+`limit` of each resource. Both are range scans on a (user_id, change_seq)
+index, so the cost follows the number of changes, not the size of the
+account. Rows written while the sync runs get a higher version and come with
+the next sync. Without a token the client gets everything (a full sync).
+
+A row with several changes since the token comes back once, in its current
+state. Within one response `changed` and `deleted` never share an id, so the
+client can apply them in any order; responses must be applied in order.
+
+Tombstones are kept for SYNC_TOMBSTONE_RETENTION_DAYS; `purge_tombstones`
+(run by purge_tombstones.py) removes older ones and records, per user and
+resource, the highest change_seq it removed (`ResourceVersion.purged_seq`).
+A token that has not read past that point may have missed deletes, so the
+sync starts over from the beginning and says so with `full_resync`: the
+client drops its copies and rebuilds them from this and the following pages.
+"""
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, exists, func, insert, literal, select, tuple_, union_all, update
+
+from app.models.habit import Habit
+from app.models.note import Note
+from app.models.resource_version import ResourceVersion
+from app.models.task import Task
+from app.models.tombstone import Tombstone, utc_now
+from app.schemas.habit import HabitRead
+from app.schemas.note import NoteRead
+from app.schemas.task import TaskRead
+from app.services.pagination import decode_token, encode_token
+from app.services.serialization import plain
+
+SYNCED = (
+    ("tasks", Task, TaskRead),
+    ("habits", Habit, HabitRead),
+    ("notes", Note, NoteRead),
+)
+
+ROW, TOMBSTONE, DONE = 0, 1, 2
+
+# Before everything: includes rows written before change_seq existed (0)
+START = (-1, ROW, 0)
+
+
+async def record_deletes(db, user_id: int, model, ids: list[int], change_seq: int) -> None:
+    """
+    Leave a tombstone for each deleted row of `model`.
+    """
+    if ids:
+        await db.execute(
+            insert(Tombstone.__table__),
+            [
+                {"user_id": user_id, "resource": model.__tablename__, "item_id": item_id, "change_seq": change_seq}
+                for item_id in ids
+            ],
+        )
+
+
+def encode_sync_token(positions: dict[str, tuple[int, int, int]]) -> str:
+    return encode_token({name: list(position) for name, position in positions.items()})
+
+
+def decode_sync_token(token: str) -> dict[str, tuple[int, int, int]]:
+    try:
+        data = decode_token(token)
+        return {name: tuple(int(part) for part in data[name]) for name, _, _ in SYNCED}
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid sync token",
+        )
+
+
+def _after(seq_column, id_column, kind: int, position: tuple[int, int, int]):
+    """
+    WHERE clause for entries of `kind` after `position`, written so that the
+    (user_id, change_seq) index serves it.
+    """
+    seq, position_kind, item_id = position
+    if kind > position_kind:
+        return seq_column >= seq
+    if kind == position_kind:
+        return tuple_(seq_column, id_column) > tuple_(seq, item_id)
+    return seq_column > seq
+
+
+async def _resource_changes(db, user_id: int, model, read_schema, position, upto: int, limit: int):
+    rows = select(
+        model.id.label("id"), model.change_seq.label("change_seq"), literal(ROW).label("kind")
+    ).where(
+        model.user_id == user_id,
+        model.change_seq <= upto,
+        _after(model.change_seq, model.id, ROW, position),
+    )
+    tombstones = select(
+        Tombstone.item_id.label("id"), Tombstone.change_seq.label("change_seq"), literal(TOMBSTONE).label("kind")
+    ).where(
+        Tombstone.user_id == user_id,
+        Tombstone.resource == model.__tablename__,
+        Tombstone.change_seq <= upto,
+        _after(Tombstone.change_seq, Tombstone.item_id, TOMBSTONE, position),
+    )
+    entries = union_all(rows, tombstones).subquery()
+    page = (
+        await db.execute(
+            select(entries.c.id, entries.c.change_seq, entries.c.kind)
+            .order_by(entries.c.change_seq, entries.c.kind, entries.c.id)
+            .limit(limit + 1)
+        )
+    ).all()
+
+    has_more = len(page) > limit
+    page = page[:limit]
+    if has_more:
+        position = (page[-1].change_seq, page[-1].kind, page[-1].id)
+    else:
+        position = (upto, DONE, 0)
+
+    # Latest entry per id wins: deleted and re-created, or the other way round
+    latest = {}
+    for entry in page:
+        latest.pop(entry.id, None)
+        latest[entry.id] = entry.kind
+    changed_ids = [item_id for item_id, kind in latest.items() if kind == ROW]
+    deleted = [item_id for item_id, kind in latest.items() if kind == TOMBSTONE]
+
+    changed = []
+    if changed_ids:
+        current = (
+            await db.execute(
+                select(*model.__table__.c).where(model.user_id == user_id, model.id.in_(changed_ids))
+            )
+        ).mappings()
+        by_id = {row["id"]: row for row in current}
+        # A row deleted since the page was read is left out; its tombstone
+        # comes with the next sync
+        changed = [plain(read_schema, by_id[item_id]) for item_id in changed_ids if item_id in by_id]
+
+    return {"changed": changed, "deleted": deleted}, position, has_more
+
+
+async def sync_changes(db, user_id: int, since: str | None, limit: int) -> dict:
+    """
+    Everything that changed for `user_id` after the token `since` (or
+    everything, without one, or if the token is older than the purged
+    tombstones), at most `limit` entries per resource, as plain data for
+    `dump_json(SyncResponse, ...)`.
+    """
+    counters = (
+        await db.execute(
+            select(ResourceVersion.resource, ResourceVersion.version, ResourceVersion.purged_seq).where(
+                ResourceVersion.user_id == user_id
+            )
+        )
+    ).all()
+    versions = {counter.resource: counter.version for counter in counters}
+    purged = {counter.resource: counter.purged_seq for counter in counters}
+
+    positions = decode_sync_token(since) if since else None
+    # Tombstones up to purged_seq are gone: a token that has not read past
+    # them would never learn about those deletes
+    full_resync = positions is not None and any(
+        purged.get(model.__tablename__) and positions[name] < (purged[model.__tablename__], DONE, 0)
+        for name, model, _ in SYNCED
+    )
+    if positions is None or full_resync:
+        positions = {name: START for name, _, _ in SYNCED}
+
+    response = {"has_more": False, "full_resync": full_resync}
+    next_positions = {}
+    for name, model, read_schema in SYNCED:
+        changes, next_positions[name], has_more = await _resource_changes(
+            db, user_id, model, read_schema, positions[name], versions.get(model.__tablename__, 0), limit
+        )
+        response[name] = changes
+        response["has_more"] = response["has_more"] or has_more
+    response["next_token"] = encode_sync_token(next_positions)
+    return response
+
+
+def _days_ago(db, days: int):
+    """
+    UTC time `days` days ago, on the database's clock like `deleted_at`.
+    """
+    if db.get_bind().dialect.name == "sqlite":
+        return func.datetime("now", f"{-days} days")
+    return utc_now() - func.make_interval(0, 0, 0, days)
+
+
+async def purge_tombstones(db, retention_days: int) -> int:
+    """
+    Delete the tombstones of deletes more than `retention_days` ago and raise
+    each affected user's `purged_seq` to the newest of them. Returns the
+    number of tombstones deleted; the caller commits.
+    """
+    old = Tombstone.deleted_at < _days_ago(db, retention_days)
+    matching = (Tombstone.user_id == ResourceVersion.user_id) & (Tombstone.resource == ResourceVersion.resource)
+    newest_old = select(func.max(Tombstone.change_seq)).where(matching, old).scalar_subquery()
+    await db.execute(
+        update(ResourceVersion)
+        .where(exists().where(matching, old, Tombstone.change_seq > ResourceVersion.purged_seq))
+        .values(purged_seq=newest_old)
+        .execution_options(synchronize_session=False)
+    )
+    result = await db.execute(delete(Tombstone).where(old).execution_options(synchronize_session=False))
+    return result.rowcount
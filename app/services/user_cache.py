@@ -0,0 +1,146 @@
+"""
+In-process cache of authenticated users for `get_current_user`.
+
+Every protected request used to load the user row just to learn who is
+calling. Now we keep a small, read-only snapshot of each user (`CurrentUser`)
+for a short time, so most requests skip that query entirely.
+
+- bounded: least recently used entries are dropped past `USER_CACHE_SIZE`
+- expiring: entries live for `USER_CACHE_TTL` seconds, which also bounds how
+  stale another worker process can be
+- invalidated in this process when a user row is updated or deleted
+  through the ORM: once at flush, and again after the commit, because a
+  request that loaded the user between the two still saw the old,
+  committed row and may have cached it
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, object_session
+
+from config.environment import user_cache_size, user_cache_ttl
+from models.user import UserModel
+
+
+@dataclass(frozen=True, slots=True)
+class CurrentUser:
+    """
+    The logged-in user, detached from any database session.
+    """
+
+    id: int
+    username: str
+    email: str
+
+    @classmethod
+    def from_model(cls, user: UserModel) -> "CurrentUser":
+        return cls(id=user.id, username=user.username, email=user.email)
+
+
+class UserCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict[int, tuple[float, CurrentUser]] = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation so a load that raced with an update
+        # does not put the old row back into the cache.
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, user_id: int) -> CurrentUser | None:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, user = entry
+            if expires_at <= time.monotonic():
+                del self._entries[user_id]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return user
+
+    def generation(self) -> int:
+        """
+        Call before loading a user from the database and pass the result to `put`.
+        """
+        return self._generation
+
+    def put(self, user: CurrentUser, generation: int) -> None:
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            if generation != self._generation:
+                return
+
+            self._entries[user.id] = (time.monotonic() + self.ttl, user)
+            self._entries.move_to_end(user.id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(user_id, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+user_cache = UserCache(maxsize=user_cache_size, ttl=user_cache_ttl)
+
+
+# session.info key: ids of the users flushed in the session's transaction
+_CHANGED_USERS = "user_cache_changed_users"
+
+
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _invalidate_user(mapper, connection, target):
+    user_cache.invalidate(target.id)
+    session = object_session(target)
+    if session is not None:
+        session.info.setdefault(_CHANGED_USERS, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_users(session):
+    for user_id in session.info.pop(_CHANGED_USERS, ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    # Rolled back: the cached rows are the committed ones again
+    session.info.pop(_CHANGED_USERS, None)
@@ -0,0 +1,99 @@
+"""
+Single-statement writes for the task, habit and note routes.
+
+Each write used to take 3-4 round trips: a SELECT to find the row, the
+UPDATE/DELETE, the commit, and a `db.refresh()` SELECT to read back
+server-generated columns. With RETURNING (Postgres, SQLite 3.35+) the write
+itself hands back the row, and a missing or foreign row simply returns
+nothing, which the routes turn into a 404.
+
+The helpers work on the Core table rather than ORM instances, so the rows
+they return are plain dicts that stay usable after the commit. On a database
+without RETURNING they fall back to the rowcount and a follow-up SELECT.
+"""
+
+from sqlalchemy import delete, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+
+_upsert_inserts = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def upsert_insert(db, table):
+    """
+    The dialect's insert(table), which has `on_conflict_do_update` on both
+    Postgres and SQLite.
+    """
+    return _upsert_inserts[db.get_bind().dialect.name](table)
+
+
+def _columns(model):
+    return model.__table__.c
+
+
+async def insert_returning(db, model, values: dict) -> dict:
+    """
+    INSERT one row and return it, including id and timestamps.
+    """
+    table = model.__table__
+    if db.get_bind().dialect.insert_returning:
+        result = await db.execute(insert(table).values(**values).returning(*_columns(model)))
+        return dict(result.mappings().one())
+
+    result = await db.execute(insert(table).values(**values))
+    (row_id,) = result.inserted_primary_key
+    result = await db.execute(select(*_columns(model)).where(table.c.id == row_id))
+    return dict(result.mappings().one())
+
+
+def update_values(model, values: dict) -> dict:
+    """
+    `values` plus the columns `model` derives from them (Note.update_values).
+    """
+    derive = getattr(model, "update_values", None)
+    return derive(values) if derive is not None else values
+
+
+def update_statement(model, row_id: int, user_id: int, values: dict):
+    table = model.__table__
+    return (
+        update(table)
+        .where(table.c.id == row_id, table.c.user_id == user_id)
+        .values(**update_values(model, values))
+    )
+
+
+def delete_statement(model, row_id: int, user_id: int):
+    table = model.__table__
+    return delete(table).where(table.c.id == row_id, table.c.user_id == user_id)
+
+
+async def update_returning(db, model, row_id: int, user_id: int, values: dict) -> dict | None:
+    """
+    UPDATE the user's row `row_id` and return it, or None if no row matched.
+    """
+    table = model.__table__
+    statement = update_statement(model, row_id, user_id, values)
+    if db.get_bind().dialect.update_returning:
+        result = await db.execute(statement.returning(*_columns(model)))
+        row = result.mappings().one_or_none()
+        return dict(row) if row is not None else None
+
+    result = await db.execute(statement)
+    if result.rowcount == 0:
+        return None
+    result = await db.execute(select(*_columns(model)).where(table.c.id == row_id))
+    return dict(result.mappings().one())
+
+
+async def delete_returning(db, model, row_id: int, user_id: int) -> bool:
+    """
+    DELETE the user's row `row_id`. Returns False if no row matched.
+    """
+    table = model.__table__
+    statement = delete_statement(model, row_id, user_id)
+    if db.get_bind().dialect.delete_returning:
+        result = await db.execute(statement.returning(table.c.id))
+        return result.scalar_one_or_none() is not None
+
+    result = await db.execute(statement)
+    return result.rowcount > 0
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Measure GET /notes/search latency for a user with many notes.
+
+Creates a throwaway benchmark user with --notes generated notes in the
+database configured in .env (or the SQLite fallback), runs each query
+--repeat times through app/services/note_search.py, prints the latency and
+removes the user's rows again:
+
+    python3 benchmark_search.py --notes 100000
+
+The database must have the search index (alembic upgrade head).
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import sys
+import time
+import uuid
+
+from sqlalchemy import delete, insert
+
+import database
+from database import session_scope
+from app.models.note import Note
+from app.services.note_search import search_notes
+from app.services.writes import insert_returning
+from config.environment import default_page_size
+from models.user import UserModel
+
+def _made_up_words(count: int) -> list[str]:
+    generator = random.Random(0)
+    words = {}
+    while len(words) < count:
+        consonants = generator.choices("bcdfghklmnprstvz", k=3)
+        vowels = generator.choices("aeiou", k=3)
+        words["".join(c + v for c, v in zip(consonants, vowels))] = None
+    return list(words)
+
+
+# Zipf-like vocabulary of made-up words: word N appears about 1/N as often as
+# the most common one, so the queries below range from "in most notes" to
+# "in a handful"
+VOCABULARY = _made_up_words(20000)
+CUMULATIVE_WEIGHTS = list(itertools.accumulate(1 / rank for rank in range(1, len(VOCABULARY) + 1)))
+
+QUERIES = {
+    "most common word": VOCABULARY[0],
+    "20th word": VOCABULARY[19],
+    "500th word": VOCABULARY[499],
+    "5000th word": VOCABULARY[4999],
+    "two common words": f"{VOCABULARY[19]} {VOCABULARY[49]}",
+    "no match": "nonexistentword",
+}
+
+
+def generated_note(number: int, user_id: int) -> dict:
+    words = random.choices(VOCABULARY, cum_weights=CUMULATIVE_WEIGHTS, k=40)
+    return {
+        "title": f"{' '.join(words[:4]).capitalize()} #{number}",
+        "content": " ".join(words[4:]),
+        "user_id": user_id,
+    }
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run(args):
+    random.seed(args.seed)
+    async with session_scope() as db:
+        user = await insert_returning(
+            db, UserModel, {"username": f"benchmark-{uuid.uuid4().hex}", "email": f"{uuid.uuid4().hex}@benchmark.invalid"}
+        )
+        await db.commit()
+    user_id = user["id"]
+
+    try:
+        started = time.perf_counter()
+        for offset in range(0, args.notes, 5000):
+            async with session_scope() as db:
+                count = min(5000, args.notes - offset)
+                rows = [generated_note(offset + index, user_id) for index in range(count)]
+                await db.execute(insert(Note.__table__), rows)
+                await db.commit()
+        print(f"Backend: {database.engine.dialect.name}, inserted {args.notes} notes "
+              f"in {time.perf_counter() - started:.1f}s")
+
+        for label, query in QUERIES.items():
+            timings, hits = [], 0
+            for _ in range(args.repeat):
+                async with session_scope() as db:
+                    query_started = time.perf_counter()
+                    page, _ = await search_notes(db, user_id, query, limit=default_page_size)
+                    timings.append((time.perf_counter() - query_started) * 1000)
+                    hits = len(page)
+            timings.sort()
+            print(
+                f"  {label:<18} {hits:3d} hits/page"
+                f"   p50 {statistics.median(timings):8.2f} ms"
+                f"   p95 {percentile(timings, 0.95):8.2f} ms"
+                f"   max {timings[-1]:8.2f} ms"
+            )
+    finally:
+        async with session_scope() as db:
+            await db.execute(delete(Note.__table__).where(Note.__table__.c.user_id == user_id))
+            await db.execute(delete(UserModel.__table__).where(UserModel.__table__.c.id == user_id))
+            await db.commit()
+        await database.dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--notes", type=int, default=100_000, help="notes to create for the benchmark user")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per query")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
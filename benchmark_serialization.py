@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare the ways a list page of tasks, habits or notes can be turned into
+JSON bytes, at 10, 1k and 50k items:
+
+- jsonable_encoder: validate into the page schema, then FastAPI's
+  jsonable_encoder and json.dumps (what FastAPI did before it dumped
+  response models with pydantic-core)
+- new TypeAdapter per call: validate and dump_json, building the adapter
+  every time
+- cached TypeAdapter: the same with one adapter per type
+  (SERIALIZATION_MODE=validated)
+- fast: the schema's fields read from the rows and dumped with orjson, no
+  validation (SERIALIZATION_MODE=fast, the default)
+
+The items are ORM objects as the list routes load them, built in memory, so
+no database is needed:
+
+    python3 benchmark_serialization.py --resource tasks
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+from datetime import date, datetime
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from app.models.habit import Habit
+from app.models.note import Note
+from app.models.task import Task
+from app.schemas.habit import HabitPage
+from app.schemas.note import NotePage
+from app.schemas.task import TaskPage
+from app.services.serialization import orjson, plain, type_adapter
+
+SIZES = (10, 1_000, 50_000)
+
+RESOURCES = {
+    "tasks": (Task, TaskPage, lambda i: {"title": f"Task {i}", "description": "Something to do " * 3, "is_completed": i % 3 == 0}),
+    "habits": (Habit, HabitPage, lambda i: {
+        "title": f"Habit {i}", "description": "Every day", "is_active": True,
+        "current_streak": i % 30, "longest_streak": i % 90, "total_checkins": i, "last_checkin_date": date(2026, 1, 1),
+    }),
+    "notes": (Note, NotePage, lambda i: {"title": f"Note {i}", "content": "Lorem ipsum dolor sit amet. " * 20}),
+}
+
+
+def make_items(model, fields, count: int) -> list:
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    return [
+        model(id=i, user_id=1, created_at=now, updated_at=now, change_seq=1, **fields(i))
+        for i in range(1, count + 1)
+    ]
+
+
+def paths(page_schema):
+    item_schema = page_schema.model_fields["items"].annotation.__args__[0]
+
+    def page(items):
+        return {"items": items, "next_cursor": None}
+
+    def with_jsonable_encoder(items):
+        validated = type_adapter(page_schema).validate_python(page(items), from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def with_new_adapter(items):
+        adapter = TypeAdapter(page_schema)
+        return adapter.dump_json(adapter.validate_python(page(items), from_attributes=True))
+
+    def with_cached_adapter(items):
+        adapter = type_adapter(page_schema)
+        return adapter.dump_json(adapter.validate_python(page(items), from_attributes=True))
+
+    def fast(items):
+        return orjson.dumps(page([plain(item_schema, item) for item in items]))
+
+    result = {
+        "jsonable_encoder": with_jsonable_encoder,
+        "new TypeAdapter per call": with_new_adapter,
+        "cached TypeAdapter": with_cached_adapter,
+    }
+    if orjson is not None:
+        result["fast (orjson, no validation)"] = fast
+    return result
+
+
+def measure(function, items, min_seconds: float) -> list[float]:
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < 5 or time.perf_counter() - started < min_seconds:
+        call_started = time.perf_counter()
+        function(items)
+        timings.append((time.perf_counter() - call_started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resource", choices=sorted(RESOURCES), default="tasks")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="minimum time spent per path and size")
+    args = parser.parse_args()
+
+    model, page_schema, fields = RESOURCES[args.resource]
+    candidates = paths(page_schema)
+    if orjson is None:
+        print("orjson is not installed: the fast path is skipped")
+
+    for size in SIZES:
+        items = make_items(model, fields, size)
+        outputs = {label: function(items) for label, function in candidates.items()}
+        # Every path has to produce the same document
+        reference = json.loads(outputs["cached TypeAdapter"])
+        for label, output in outputs.items():
+            assert json.loads(output) == reference, f"{label} differs from the validated output"
+
+        print(f"{args.resource}, {size} items ({len(outputs['cached TypeAdapter']) / 1024:.0f} KiB):")
+        for label, function in candidates.items():
+            timings = measure(function, items, args.min_seconds)
+            median = statistics.median(timings)
+            print(f"  {label:<30} {median:10.3f} ms   {median * 1000 / size:8.2f} us/item")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
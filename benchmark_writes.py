@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Compare the old ORM write path of the task/habit/note routes with the
+RETURNING-based one in app/services/writes.py.
+
+For create, update and delete it runs each path --iterations times against
+the database configured in .env (or the SQLite fallback) and prints the SQL
+statements per call and the latency. Everything runs as a throwaway
+benchmark user whose rows are removed afterwards:
+
+    python3 benchmark_writes.py --iterations 500 --resource notes
+
+Statements are counted with a before_cursor_execute listener, so they
+include the SELECTs that `db.refresh()` and the 404 lookups issue. The
+COMMIT is not a statement here but is one more round trip for both paths.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+from contextlib import asynccontextmanager
+
+from sqlalchemy import delete, event, select
+
+import database
+from database import get_db
+from app.models.task import Task
+from app.models.habit import Habit
+from app.models.note import Note
+from app.services.writes import delete_returning, insert_returning, update_returning
+from models.user import UserModel
+
+RESOURCES = {
+    "tasks": (Task, {"title": "benchmark", "description": "row", "is_completed": False}),
+    "habits": (Habit, {"title": "benchmark", "description": "row", "is_active": True}),
+    "notes": (Note, {"title": "benchmark", "content": "row"}),
+}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+
+    def attach(self):
+        for engine in (database.engine, database.writer_engine, database.async_engine, database.async_writer_engine):
+            if engine is not None:
+                event.listen(getattr(engine, "sync_engine", engine), "before_cursor_execute", self)
+
+
+# The write path before app/services/writes.py: look up, mutate, commit, refresh
+
+async def orm_create(db, model, values, user_id):
+    row = model(**values, user_id=user_id)
+    db.add(row)
+    await db.commit()
+    await db.refresh(row)
+    return row.id
+
+
+async def orm_update(db, model, values, user_id, row_id):
+    result = await db.execute(select(model).where(model.id == row_id, model.user_id == user_id))
+    row = result.scalar_one_or_none()
+    for name, value in values.items():
+        setattr(row, name, value)
+    await db.commit()
+    await db.refresh(row)
+
+
+async def orm_delete(db, model, user_id, row_id):
+    result = await db.execute(select(model).where(model.id == row_id, model.user_id == user_id))
+    row = result.scalar_one_or_none()
+    await db.delete(row)
+    await db.commit()
+
+
+# The current write path
+
+async def returning_create(db, model, values, user_id):
+    row = await insert_returning(db, model, {**values, "user_id": user_id})
+    await db.commit()
+    return row["id"]
+
+
+async def returning_update(db, model, values, user_id, row_id):
+    await update_returning(db, model, row_id, user_id, values)
+    await db.commit()
+
+
+async def returning_delete(db, model, user_id, row_id):
+    await delete_returning(db, model, row_id, user_id)
+    await db.commit()
+
+
+# One session per call, like one request
+session_scope = asynccontextmanager(get_db)
+
+PATHS = {
+    "orm (select + refresh)": (orm_create, orm_update, orm_delete),
+    "returning": (returning_create, returning_update, returning_delete),
+}
+
+
+async def timed(counter, func, *args):
+    async with session_scope() as db:
+        before = counter.count
+        started = time.perf_counter()
+        result = await func(db, *args)
+        elapsed = time.perf_counter() - started
+        return result, counter.count - before, elapsed
+
+
+def summarize(label, statements, seconds):
+    milliseconds = sorted(value * 1000 for value in seconds)
+    p95 = milliseconds[int(len(milliseconds) * 0.95) - 1] if len(milliseconds) >= 20 else milliseconds[-1]
+    print(
+        f"  {label:<8} {statistics.mean(statements):5.1f} statements"
+        f"   mean {statistics.mean(milliseconds):7.3f} ms"
+        f"   p50 {statistics.median(milliseconds):7.3f} ms"
+        f"   p95 {p95:7.3f} ms"
+    )
+
+
+async def run(args):
+    model, values = RESOURCES[args.resource]
+    updated_values = {**values, "title": "benchmark (updated)"}
+    counter = StatementCounter()
+    counter.attach()
+
+    async with session_scope() as db:
+        user = await insert_returning(
+            db, UserModel, {"username": f"benchmark-{uuid.uuid4().hex}", "email": f"{uuid.uuid4().hex}@benchmark.invalid"}
+        )
+        await db.commit()
+    user_id = user["id"]
+
+    try:
+        print(f"Backend: {database.engine.dialect.name}, DATABASE_MODE={database.database_mode}, "
+              f"{args.iterations} x /{args.resource}")
+        for label, (create, update, remove) in PATHS.items():
+            timings = {"create": ([], []), "update": ([], []), "delete": ([], [])}
+            for _ in range(args.iterations):
+                row_id, statements, elapsed = await timed(counter, create, model, values, user_id)
+                timings["create"][0].append(statements)
+                timings["create"][1].append(elapsed)
+
+                _, statements, elapsed = await timed(counter, update, model, updated_values, user_id, row_id)
+                timings["update"][0].append(statements)
+                timings["update"][1].append(elapsed)
+
+                _, statements, elapsed = await timed(counter, remove, model, user_id, row_id)
+                timings["delete"][0].append(statements)
+                timings["delete"][1].append(elapsed)
+
+            print(f"\n{label}")
+            for operation, (statements, seconds) in timings.items():
+                summarize(operation, statements, seconds)
+    finally:
+        async with session_scope() as db:
+            await db.execute(delete(model.__table__).where(model.__table__.c.user_id == user_id))
+            await db.execute(delete(UserModel.__table__).where(UserModel.__table__.c.id == user_id))
+            await db.commit()
+        await database.dispose_engines()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="create/update/delete cycles per path")
+    parser.add_argument("--resource", choices=sorted(RESOURCES), default="tasks")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,4 +4,94 @@ from dotenv import load_dotenv
 load_dotenv()
 
 db_URI = os.getenv('DATABASE_URL')
-secret = os.getenv('JWT_SECRET')
\ No newline at end of file
+secret = os.getenv('JWT_SECRET')
+
+# 'async' (asyncpg / aiosqlite) or 'sync' (the plain driver on the threadpool).
+database_mode = os.getenv('DATABASE_MODE', 'async').lower()
+
+# Pagination for the task, habit and note list endpoints.
+default_page_size = int(os.getenv('DEFAULT_PAGE_SIZE', '50'))
+max_page_size = int(os.getenv('MAX_PAGE_SIZE', '200'))
+
+# Cache of authenticated users used by get_current_user (size 0 disables it).
+user_cache_size = int(os.getenv('USER_CACHE_SIZE', '10000'))
+user_cache_ttl = float(os.getenv('USER_CACHE_TTL', '60'))
+
+# Password hashing (see app/services/password_hashing.py).
+bcrypt_rounds = int(os.getenv('BCRYPT_ROUNDS', '12'))
+hash_workers = int(os.getenv('HASH_WORKERS', str(min(4, os.cpu_count() or 1))))
+hash_queue_limit = int(os.getenv('HASH_QUEUE_LIMIT', '64'))
+
+# Database connection pool (ignored for in-memory SQLite).
+db_pool_size = int(os.getenv('DB_POOL_SIZE', '5'))
+db_max_overflow = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+db_pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '30'))
+db_pool_recycle = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+db_pool_pre_ping = os.getenv('DB_POOL_PRE_PING', 'true').lower() in ('1', 'true', 'yes')
+
+# SQLite: 'concurrent' (WAL, tuned PRAGMAs, single writer connection) or 'basic'.
+sqlite_profile = os.getenv('SQLITE_PROFILE', 'concurrent').lower()
+sqlite_busy_timeout_ms = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+sqlite_mmap_size = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+sqlite_cache_size_kib = int(os.getenv('SQLITE_CACHE_SIZE_KIB', '65536'))
+
+# Maximum number of operations in one POST /tasks|habits|notes/batch request.
+batch_max_operations = int(os.getenv('BATCH_MAX_OPERATIONS', '500'))
+
+# Response cache for the task/habit/note lists: "memory" (per process),
+# "shared" (the shared-store backend) or "off".
+response_cache_backend = os.getenv('RESPONSE_CACHE_BACKEND', 'memory').lower()
+response_cache_max_bytes = int(os.getenv('RESPONSE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+# Only the shared store expires entries by time; see app/services/response_cache.py
+response_cache_ttl = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+
+# Rows fetched per round trip by GET /export
+export_batch_size = int(os.getenv('EXPORT_BATCH_SIZE', '500'))
+
+# POST /import: records per transaction, per-line errors kept in the report,
+# and the longest accepted line / CSV record
+import_chunk_size = int(os.getenv('IMPORT_CHUNK_SIZE', '500'))
+import_max_errors = int(os.getenv('IMPORT_MAX_ERRORS', '1000'))
+import_max_line_bytes = int(os.getenv('IMPORT_MAX_LINE_BYTES', str(1024 * 1024)))
+
+# GET /sync: most changes returned per resource in one response
+sync_page_size = int(os.getenv('SYNC_PAGE_SIZE', '500'))
+# Days a delete stays visible to GET /sync; older tombstones are removed by
+# purge_tombstones.py, and clients whose token predates them resync fully
+sync_tombstone_retention_days = int(os.getenv('SYNC_TOMBSTONE_RETENTION_DAYS', '90'))
+
+# GET /events: events queued per connection before it counts as a slow
+# consumer and is disconnected, and seconds between keepalive comments
+events_queue_size = int(os.getenv('EVENTS_QUEUE_SIZE', '100'))
+events_keepalive_seconds = float(os.getenv('EVENTS_KEEPALIVE_SECONDS', '15'))
+
+# List, export and sync serialization: "fast" (orjson, rows are not
+# validated on the way out) or "validated" (cached pydantic TypeAdapters)
+serialization_mode = os.getenv('SERIALIZATION_MODE', 'fast').lower()
+
+# Logging: level, "json" (one object per line) or "text" output, the share of
+# successful requests that get a log line (errors and slow requests always
+# do), what counts as slow, and how many records may wait for the writer
+# thread before new ones are dropped
+log_level = os.getenv('LOG_LEVEL', 'INFO').upper()
+log_format = os.getenv('LOG_FORMAT', 'json').lower()
+log_sample_rate = float(os.getenv('LOG_SAMPLE_RATE', '1.0'))
+log_slow_request_ms = float(os.getenv('LOG_SLOW_REQUEST_MS', '500'))
+log_queue_size = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+
+# GET /metrics with several worker processes: a directory they all write
+# their metrics snapshots to (empty it on deploy), and how often they do
+metrics_dir = os.getenv('METRICS_DIR') or None
+metrics_flush_seconds = float(os.getenv('METRICS_FLUSH_SECONDS', '1'))
+
+# Per-request SQL statistics: log a warning when one request runs more than
+# this many statements or spends more than this many ms in the database
+query_warn_count = int(os.getenv('QUERY_WARN_COUNT', '20'))
+query_warn_ms = float(os.getenv('QUERY_WARN_MS', '200'))
+
+# On-demand profiling of single requests (X-Profile-Token header, see
+# profile_token.py). Off unless PROFILE_SECRET is set.
+profile_secret = os.getenv('PROFILE_SECRET') or None
+profile_dir = os.getenv('PROFILE_DIR', 'profiles')
+profile_keep = int(os.getenv('PROFILE_KEEP', '50'))
+profile_interval_ms = float(os.getenv('PROFILE_INTERVAL_MS', '5'))
@@ -1,44 +1,67 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException, status, Request
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from database import get_db
 from models.user import UserModel
 from serializers.user import UserSignUp, UserSignIn, AuthResponse
+from app.services.password_hashing import (
+    HashingPoolBusy,
+    hash_password_async,
+    verify_password_async,
+)
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api", tags=["authentication"])
 
+
+def _busy_error():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def _find_user(db: AsyncSession, *criteria):
+    result = await db.execute(select(UserModel).where(*criteria))
+    return result.scalar_one_or_none()
+
+
+async def _save_user(db: AsyncSession, user: UserModel):
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+
 @router.post("/register/", response_model=AuthResponse, status_code=status.HTTP_201_CREATED)
-def register(user: UserSignUp, request: Request, db: Session = Depends(get_db)):
+async def register(user: UserSignUp, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Register a new user.
     Accepts JSON with username, email, and password.
     Returns JWT token on success.
+    Password hashing runs in the hashing process pool, so the event loop
+    is never blocked.
     """
     try:
-        logger.info(f"Registration attempt for email: {user.email} from {request.client.host}")
+        logger.debug("Registration attempt for email: %s from %s", user.email, request.client.host)
         
         # Check if user already exists
-        existing_user = db.query(UserModel).filter(
-            UserModel.email == user.email
-        ).first()
+        existing_user = await _find_user(db, UserModel.email == user.email)
 
         if existing_user:
-            logger.warning(f"Registration failed: Email {user.email} already registered")
+            logger.warning("Registration failed: email already registered", extra={"email": user.email})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
             )
 
         # Check if username already exists
-        existing_username = db.query(UserModel).filter(
-            UserModel.username == user.username
-        ).first()
+        existing_username = await _find_user(db, UserModel.username == user.username)
 
         if existing_username:
-            logger.warning(f"Registration failed: Username {user.username} already taken")
+            logger.warning("Registration failed: username already taken", extra={"username": user.username})
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Username already taken"
@@ -47,17 +70,15 @@ def register(user: UserSignUp, request: Request, db: Session = Depends(get_db)):
         # Create new user
         new_user = UserModel(
             username=user.username,
-            email=user.email
+            email=user.email,
+            password_hash=await hash_password_async(user.password),
         )
-        new_user.set_password(user.password)
 
-        db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await _save_user(db, new_user)
 
         # Generate JWT token
         token = new_user.generate_token()
-        logger.info(f"User registered successfully: {user.email} (ID: {new_user.id})")
+        logger.info("User registered", extra={"email": user.email, "user_id": new_user.id})
         
         return {
             "token": token,
@@ -69,46 +90,58 @@ def register(user: UserSignUp, request: Request, db: Session = Depends(get_db)):
         }
     except HTTPException:
         raise
+    except HashingPoolBusy:
+        logger.warning("Registration rejected: hashing pool busy", extra={"email": user.email})
+        raise _busy_error()
     except Exception as e:
-        logger.error(f"Registration error for {user.email}: {str(e)}", exc_info=True)
-        db.rollback()
+        logger.error("Registration error: %s", e, exc_info=True, extra={"email": user.email})
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred during registration"
         )
 
 @router.post("/login/", response_model=AuthResponse, status_code=status.HTTP_200_OK)
-def login(credentials: UserSignIn, request: Request, db: Session = Depends(get_db)):
+async def login(credentials: UserSignIn, request: Request, db: AsyncSession = Depends(get_db)):
     """
     Login with email and password.
     Accepts JSON with email and password.
     Returns JWT token on success.
+    If the stored hash uses an old bcrypt cost, it is upgraded here.
     """
     try:
-        logger.info(f"Login attempt for email: {credentials.email} from {request.client.host}")
+        logger.debug("Login attempt for email: %s from %s", credentials.email, request.client.host)
         
         # Find user
-        user = db.query(UserModel).filter(
-            UserModel.email == credentials.email
-        ).first()
+        user = await _find_user(db, UserModel.email == credentials.email)
 
         if not user:
-            logger.warning(f"Login failed: User with email {credentials.email} not found")
+            logger.warning("Login failed: unknown email", extra={"email": credentials.email})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
-        if not user.verify_password(credentials.password):
-            logger.warning(f"Login failed: Invalid password for email {credentials.email}")
+        verified, new_hash = await verify_password_async(
+            credentials.password, user.password_hash
+        )
+
+        if not verified:
+            logger.warning("Login failed: invalid password", extra={"email": credentials.email})
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid credentials"
             )
 
+        if new_hash is not None:
+            # BCRYPT_ROUNDS changed since this hash was made
+            user.password_hash = new_hash
+            await _save_user(db, user)
+            logger.info("Password hash upgraded", extra={"user_id": user.id})
+
         # Generate JWT token
         token = user.generate_token()
-        logger.info(f"User logged in successfully: {credentials.email} (ID: {user.id})")
+        logger.info("User logged in", extra={"email": credentials.email, "user_id": user.id})
         
         return {
             "token": token,
@@ -120,8 +153,11 @@ def login(credentials: UserSignIn, request: Request, db: Session = Depends(get_d
         }
     except HTTPException:
         raise
+    except HashingPoolBusy:
+        logger.warning("Login rejected: hashing pool busy", extra={"email": credentials.email})
+        raise _busy_error()
     except Exception as e:
-        logger.error(f"Login error for {credentials.email}: {str(e)}", exc_info=True)
+        logger.error("Login error: %s", e, exc_info=True, extra={"email": credentials.email})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="An error occurred during login"
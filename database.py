@@ -1,7 +1,22 @@
+import asyncio
 import logging
+from contextlib import asynccontextmanager
 from sqlalchemy import create_engine
+from sqlalchemy.engine import CursorResult
 from sqlalchemy.orm import sessionmaker
-from config.environment import db_URI
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+from config.environment import (
+    db_URI,
+    database_mode,
+    db_max_overflow,
+    db_pool_size,
+    db_pool_timeout,
+    sqlite_profile,
+)
+from app.services.db_pool import instrumented_pool, pool_options, pool_status
+from app.services.query_stats import instrument_queries
+from app.services.sqlite_profile import RoutingSession, enable_sqlite_pragmas
 
 logger = logging.getLogger(__name__)
 
@@ -11,26 +26,266 @@ if not database_url:
     logger.warning("DATABASE_URL not set in .env file. Using SQLite fallback database.")
     database_url = "sqlite:///./productivity.db"
 
-try:
-    if database_url.startswith("sqlite"):
-        engine = create_engine(
+if database_mode not in ("sync", "async"):
+    raise ValueError(f"DATABASE_MODE must be 'sync' or 'async', got {database_mode!r}")
+
+
+def to_async_url(url: str) -> str:
+    """
+    Swap the driver in a sync URL for its asyncio equivalent
+    (asyncpg for Postgres, aiosqlite for SQLite).
+    """
+    scheme, _, rest = url.partition("://")
+    backend = scheme.split("+")[0]
+    if backend == "postgres":
+        backend = "postgresql"
+    drivers = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+    if backend not in drivers:
+        raise ValueError(f"No async driver configured for database backend {backend!r}")
+    return f"{backend}+{drivers[backend]}://{rest}"
+
+
+is_sqlite = database_url.startswith("sqlite")
+# In-memory SQLite needs SQLAlchemy's single-connection pools, leave it alone
+is_memory_sqlite = is_sqlite and (
+    database_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in database_url
+)
+# See app/services/sqlite_profile.py
+use_sqlite_writer = is_sqlite and not is_memory_sqlite and sqlite_profile == "concurrent"
+
+
+def _pool_arguments(pool_class, writer=False) -> dict:
+    if is_memory_sqlite:
+        return {}
+    options = pool_options()
+    if writer:
+        # One connection: writers wait their turn here instead of on the file lock
+        options.update(pool_size=1, max_overflow=0, pool_timeout=db_pool_timeout)
+    return {"poolclass": instrumented_pool(pool_class), **options}
+
+
+def _create_sync_engine(writer=False):
+    if is_sqlite:
+        return create_engine(
             database_url,
-            connect_args={"check_same_thread": False}
+            connect_args={"check_same_thread": False},
+            **_pool_arguments(QueuePool, writer),
         )
-    else:
-        engine = create_engine(database_url)
-    
+    return create_engine(database_url, **_pool_arguments(QueuePool, writer))
+
+
+try:
+    engine = _create_sync_engine()
+    writer_engine = _create_sync_engine(writer=True) if use_sqlite_writer else None
+    if use_sqlite_writer:
+        enable_sqlite_pragmas(engine)
+        enable_sqlite_pragmas(writer_engine)
+        instrument_queries(writer_engine)
+    instrument_queries(engine)
+
     display_url = database_url.split('@')[-1] if '@' in database_url else database_url
     logger.info(f"Database engine created successfully: {display_url}")
 except Exception as error:
     logger.error(f"Failed to create database engine: {str(error)}")
     raise
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+if use_sqlite_writer:
+    SessionLocal = sessionmaker(
+        class_=RoutingSession, writer=writer_engine, reader=engine,
+        autocommit=False, autoflush=False,
+    )
+    logger.info("SQLite concurrent profile: WAL, single writer connection, reader pool")
+else:
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+async_engine = None
+async_writer_engine = None
+AsyncSessionLocal = None
+
+if database_mode == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = to_async_url(database_url)
+    async_engine = create_async_engine(async_url, **_pool_arguments(AsyncAdaptedQueuePool))
+
+    if use_sqlite_writer:
+        async_writer_engine = create_async_engine(
+            async_url, **_pool_arguments(AsyncAdaptedQueuePool, writer=True)
+        )
+        enable_sqlite_pragmas(async_engine.sync_engine)
+        enable_sqlite_pragmas(async_writer_engine.sync_engine)
+        AsyncSessionLocal = async_sessionmaker(
+            sync_session_class=RoutingSession,
+            writer=async_writer_engine.sync_engine,
+            reader=async_engine.sync_engine,
+            autoflush=False,
+        )
+    else:
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+    for async_pool_engine in (async_engine, async_writer_engine):
+        if async_pool_engine is not None:
+            instrument_queries(async_pool_engine.sync_engine)
+    logger.info(f"Async database engine created ({async_engine.dialect.driver})")
+
+
+class _ThreadpoolStream:
+    """
+    The part of AsyncResult that `SyncSessionAdapter.stream` supports:
+    `partitions()`, fetching each chunk in the threadpool.
+    """
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size=None):
+        try:
+            while True:
+                rows = await run_in_threadpool(self._result.fetchmany, size)
+                if not rows:
+                    break
+                yield rows
+        finally:
+            await run_in_threadpool(self._result.close)
+
+
+class SyncSessionAdapter:
+    """
+    Gives a sync Session the awaitable API of AsyncSession.
+
+    Used when DATABASE_MODE=sync, so the same async route code runs on the
+    sync driver: each database call is handed to the threadpool.
+    """
+
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def get_bind(self, *args, **kwargs):
+        return self.sync_session.get_bind(*args, **kwargs)
+
+    def _execute_buffered(self, statement, params=None, **kwargs):
+        result = self.sync_session.execute(statement, params, **kwargs)
+        if isinstance(result, CursorResult) and not result.returns_rows:
+            # UPDATE / DELETE without RETURNING: nothing to fetch, keep rowcount
+            return result
+        # Fetch every row now, in the worker thread, like the async drivers do
+        return result.freeze()()
+
+    async def execute(self, statement, params=None, **kwargs):
+        return await run_in_threadpool(self._execute_buffered, statement, params, **kwargs)
+
+    async def stream(self, statement, params=None, **kwargs):
+        # Server-side cursor: rows are fetched in `yield_per` chunks, not buffered
+        statement = statement.execution_options(stream_results=True)
+        result = await run_in_threadpool(self.sync_session.execute, statement, params, **kwargs)
+        return _ThreadpoolStream(result)
+
+    async def scalar(self, statement, params=None, **kwargs):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalar()
+
+    async def scalars(self, statement, params=None, **kwargs):
+        result = await self.execute(statement, params, **kwargs)
+        return result.scalars()
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, attribute_names=None):
+        await run_in_threadpool(self.sync_session.refresh, instance, attribute_names)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+
+# A sync session keeps its pooled connection between threadpool hops. If more
+# sessions than the pool can serve were open, every worker thread could end up
+# blocked in a checkout while the connections' owners wait for a thread.
+_sync_session_slots = asyncio.Semaphore(max(1, db_pool_size + db_max_overflow))
+
+
+async def get_db():
+    """
+    One database session per request, async or sync depending on DATABASE_MODE.
+    Either way, routes use the AsyncSession API (`await db.execute(...)`).
+    """
+    if database_mode == "async":
+        async with AsyncSessionLocal() as database_session:
+            yield database_session
+    else:
+        async with _sync_session_slots:
+            database_session = SyncSessionAdapter(SessionLocal())
+            try:
+                yield database_session
+            finally:
+                await database_session.close()
+
+
+# A session outside FastAPI's dependency injection, e.g. for a streaming body
+# that is still running after the route function has returned
+session_scope = asynccontextmanager(get_db)
+
+
+async def dispose_engines():
+    for async_pool_engine in (async_engine, async_writer_engine):
+        if async_pool_engine is not None:
+            await async_pool_engine.dispose()
+    for sync_pool_engine in (engine, writer_engine):
+        if sync_pool_engine is not None:
+            sync_pool_engine.dispose()
+
+
+def database_pool_status() -> dict:
+    """
+    Pool gauges for every engine in use, keyed by "sync" / "async"
+    (plus "sync_writer" / "async_writer" under the SQLite concurrent profile).
+    """
+    status = {"mode": database_mode, "sync": pool_status(engine)}
+    if writer_engine is not None:
+        status["sync_writer"] = pool_status(writer_engine)
+    if async_engine is not None:
+        status["async"] = pool_status(async_engine.sync_engine)
+    if async_writer_engine is not None:
+        status["async_writer"] = pool_status(async_writer_engine.sync_engine)
+    return status
+
+
+# database_pool_status() keys -> GET /metrics gauges and counters
+POOL_METRICS = {
+    "size": "db_pool_size",
+    "checked_in": "db_pool_checked_in",
+    "checked_out": "db_pool_checked_out",
+    "overflow": "db_pool_overflow",
+    "checkouts": "db_pool_checkouts_total",
+    "checkout_timeouts": "db_pool_checkout_timeouts_total",
+    "wait_seconds_total": "db_pool_checkout_wait_seconds_total",
+}
+
 
-def get_db():
-    database_session = SessionLocal()
-    try:
-        yield database_session
-    finally:
-        database_session.close()
+def record_pool_metrics(registry) -> None:
+    """
+    Metrics collector: copy the pool status of every engine into `registry`.
+    """
+    for engine_name, status in database_pool_status().items():
+        if engine_name == "mode":
+            continue
+        for key, metric in POOL_METRICS.items():
+            if key in status:
+                registry.set(metric, {"engine": engine_name}, status[key])
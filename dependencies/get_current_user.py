@@ -1,19 +1,27 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 import jwt
 from config.environment import secret
 from database import get_db
 from models.user import UserModel
+from app.services.user_cache import CurrentUser, user_cache
 
 security = HTTPBearer()
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-):
-    token = credentials.credentials
+    db: AsyncSession = Depends(get_db)
+) -> CurrentUser:
+    return await user_from_token(credentials.credentials, db)
 
+
+async def user_from_token(token: str, db) -> CurrentUser:
+    """
+    The user a bearer token belongs to, or 401. For routes that must not
+    keep the request's session open, like long-lived streams.
+    """
     try:
         payload = jwt.decode(token, secret, algorithms=["HS256"])
         user_id = payload.get("sub")
@@ -24,7 +32,22 @@ def get_current_user(
                 detail="Invalid authentication credentials"
             )
 
-        user = db.query(UserModel).filter(UserModel.id == user_id).first()
+        try:
+            user_id = int(user_id)
+        except (TypeError, ValueError):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid authentication credentials"
+            )
+
+        # Most requests come from users we have seen in the last minute
+        cached_user = user_cache.get(user_id)
+        if cached_user is not None:
+            return cached_user
+
+        generation = user_cache.generation()
+        result = await db.execute(select(UserModel).where(UserModel.id == user_id))
+        user = result.scalar_one_or_none()
 
         if user is None:
             raise HTTPException(
@@ -32,7 +55,9 @@ def get_current_user(
                 detail="User not found"
             )
 
-        return user
+        current_user = CurrentUser.from_model(user)
+        user_cache.put(current_user, generation)
+        return current_user
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -42,4 +67,4 @@ def get_current_user(
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid token"
-        )
\ No newline at end of file
+        )
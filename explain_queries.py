@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Print the query plan for each query the task, habit and note routes run.
+
+Uses the database configured in .env (or the SQLite fallback), so run it
+against a copy of production data to check that the per-user indexes from
+migrations/versions/0002_per_user_indexes.py are actually used:
+
+    python3 explain_queries.py --user-id 42
+
+SQLite prints EXPLAIN QUERY PLAN, Postgres prints EXPLAIN (add --analyze to
+run the queries and get real timings; the writes are rolled back).
+"""
+import argparse
+import sys
+from datetime import datetime
+
+from sqlalchemy import select
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from database import SessionLocal
+from app.models.task import Task
+from app.models.habit import Habit
+from app.models.note import Note
+from app.services.pagination import encode_cursor, keyset_select
+from app.services.writes import delete_statement, update_statement
+from config.environment import default_page_size
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+    # Read by the compiler when the wrapped statement is an UPDATE or DELETE
+    _inline = False
+
+    def __init__(self, statement, analyze=False):
+        self.statement = statement
+        self.analyze = analyze
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    if compiler.dialect.name == "sqlite":
+        prefix = "EXPLAIN QUERY PLAN "
+    elif element.analyze:
+        prefix = "EXPLAIN ANALYZE "
+    else:
+        prefix = "EXPLAIN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def route_queries(dialect_name, user_id):
+    """
+    The same statements the routes in app/routes/ build, keyed by a readable label.
+    """
+    cursor = encode_cursor(datetime(2000, 1, 1), 0)
+
+    for model, resource in ((Task, "tasks"), (Habit, "habits"), (Note, "notes")):
+        owned = select(model).where(model.user_id == user_id)
+        yield f"GET /{resource}/ (first page)", keyset_select(owned, model, default_page_size, None, dialect_name)
+        yield f"GET /{resource}/?after=... (next page)", keyset_select(
+            owned, model, default_page_size, cursor, dialect_name
+        )
+        # app/services/writes.py: UPDATE / DELETE ... RETURNING
+        yield f"PUT /{resource}/{{id}}", update_statement(model, 1, user_id, {"change_seq": 0}).returning(
+            *model.__table__.c
+        )
+        yield f"DELETE /{resource}/{{id}}", delete_statement(model, 1, user_id).returning(model.__table__.c.id)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, default=1, help="user whose queries to explain")
+    parser.add_argument("--analyze", action="store_true", help="Postgres only: EXPLAIN ANALYZE")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        dialect_name = db.get_bind().dialect.name
+        print(f"Backend: {dialect_name}")
+        for label, statement in route_queries(dialect_name, args.user_id):
+            print("\n" + "=" * 70)
+            print(label)
+            print("-" * 70)
+            for row in db.execute(Explain(statement, analyze=args.analyze)):
+                # SQLite rows are (id, parent, notused, detail); Postgres rows are one text column
+                print("  " + str(row[-1]))
+        db.rollback()
+    finally:
+        db.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,26 +1,55 @@
 import logging
 import os
 import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from dotenv import load_dotenv
 
 from controllers.users import router as users_router
 from app.routes.tasks import router as tasks_router
 from app.routes.habits import router as habits_router
 from app.routes.notes import router as notes_router
+from app.routes.export import router as export_router
+from app.routes.imports import router as imports_router
+from app.routes.dashboard import router as dashboard_router
+from app.routes.sync import router as sync_router
+from app.routes.events import router as events_router
+from app.services.user_cache import user_cache
+from app.services.response_cache import response_cache
+from app.services.events import event_hub
+from app.services.password_hashing import hashing_pool
+from app.services.request_logging import log_pipeline, log_request
+from app.services.metrics import metrics, status_class
+from app.services.query_stats import start_request
+from app.services.profiler import ProfilerMiddleware
+from config.environment import profile_secret
+from database import database_pool_status, dispose_engines, record_pool_metrics
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
 logger = logging.getLogger(__name__)
 
+metrics.registry.add_collector(record_pool_metrics)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Started here rather than at import, so they run again after a previous
+    # lifespan (a reload, or another TestClient) stopped them
+    log_pipeline.start()
+    metrics.start()
+    yield
+    hashing_pool.shutdown()
+    await dispose_engines()
+    metrics.stop()
+    log_pipeline.stop()
+
+
 app = FastAPI(
     title="Personal Productivity Dashboard API",
     description="Backend API for Personal Productivity Dashboard",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 load_dotenv()
@@ -51,39 +80,64 @@ else:
         expose_headers=["*"],
     )
 
+def _route(request: Request) -> str:
+    # The route template, not the path, so ids do not make new series
+    route = request.scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+def _record_request(request: Request, status_code: int, duration: float) -> None:
+    labels = {"method": request.method, "route": _route(request)}
+    metrics.registry.inc("http_requests_total", {**labels, "status": status_class(status_code)})
+    metrics.registry.observe("http_request_duration_seconds", labels, duration)
+
+
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
+    start_time = time.perf_counter()
     client_host = request.client.host if request.client else 'unknown'
-    logger.info(f"Incoming request: {request.method} {request.url.path} from {client_host}")
-    
+    metrics.registry.inc("http_requests_in_flight")
+    queries = start_request()
+
     try:
         response = await call_next(request)
-        elapsed_time = time.time() - start_time
-        
-        logger.info(
-            f"Response: {request.method} {request.url.path} "
-            f"Status: {response.status_code} Time: {elapsed_time:.3f}s"
-        )
-        
-        return response
     except Exception as error:
-        elapsed_time = time.time() - start_time
-        logger.error(
-            f"Error processing {request.method} {request.url.path}: {str(error)} "
-            f"Time: {elapsed_time:.3f}s",
-            exc_info=True
+        elapsed_time = time.perf_counter() - start_time
+        _record_request(request, 500, elapsed_time)
+        queries.warn_if_over(request.method, _route(request))
+        log_request(
+            request.method, request.url.path, 500, elapsed_time, client_host, error=error, extra=queries.fields()
         )
         return JSONResponse(
             status_code=500,
             content={"detail": "Internal server error"}
         )
+    finally:
+        metrics.registry.inc("http_requests_in_flight", amount=-1)
+
+    elapsed_time = time.perf_counter() - start_time
+    _record_request(request, response.status_code, elapsed_time)
+    queries.warn_if_over(request.method, _route(request))
+    # For a streamed body this covers the statements run before the first byte
+    response.headers["Server-Timing"] = queries.server_timing(elapsed_time)
+    log_request(
+        request.method, request.url.path, response.status_code, elapsed_time, client_host, extra=queries.fields()
+    )
+    return response
+
+if profile_secret:
+    # Added last, so it wraps the other middleware and profiles them too
+    app.add_middleware(ProfilerMiddleware)
 
 app.include_router(users_router)
 app.include_router(tasks_router)
 app.include_router(habits_router)
 app.include_router(notes_router)
+app.include_router(export_router)
+app.include_router(imports_router)
+app.include_router(dashboard_router)
+app.include_router(sync_router)
+app.include_router(events_router)
 
 @app.get("/")
 def read_root():
@@ -91,4 +145,34 @@ def read_root():
 
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "service": "Personal Productivity Dashboard API"}
\ No newline at end of file
+    return {"status": "healthy", "service": "Personal Productivity Dashboard API"}
+
+@app.get("/health/auth-cache")
+def auth_cache_stats():
+    return user_cache.stats()
+
+@app.get("/health/auth-hashing")
+def auth_hashing_stats():
+    return hashing_pool.stats()
+
+@app.get("/health/response-cache")
+def response_cache_stats():
+    return response_cache.stats()
+
+@app.get("/health/events")
+async def events_stats():
+    # On the event loop, where the hub's state changes
+    return event_hub.stats()
+
+@app.get("/health/logging")
+def logging_stats():
+    return log_pipeline.stats()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    # Reads the other workers' snapshot files, so off the event loop
+    return PlainTextResponse(metrics.exposition(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+@app.get("/health/pool")
+def pool_stats():
+    return database_pool_status()
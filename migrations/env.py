@@ -0,0 +1,82 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from database import database_url, engine
+from models.base import Base
+
+# Import every model so its table is registered on Base.metadata
+import models.user  # noqa: F401
+import app.models.task  # noqa: F401
+import app.models.habit  # noqa: F401
+import app.models.note  # noqa: F401
+import app.models.resource_version  # noqa: F401
+import app.models.user_counters  # noqa: F401
+import app.models.habit_checkin  # noqa: F401
+import app.models.tombstone  # noqa: F401
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+# Created by raw SQL in 0004_note_search, not part of the models: the SQLite
+# FTS5 table (and its shadow tables) and the Postgres search column and index
+SEARCH_TABLE_PREFIX = "notes_fts"
+SEARCH_COLUMNS = {("notes", "search_vector")}
+SEARCH_INDEXES = {"ix_notes_search_vector"}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    """
+    Keep autogenerate (and `alembic check`) from dropping the search objects.
+    """
+    if type_ == "table":
+        return not name.startswith(SEARCH_TABLE_PREFIX)
+    if type_ == "column":
+        return (object.table.name, name) not in SEARCH_COLUMNS
+    if type_ == "index":
+        return name not in SEARCH_INDEXES
+    return True
+
+
+def run_migrations_offline() -> None:
+    """
+    Emit the migration SQL to stdout instead of running it (`alembic upgrade head --sql`).
+    """
+    context.configure(
+        url=database_url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
+        render_as_batch=database_url.startswith("sqlite"),
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """
+    Run migrations against the same engine the app uses.
+    """
+    with engine.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
+            # SQLite cannot ALTER most things in place; batch mode recreates the table
+            render_as_batch=connection.dialect.name == "sqlite",
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
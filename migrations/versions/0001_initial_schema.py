@@ -0,0 +1,90 @@
+"""initial schema
+
+The tables as they existed before migrations were introduced. Databases that
+already have these tables should be stamped with this revision rather than
+upgraded through it.
+
+Revision ID: 0001_initial_schema
+Revises:
+Create Date: 2026-10-18 16:24:37.167415
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001_initial_schema'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _base_columns():
+    # id / created_at / updated_at from models.base.BaseModel
+    return [
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'users',
+        sa.Column('username', sa.String(), nullable=False),
+        sa.Column('email', sa.String(), nullable=False),
+        sa.Column('password_hash', sa.String(), nullable=True),
+        *_base_columns(),
+        sa.UniqueConstraint('email'),
+        sa.UniqueConstraint('username'),
+    )
+    op.create_index('ix_users_id', 'users', ['id'], unique=False)
+
+    op.create_table(
+        'tasks',
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('is_completed', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    )
+    op.create_index('ix_tasks_id', 'tasks', ['id'], unique=False)
+
+    op.create_table(
+        'habits',
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('description', sa.String(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    )
+    op.create_index('ix_habits_id', 'habits', ['id'], unique=False)
+
+    op.create_table(
+        'notes',
+        sa.Column('title', sa.String(), nullable=False),
+        sa.Column('content', sa.String(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        *_base_columns(),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+    )
+    op.create_index('ix_notes_id', 'notes', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notes_id', table_name='notes')
+    op.drop_table('notes')
+    op.drop_index('ix_habits_id', table_name='habits')
+    op.drop_table('habits')
+    op.drop_index('ix_tasks_id', table_name='tasks')
+    op.drop_table('tasks')
+    op.drop_index('ix_users_id', table_name='users')
+    op.drop_table('users')
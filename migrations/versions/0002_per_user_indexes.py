@@ -0,0 +1,37 @@
+"""per-user composite indexes on tasks, habits and notes
+
+Every list, update and delete filters on user_id, which had no index. The
+(user_id, created_at, id) indexes match the keyset pagination order exactly,
+so a page is an index range scan with no sort step.
+
+Revision ID: 0002_per_user_indexes
+Revises: 0001_initial_schema
+Create Date: 2026-10-18 16:40:12.512904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002_per_user_indexes'
+down_revision: Union[str, Sequence[str], None] = '0001_initial_schema'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+KEYSET_COLUMNS = ['user_id', 'created_at', 'id']
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_tasks_user_id_created_at_id', 'tasks', KEYSET_COLUMNS, unique=False)
+    op.create_index('ix_habits_user_id_created_at_id', 'habits', KEYSET_COLUMNS, unique=False)
+    op.create_index('ix_notes_user_id_created_at_id', 'notes', KEYSET_COLUMNS, unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_notes_user_id_created_at_id', table_name='notes')
+    op.drop_index('ix_habits_user_id_created_at_id', table_name='habits')
+    op.drop_index('ix_tasks_user_id_created_at_id', table_name='tasks')
@@ -0,0 +1,39 @@
+"""resource_versions table for list ETags
+
+One row per (user, resource) holding a counter that every write to that
+resource bumps. GET /tasks/, /habits/ and /notes/ derive their ETag from it,
+so a conditional request is answered with a primary-key lookup.
+
+Revision ID: 0003_resource_versions
+Revises: 0002_per_user_indexes
+Create Date: 2026-10-18 17:05:41.208315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003_resource_versions'
+down_revision: Union[str, Sequence[str], None] = '0002_per_user_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'resource_versions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resource', sa.String(), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id', 'resource'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('resource_versions')
@@ -0,0 +1,72 @@
+"""full-text search index on notes
+
+SQLite: an external-content FTS5 table over notes(title, content), filled
+from the existing rows and kept in sync by triggers.
+Postgres: a generated, weighted tsvector column (title A, content B) with a
+GIN index; Postgres fills it for existing rows itself.
+
+Revision ID: 0004_note_search
+Revises: 0003_resource_versions
+Create Date: 2026-10-18 17:12:09.604117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004_note_search'
+down_revision: Union[str, Sequence[str], None] = '0003_resource_versions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SQLITE_UPGRADE = [
+    "CREATE VIRTUAL TABLE notes_fts USING fts5("
+    "title, content, content='notes', content_rowid='id', "
+    "tokenize='porter unicode61 remove_diacritics 2')",
+    "INSERT INTO notes_fts(notes_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER notes_fts_insert AFTER INSERT ON notes BEGIN "
+    "INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+    "CREATE TRIGGER notes_fts_delete AFTER DELETE ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); END",
+    "CREATE TRIGGER notes_fts_update AFTER UPDATE OF title, content ON notes BEGIN "
+    "INSERT INTO notes_fts(notes_fts, rowid, title, content) "
+    "VALUES ('delete', old.id, old.title, old.content); "
+    "INSERT INTO notes_fts(rowid, title, content) VALUES (new.id, new.title, new.content); END",
+]
+
+SQLITE_DOWNGRADE = [
+    'DROP TRIGGER IF EXISTS notes_fts_update',
+    'DROP TRIGGER IF EXISTS notes_fts_delete',
+    'DROP TRIGGER IF EXISTS notes_fts_insert',
+    'DROP TABLE IF EXISTS notes_fts',
+]
+
+POSTGRES_UPGRADE = [
+    "ALTER TABLE notes ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(content, '')), 'B')) STORED",
+    'CREATE INDEX ix_notes_search_vector ON notes USING GIN (search_vector)',
+]
+
+POSTGRES_DOWNGRADE = [
+    'DROP INDEX IF EXISTS ix_notes_search_vector',
+    'ALTER TABLE notes DROP COLUMN IF EXISTS search_vector',
+]
+
+
+def _run(statements_by_dialect) -> None:
+    for statement in statements_by_dialect.get(op.get_bind().dialect.name, []):
+        op.execute(statement)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _run({'sqlite': SQLITE_UPGRADE, 'postgresql': POSTGRES_UPGRADE})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _run({'sqlite': SQLITE_DOWNGRADE, 'postgresql': POSTGRES_DOWNGRADE})
@@ -0,0 +1,56 @@
+"""user_counters table for GET /dashboard/summary
+
+One row per user with the open/completed task, active/inactive habit and
+note counts, maintained by every write. Existing users are backfilled by
+counting their rows, like reconcile_counters.py does.
+
+Revision ID: 0005_user_counters
+Revises: 0004_note_search
+Create Date: 2026-10-18 19:12:03.554120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005_user_counters'
+down_revision: Union[str, Sequence[str], None] = '0004_note_search'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+BACKFILL = """
+INSERT INTO user_counters (user_id, open_tasks, completed_tasks, active_habits, inactive_habits, notes)
+SELECT
+    users.id,
+    (SELECT count(*) FROM tasks WHERE tasks.user_id = users.id AND NOT coalesce(tasks.is_completed, false)),
+    (SELECT count(*) FROM tasks WHERE tasks.user_id = users.id AND coalesce(tasks.is_completed, false)),
+    (SELECT count(*) FROM habits WHERE habits.user_id = users.id AND coalesce(habits.is_active, false)),
+    (SELECT count(*) FROM habits WHERE habits.user_id = users.id AND NOT coalesce(habits.is_active, false)),
+    (SELECT count(*) FROM notes WHERE notes.user_id = users.id)
+FROM users
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'user_counters',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('open_tasks', sa.Integer(), nullable=False),
+        sa.Column('completed_tasks', sa.Integer(), nullable=False),
+        sa.Column('active_habits', sa.Integer(), nullable=False),
+        sa.Column('inactive_habits', sa.Integer(), nullable=False),
+        sa.Column('notes', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('user_id'),
+    )
+    op.execute(BACKFILL)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('user_counters')
@@ -0,0 +1,56 @@
+"""habit_checkins table and streak columns on habits
+
+One row per (habit, day) a habit was done. The habit keeps current/longest
+streak, total check-ins and the last check-in day, updated on every
+check-in, so listing habits does not read the history. Existing habits have
+no check-ins, so the new columns start at 0 / NULL.
+
+Revision ID: 0006_habit_checkins
+Revises: 0005_user_counters
+Create Date: 2026-10-18 20:31:47.902114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006_habit_checkins'
+down_revision: Union[str, Sequence[str], None] = '0005_user_counters'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('habits', sa.Column('current_streak', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('habits', sa.Column('longest_streak', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('habits', sa.Column('total_checkins', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('habits', sa.Column('last_checkin_date', sa.Date(), nullable=True))
+
+    op.create_table(
+        'habit_checkins',
+        sa.Column('habit_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['habit_id'], ['habits.id']),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('habit_id', 'date', name='uq_habit_checkins_habit_id_date'),
+    )
+    op.create_index(op.f('ix_habit_checkins_id'), 'habit_checkins', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_habit_checkins_id'), table_name='habit_checkins')
+    op.drop_table('habit_checkins')
+    op.drop_column('habits', 'last_checkin_date')
+    op.drop_column('habits', 'total_checkins')
+    op.drop_column('habits', 'longest_streak')
+    op.drop_column('habits', 'current_streak')
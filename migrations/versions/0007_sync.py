@@ -0,0 +1,59 @@
+"""change_seq columns and tombstones table for GET /sync
+
+Tasks, habits and notes get the list version of their last write
+(change_seq) with a (user_id, change_seq, id) index, and deletes leave a
+row in tombstones. Existing rows start at change_seq 0, which a full sync
+includes.
+
+Revision ID: 0007_sync
+Revises: 0006_habit_checkins
+Create Date: 2026-10-18 21:48:10.317645
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007_sync'
+down_revision: Union[str, Sequence[str], None] = '0006_habit_checkins'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+SYNCED_TABLES = ('tasks', 'habits', 'notes')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in SYNCED_TABLES:
+        op.add_column(table, sa.Column('change_seq', sa.Integer(), server_default='0', nullable=False))
+        op.create_index(f'ix_{table}_user_id_change_seq', table, ['user_id', 'change_seq', 'id'], unique=False)
+
+    op.create_table(
+        'tombstones',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('resource', sa.String(), nullable=False),
+        sa.Column('item_id', sa.Integer(), nullable=False),
+        sa.Column('change_seq', sa.Integer(), nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_tombstones_user_id_resource_change_seq',
+        'tombstones',
+        ['user_id', 'resource', 'change_seq', 'item_id'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstones_user_id_resource_change_seq', table_name='tombstones')
+    op.drop_table('tombstones')
+    for table in reversed(SYNCED_TABLES):
+        op.drop_index(f'ix_{table}_user_id_change_seq', table_name=table)
+        op.drop_column(table, 'change_seq')
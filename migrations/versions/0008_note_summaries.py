@@ -0,0 +1,41 @@
+"""preview and content_length columns on notes
+
+The note list returns summaries instead of the full content, so the start
+of the content and its length are stored next to it (kept up to date by the
+Note model) and backfilled here for existing notes.
+
+Revision ID: 0008_note_summaries
+Revises: 0007_sync
+Create Date: 2026-10-18 22:31:04.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008_note_summaries'
+down_revision: Union[str, Sequence[str], None] = '0007_sync'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# app.models.note.PREVIEW_LENGTH when this migration was written
+PREVIEW_LENGTH = 200
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('notes', sa.Column('preview', sa.String(), nullable=True))
+    op.add_column('notes', sa.Column('content_length', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        f"UPDATE notes SET preview = substr(content, 1, {PREVIEW_LENGTH}), "
+        "content_length = coalesce(length(content), 0)"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('notes', 'content_length')
+    op.drop_column('notes', 'preview')
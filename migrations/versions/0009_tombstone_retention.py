@@ -0,0 +1,35 @@
+"""purged_seq on resource_versions and a deleted_at index on tombstones
+
+Old tombstones are purged (purge_tombstones.py). resource_versions records
+the highest change_seq purged per user and resource, so GET /sync can tell
+a client whose token is older than that to resync fully, and the purge
+finds old tombstones by deleted_at.
+
+Revision ID: 0009_tombstone_retention
+Revises: 0008_note_summaries
+Create Date: 2026-10-18 23:12:40.502117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009_tombstone_retention'
+down_revision: Union[str, Sequence[str], None] = '0008_note_summaries'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('resource_versions', sa.Column('purged_seq', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_tombstones_deleted_at', 'tombstones', ['deleted_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tombstones_deleted_at', table_name='tombstones')
+    op.drop_column('resource_versions', 'purged_seq')
@@ -0,0 +1,33 @@
+"""drop the open-task and active-habit partial indexes
+
+No query filters on is_completed or is_active, so ix_tasks_user_id_open and
+ix_habits_user_id_active were never used and only slowed down writes.
+0002_per_user_indexes no longer creates them; this drops them from
+databases that were upgraded before that.
+
+Revision ID: 0010_drop_partial_indexes
+Revises: 0009_tombstone_retention
+Create Date: 2026-10-19 09:20:33.871402
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010_drop_partial_indexes'
+down_revision: Union[str, Sequence[str], None] = '0009_tombstone_retention'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_tasks_user_id_open', table_name='tasks', if_exists=True)
+    op.drop_index('ix_habits_user_id_active', table_name='habits', if_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Nothing to restore: 0002_per_user_indexes does not create them any more
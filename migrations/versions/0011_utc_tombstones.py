@@ -0,0 +1,40 @@
+"""store tombstones.deleted_at in UTC
+
+deleted_at defaulted to now(), which Postgres gives in the server's time
+zone, while purge_tombstones.py compares it with the current UTC time. New
+tombstones get timezone('utc', now()); this converts the existing ones from
+the server's time zone. SQLite already stored UTC (CURRENT_TIMESTAMP).
+
+Revision ID: 0011_utc_tombstones
+Revises: 0010_drop_partial_indexes
+Create Date: 2026-10-19 10:02:51.226039
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011_utc_tombstones'
+down_revision: Union[str, Sequence[str], None] = '0010_drop_partial_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE tombstones SET deleted_at = "
+            "(deleted_at AT TIME ZONE current_setting('TimeZone')) AT TIME ZONE 'UTC'"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute(
+            "UPDATE tombstones SET deleted_at = "
+            "(deleted_at AT TIME ZONE 'UTC') AT TIME ZONE current_setting('TimeZone')"
+        )
@@ -1,14 +1,12 @@
 from sqlalchemy import Column, Integer, String
 from .base import BaseModel
-from passlib.context import CryptContext
 from datetime import datetime, timezone, timedelta
 import jwt
 from config.environment import secret
 from sqlalchemy.orm import relationship # add relationship
+from app.services.password_hashing import pwd_context
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 class UserModel(BaseModel):
 
     __tablename__ = "users"
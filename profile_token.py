@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Print an X-Profile-Token for profiling single requests (see
+app/services/profiler.py). Needs the server's PROFILE_SECRET, from the
+environment or .env:
+
+    python3 profile_token.py --minutes 10
+    curl -H "X-Profile-Token: $(python3 profile_token.py)" -H "Authorization: Bearer ..." \
+        http://localhost:8000/tasks/
+
+The profile is written to PROFILE_DIR on the server; the response's
+X-Profile-Id header names it.
+"""
+import argparse
+import sys
+import time
+
+from app.services.profiler import sign_token
+from config.environment import profile_secret
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=5, help="how long the token stays valid")
+    args = parser.parse_args()
+
+    if not profile_secret:
+        print("PROFILE_SECRET is not set", file=sys.stderr)
+        return 1
+    print(sign_token(profile_secret, int(time.time() + args.minutes * 60)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Delete the sync tombstones (records of deleted tasks, habits and notes)
+older than SYNC_TOMBSTONE_RETENTION_DAYS.
+
+Without this the tombstones table grows with every delete forever. Clients
+whose sync token is older than the purged tombstones get a full resync on
+their next GET /sync. Run it daily, e.g. from cron. Uses the database
+configured in .env (or the SQLite fallback):
+
+    python3 purge_tombstones.py              # SYNC_TOMBSTONE_RETENTION_DAYS
+    python3 purge_tombstones.py --days 30
+"""
+import argparse
+import asyncio
+import sys
+
+import database
+from database import session_scope
+from app.services.sync import purge_tombstones
+from config.environment import sync_tombstone_retention_days
+
+
+async def run(args):
+    try:
+        async with session_scope() as db:
+            purged = await purge_tombstones(db, args.days)
+            await db.commit()
+    finally:
+        await database.dispose_engines()
+    print(f"Deleted {purged} tombstones older than {args.days} days.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=sync_tombstone_retention_days,
+        help=f"keep this many days of tombstones (default: {sync_tombstone_retention_days})",
+    )
+    args = parser.parse_args()
+    if args.days < 0:
+        parser.error("--days must not be negative")
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
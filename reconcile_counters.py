@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Recount the dashboard counters (user_counters) from the task, habit and note
+tables.
+
+Every write keeps the counters up to date, so this is only needed when rows
+were changed behind the API's back (manual SQL, a restored backup, ...).
+Uses the database configured in .env (or the SQLite fallback):
+
+    python3 reconcile_counters.py              # every user
+    python3 reconcile_counters.py --user-id 42
+
+Prints the users whose counters were wrong before the rebuild.
+"""
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy import select
+
+import database
+from database import session_scope
+from app.models.user_counters import UserCounters
+from app.services.counters import COUNTER_NAMES, rebuild_counters
+
+
+async def _snapshot(db, user_id):
+    statement = select(UserCounters)
+    if user_id is not None:
+        statement = statement.where(UserCounters.user_id == user_id)
+    rows = (await db.execute(statement.execution_options(populate_existing=True))).scalars()
+    return {row.user_id: {counter: getattr(row, counter) for counter in COUNTER_NAMES} for row in rows}
+
+
+async def run(args):
+    try:
+        async with session_scope() as db:
+            before = await _snapshot(db, args.user_id)
+            await rebuild_counters(db, args.user_id)
+            after = await _snapshot(db, args.user_id)
+            await db.commit()
+    finally:
+        await database.dispose_engines()
+
+    drifted = 0
+    for user_id, counts in sorted(after.items()):
+        old = before.get(user_id)
+        if old == counts:
+            continue
+        drifted += 1
+        changes = ", ".join(
+            f"{counter} {old[counter] if old else '-'} -> {counts[counter]}"
+            for counter in COUNTER_NAMES
+            if old is None or old[counter] != counts[counter]
+        )
+        print(f"user {user_id}: {changes}")
+    print(f"Checked {len(after)} users, fixed {drifted}.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--user-id", type=int, help="only this user (default: everyone)")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 
 class UserSignUp(BaseModel):
@@ -15,8 +15,7 @@ class UserResponse(BaseModel):
     username: str
     email: EmailStr
 
-    class Config:
-        orm_mode = True  # Allows Pydantic to work with SQLAlchemy models
+    model_config = ConfigDict(from_attributes=True)  # Allows Pydantic to work with SQLAlchemy models
 
 class AuthResponse(BaseModel):
     token: str
@@ -27,5 +26,4 @@ class UserSchema(BaseModel):
     username: str
     email: EmailStr
 
-    class Config:
-        orm_mode = True  # Allows Pydantic to work with SQLAlchemy models
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)  # Allows Pydantic to work with SQLAlchemy models
\ No newline at end of file
@@ -0,0 +1,54 @@
+"""
+Fixtures for the API tests: the app on a throwaway SQLite database, and a
+freshly registered user per test.
+"""
+
+import os
+import tempfile
+import uuid
+
+import pytest
+
+_data_dir = tempfile.mkdtemp(prefix="productivity-tests-")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_data_dir}/test.db")
+os.environ.setdefault("JWT_SECRET", "test-secret-test-secret-test-secret-0123")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+import main  # noqa: E402
+from database import engine  # noqa: E402
+from models.base import Base  # noqa: E402
+import app.models.habit  # noqa: E402,F401
+import app.models.habit_checkin  # noqa: E402,F401
+import app.models.note  # noqa: E402,F401
+import app.models.resource_version  # noqa: E402,F401
+import app.models.task  # noqa: E402,F401
+import app.models.tombstone  # noqa: E402,F401
+import app.models.user_counters  # noqa: E402,F401
+
+
+@pytest.fixture(scope="session")
+def client():
+    Base.metadata.create_all(bind=engine)
+    with TestClient(main.app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def headers(client):
+    name = f"user{uuid.uuid4().hex[:12]}"
+    response = client.post(
+        "/api/register/",
+        json={"username": name, "email": f"{name}@example.com", "password": "password"},
+    )
+    assert response.status_code == 201, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+@pytest.fixture
+def run(client):
+    """
+    Run a coroutine on the app's event loop, where its database engine lives.
+    """
+    return client.portal.call
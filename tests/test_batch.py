@@ -0,0 +1,58 @@
+"""
+POST /{resource}/batch: operations that fail get their own result, the
+others are applied.
+"""
+
+
+def test_batch_partial_failure(client, headers):
+    kept = client.post("/tasks/", json={"title": "kept"}, headers=headers).json()["id"]
+    doomed = client.post("/tasks/", json={"title": "doomed"}, headers=headers).json()["id"]
+
+    response = client.post(
+        "/tasks/batch",
+        json={
+            "operations": [
+                {"op": "create", "data": {"title": "new"}},
+                {"op": "update", "id": kept, "data": {"title": "kept updated", "is_completed": True}},
+                {"op": "update", "id": 999999, "data": {"title": "nobody's"}},
+                {"op": "delete", "id": doomed},
+                {"op": "delete", "id": 999998},
+            ]
+        },
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    results = response.json()["results"]
+    assert [(result["index"], result["op"], result["status"]) for result in results] == [
+        (0, "create", 201),
+        (1, "update", 200),
+        (2, "update", 404),
+        (3, "delete", 204),
+        (4, "delete", 404),
+    ]
+    assert results[1]["item"]["title"] == "kept updated"
+
+    titles = {item["id"]: item["title"] for item in client.get("/tasks/", headers=headers).json()["items"]}
+    assert titles == {kept: "kept updated", results[0]["id"]: "new"}
+
+
+def test_another_users_rows_are_not_found(client, headers):
+    other = client.post("/api/register/", json={"username": "batchother", "email": "batchother@example.com", "password": "password"})
+    other_headers = {"Authorization": f"Bearer {other.json()['token']}"}
+    foreign = client.post("/tasks/", json={"title": "theirs"}, headers=other_headers).json()["id"]
+
+    for operation in ({"op": "update", "id": foreign, "data": {"title": "mine now"}}, {"op": "delete", "id": foreign}):
+        response = client.post("/tasks/batch", json={"operations": [operation]}, headers=headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["results"][0]["status"] == 404
+    assert client.get("/tasks/", headers=other_headers).json()["items"][0]["title"] == "theirs"
+
+
+def test_duplicate_ids_are_rejected(client, headers):
+    task = client.post("/tasks/", json={"title": "task"}, headers=headers).json()["id"]
+    response = client.post(
+        "/tasks/batch",
+        json={"operations": [{"op": "update", "id": task, "data": {"title": "a"}}, {"op": "delete", "id": task}]},
+        headers=headers,
+    )
+    assert response.status_code == 400
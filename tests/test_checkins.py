@@ -0,0 +1,115 @@
+"""
+The streak columns that check_in / undo_check_in update incrementally must
+always match a full recount of the habit's check-ins.
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.services.checkins import _longest_run
+from database import session_scope
+
+FIRST_DAY = date(2024, 1, 1)
+
+
+def _recount(days: set[date]) -> dict:
+    longest = current = 0
+    previous = None
+    for day in sorted(days):
+        current = current + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        longest = max(longest, current)
+        previous = day
+    return {
+        "current_streak": current,
+        "longest_streak": longest,
+        "total_checkins": len(days),
+        "last_checkin_date": previous.isoformat() if previous is not None else None,
+    }
+
+
+def _replay(client, headers, run, steps):
+    """
+    Apply ("in" | "undo", day offset) steps to a new habit and check its
+    streaks against a recount after each one.
+    """
+    response = client.post("/habits/", json={"title": "streaks"}, headers=headers)
+    assert response.status_code == 201, response.text
+    habit_id = response.json()["id"]
+
+    async def longest_run():
+        async with session_scope() as db:
+            return await _longest_run(db, habit_id)
+
+    days: set[date] = set()
+    for action, offset in steps:
+        day = FIRST_DAY + timedelta(days=offset)
+        if action == "in":
+            response = client.post(f"/habits/{habit_id}/checkins", json={"day": day.isoformat()}, headers=headers)
+            days.add(day)
+        else:
+            response = client.delete(f"/habits/{habit_id}/checkins/{day.isoformat()}", headers=headers)
+            days.discard(day)
+        assert response.status_code == 200, response.text
+        habit = response.json()
+        expected = _recount(days)
+        assert {key: habit[key] for key in expected} == expected, (action, offset)
+        assert run(longest_run) == expected["longest_streak"]
+    return habit_id
+
+
+@pytest.mark.parametrize(
+    "steps",
+    [
+        # Consecutive days, then one that starts a new streak
+        [("in", 0), ("in", 1), ("in", 2), ("in", 5)],
+        # Backfilling the gap joins two runs into the current streak
+        [("in", 0), ("in", 1), ("in", 3), ("in", 4), ("in", 2)],
+        # Backfilling a gap between two older runs does not touch the current streak
+        [("in", 0), ("in", 2), ("in", 10), ("in", 11), ("in", 1)],
+        # Backfilling before the first day
+        [("in", 5), ("in", 6), ("in", 4), ("in", 2)],
+        # Undoing the last day falls back to the day before
+        [("in", 0), ("in", 1), ("in", 2), ("undo", 2)],
+        # Undoing the last day after a gap falls back to the previous run
+        [("in", 0), ("in", 1), ("in", 5), ("undo", 5)],
+        # Undoing the only day
+        [("in", 3), ("undo", 3)],
+        # Undoing inside the longest run splits it; the longest is recounted
+        [("in", 0), ("in", 1), ("in", 2), ("in", 3), ("in", 4), ("in", 8), ("in", 9), ("undo", 2)],
+        # Undoing inside the current streak shortens it to the days after
+        [("in", 0), ("in", 1), ("in", 2), ("in", 3), ("undo", 1)],
+        # Undoing inside a run that is not the longest keeps the longest
+        [("in", 0), ("in", 1), ("in", 2), ("in", 3), ("in", 6), ("in", 7), ("in", 8), ("undo", 7)],
+        # Undoing the first day of the longest run
+        [("in", 0), ("in", 1), ("in", 2), ("in", 5), ("in", 6), ("undo", 0)],
+        # Checking in a day twice changes nothing
+        [("in", 0), ("in", 1), ("in", 1), ("in", 0)],
+    ],
+)
+def test_streaks_match_recount(client, headers, run, steps):
+    _replay(client, headers, run, steps)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_check_ins_and_undos_match_recount(client, headers, run, seed):
+    rng = random.Random(seed)
+    days: set[int] = set()
+    steps = []
+    for _ in range(60):
+        if days and rng.random() < 0.35:
+            offset = rng.choice(sorted(days))
+            days.discard(offset)
+            steps.append(("undo", offset))
+        else:
+            offset = rng.randrange(30)
+            days.add(offset)
+            steps.append(("in", offset))
+    _replay(client, headers, run, steps)
+
+
+def test_undo_missing_check_in_is_404(client, headers):
+    habit_id = client.post("/habits/", json={"title": "streaks"}, headers=headers).json()["id"]
+    response = client.delete(f"/habits/{habit_id}/checkins/{FIRST_DAY.isoformat()}", headers=headers)
+    assert response.status_code == 404
@@ -0,0 +1,67 @@
+"""
+Dashboard counters stay equal to a full recount through every kind of write.
+"""
+
+import json
+import random
+
+from database import session_scope
+from app.services.counters import read_counters, rebuild_counters
+
+
+def _recount(client, headers) -> dict:
+    tasks = client.get("/tasks/", params={"limit": 100}, headers=headers).json()["items"]
+    habits = client.get("/habits/", params={"limit": 100}, headers=headers).json()["items"]
+    notes = client.get("/notes/", params={"limit": 100}, headers=headers).json()["items"]
+    return {
+        "open_tasks": sum(not task["is_completed"] for task in tasks),
+        "completed_tasks": sum(task["is_completed"] for task in tasks),
+        "active_habits": sum(habit["is_active"] for habit in habits),
+        "inactive_habits": sum(not habit["is_active"] for habit in habits),
+        "notes": len(notes),
+    }
+
+
+def _summary(client, headers) -> dict:
+    response = client.get("/dashboard/summary", headers=headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_counters_match_a_recount(client, headers, run):
+    rng = random.Random(15)
+    user_id = client.post("/tasks/", json={"title": "first"}, headers=headers).json()["user_id"]
+    for step in range(60):
+        resource, flag = rng.choice([("tasks", "is_completed"), ("habits", "is_active"), ("notes", None)])
+        items = client.get(f"/{resource}/", params={"limit": 100}, headers=headers).json()["items"]
+        action = rng.choice(["create", "update", "delete", "batch"] if items else ["create", "batch"])
+        data = {"title": f"{resource} {step}"}
+        if flag:
+            data[flag] = rng.random() < 0.5
+        if action == "create":
+            response = client.post(f"/{resource}/", json=data, headers=headers)
+        elif action == "update":
+            response = client.put(f"/{resource}/{rng.choice(items)['id']}", json=data, headers=headers)
+        elif action == "delete":
+            response = client.delete(f"/{resource}/{rng.choice(items)['id']}", headers=headers)
+        else:
+            operations = [{"op": "create", "data": data}]
+            if items:
+                target = rng.choice(items)["id"]
+                operations.append(rng.choice([{"op": "update", "id": target, "data": data}, {"op": "delete", "id": target}]))
+            response = client.post(f"/{resource}/batch", json={"operations": operations}, headers=headers)
+        assert response.status_code < 300, response.text
+        assert _summary(client, headers) == _recount(client, headers), (step, resource, action)
+
+    lines = [json.dumps({"type": "task", "data": {"title": "imported", "is_completed": True}}), "{bad"]
+    client.post("/import", content="\n".join(lines).encode(), headers=headers)
+    summary = _summary(client, headers)
+    assert summary == _recount(client, headers)
+
+    async def rebuilt():
+        async with session_scope() as db:
+            await rebuild_counters(db, user_id)
+            await db.commit()
+            return await read_counters(db, user_id)
+
+    assert run(rebuilt) == summary
@@ -0,0 +1,44 @@
+"""
+Conditional GETs of the lists and the response cache behind them.
+"""
+
+from app.services.response_cache import response_cache
+
+
+def test_if_none_match_is_304_until_a_write(client, headers):
+    client.post("/habits/", json={"title": "read"}, headers=headers)
+    first = client.get("/habits/", headers=headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+
+    unchanged = client.get("/habits/", headers={**headers, "If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.headers["etag"] == etag
+    assert unchanged.content == b""
+
+    client.post("/habits/", json={"title": "run"}, headers=headers)
+    changed = client.get("/habits/", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert {item["title"] for item in changed.json()["items"]} == {"read", "run"}
+
+
+def test_etag_depends_on_the_query(client, headers):
+    client.post("/habits/", json={"title": "read"}, headers=headers)
+    etag = client.get("/habits/", headers=headers).headers["etag"]
+    response = client.get("/habits/", params={"limit": 1}, headers={**headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_write_invalidates_the_cached_list(client, headers):
+    task = client.post("/tasks/", json={"title": "before"}, headers=headers).json()["id"]
+    client.get("/tasks/", headers=headers)
+    hits = response_cache.stats()["hits"]
+    assert client.get("/tasks/", headers=headers).json()["items"][0]["title"] == "before"
+    assert response_cache.stats()["hits"] == hits + 1
+
+    invalidations = response_cache.stats()["invalidations"]
+    assert client.put(f"/tasks/{task}", json={"title": "after"}, headers=headers).status_code == 200
+    assert response_cache.stats()["invalidations"] == invalidations + 1
+    assert client.get("/tasks/", headers=headers).json()["items"][0]["title"] == "after"
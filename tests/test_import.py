@@ -0,0 +1,63 @@
+"""
+POST /import: valid lines are saved, invalid ones are reported by line number.
+"""
+
+import json
+
+
+def _import(client, headers, lines: list[str], **params):
+    return client.post(
+        "/import",
+        params=params,
+        content="\n".join(lines).encode(),
+        headers={**headers, "Content-Type": "application/x-ndjson"},
+    )
+
+
+def test_import_reports_invalid_lines(client, headers):
+    response = _import(
+        client,
+        headers,
+        [
+            json.dumps({"type": "task", "data": {"title": "imported task"}}),
+            "{not json",
+            json.dumps({"type": "task", "data": {"description": "no title"}}),
+            "",
+            json.dumps({"type": "recipe", "data": {"title": "soup"}}),
+            json.dumps({"type": "note", "data": {"title": "imported note", "content": "text"}}),
+            "[1, 2]",
+            json.dumps({"type": "habit", "data": {"title": "imported habit"}}),
+        ],
+    )
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert report["format"] == "ndjson"
+    assert report["imported"] == {"task": 1, "habit": 1, "note": 1}
+    assert report["failed"] == 4
+    assert [error["line"] for error in report["errors"]] == [2, 3, 5, 7]
+    assert report["errors"][0]["error"].startswith("Invalid JSON")
+    assert "title" in report["errors"][1]["error"]
+    assert "recipe" in report["errors"][2]["error"]
+    assert report["errors_truncated"] is False
+
+    assert [item["title"] for item in client.get("/tasks/", headers=headers).json()["items"]] == ["imported task"]
+    assert [item["title"] for item in client.get("/notes/", headers=headers).json()["items"]] == ["imported note"]
+
+
+def test_import_with_type_parameter(client, headers):
+    response = _import(client, headers, [json.dumps({"title": "a"}), json.dumps({"title": "b"})], type="habit")
+    assert response.json()["imported"]["habit"] == 2
+    assert response.json()["failed"] == 0
+    assert len(client.get("/habits/", headers=headers).json()["items"]) == 2
+
+
+def test_import_csv(client, headers):
+    response = client.post(
+        "/import",
+        content=b"type,title\ntask,from csv\nrecipe,soup\n",
+        headers={**headers, "Content-Type": "text/csv"},
+    )
+    report = response.json()
+    assert report["format"] == "csv"
+    assert report["imported"]["task"] == 1
+    assert [error["line"] for error in report["errors"]] == [3]
@@ -0,0 +1,55 @@
+"""
+The log writer and the metrics flusher run again after a lifespan has
+stopped them (a reload, or one TestClient after another).
+"""
+
+import logging
+import os
+import time
+
+import main
+from app.services.metrics import Metrics
+from app.services.request_logging import log_pipeline
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_logging_runs_in_every_lifespan(client, run):
+    async def lifespans():
+        async with main.lifespan(main.app):
+            pass
+        assert not log_pipeline.stats()["running"]
+        # Stopped: the queue handler is gone, records are written directly
+        assert log_pipeline.handler not in logging.getLogger().handlers
+
+        async with main.lifespan(main.app):
+            assert log_pipeline.stats()["running"]
+            assert log_pipeline.handler in logging.getLogger().handlers
+            logging.getLogger("tests").warning("after a restart")
+            assert _wait_for(lambda: log_pipeline.stats()["queued"] == 0)
+
+    try:
+        run(lifespans)
+    finally:
+        # The session's client is still inside its own lifespan
+        log_pipeline.start()
+
+
+def test_metrics_flusher_restarts(tmp_path):
+    metrics = Metrics(str(tmp_path), flush_seconds=0.01)
+    metrics.start()
+    metrics.stop()
+    os.remove(tmp_path / f"{os.getpid()}.json")
+
+    metrics.start()
+    try:
+        assert _wait_for(lambda: (tmp_path / f"{os.getpid()}.json").exists())
+    finally:
+        metrics.stop()
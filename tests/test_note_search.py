@@ -0,0 +1,43 @@
+"""
+GET /notes/search: highlights are safe to insert as HTML, and the cursor
+pages through every match once.
+"""
+
+
+def _create(client, headers, title: str, content: str) -> int:
+    response = client.post("/notes/", json={"title": title, "content": content}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def test_highlights_escape_the_note_text(client, headers):
+    _create(client, headers, "<b>Apple</b> & pears", 'eat an apple <img src=x onerror="alert(1)">')
+    response = client.get("/notes/search", params={"q": "apple"}, headers=headers)
+    assert response.status_code == 200, response.text
+    (hit,) = response.json()["items"]
+    assert hit["title_highlight"] == "&lt;b&gt;<mark>Apple</mark>&lt;/b&gt; &amp; pears"
+    assert "<mark>apple</mark>" in hit["snippet"]
+    assert "<img" not in hit["snippet"]
+    assert "&lt;img" in hit["snippet"]
+
+
+def test_cursor_pages_through_every_match(client, headers):
+    ids = {_create(client, headers, f"walnut {i}", "walnut " * (i + 1)) for i in range(5)}
+    _create(client, headers, "unrelated", "nothing here")
+
+    seen, after = [], None
+    while True:
+        params = {"q": "walnut", "limit": 2}
+        if after is not None:
+            params["after"] = after
+        page = client.get("/notes/search", params=params, headers=headers).json()
+        seen += [hit["id"] for hit in page["items"]]
+        scores = [hit["score"] for hit in page["items"]]
+        assert scores == sorted(scores, reverse=True)
+        after = page["next_cursor"]
+        if after is None:
+            break
+    assert sorted(seen) == sorted(ids)
+
+    response = client.get("/notes/search", params={"q": "walnut", "after": "not a cursor"}, headers=headers)
+    assert response.status_code == 400
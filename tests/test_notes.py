@@ -0,0 +1,57 @@
+"""
+The note list's preview and content_length follow the content through every
+kind of write.
+"""
+
+from app.models.note import PREVIEW_LENGTH, Note
+from app.services.writes import update_returning
+from database import session_scope
+
+LONG_CONTENT = "word " * 100
+
+
+def _list_item(client, headers, note_id: int) -> dict:
+    items = client.get("/notes/", params={"limit": 200}, headers=headers).json()["items"]
+    return next(item for item in items if item["id"] == note_id)
+
+
+def _create(client, headers) -> dict:
+    response = client.post("/notes/", json={"title": "note", "content": LONG_CONTENT}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()
+
+
+def test_title_only_update_keeps_the_summary(client, headers, run):
+    created = _create(client, headers)
+    note_id, user_id = created["id"], created["user_id"]
+
+    async def rename():
+        async with session_scope() as db:
+            note = await update_returning(db, Note, note_id, user_id, {"title": "renamed"})
+            await db.commit()
+            return note
+
+    note = run(rename)
+    assert note["preview"] == LONG_CONTENT[:PREVIEW_LENGTH]
+    assert note["content_length"] == len(LONG_CONTENT)
+    item = _list_item(client, headers, note_id)
+    assert item["title"] == "renamed"
+    assert item["preview"] == LONG_CONTENT[:PREVIEW_LENGTH]
+    assert item["content_length"] == len(LONG_CONTENT)
+
+
+def test_content_updates_refresh_the_summary(client, headers):
+    note_id = _create(client, headers)["id"]
+    response = client.put(f"/notes/{note_id}", json={"title": "note", "content": "short"}, headers=headers)
+    assert response.status_code == 200, response.text
+    item = _list_item(client, headers, note_id)
+    assert (item["preview"], item["content_length"]) == ("short", 5)
+
+    response = client.post(
+        "/notes/batch",
+        json={"operations": [{"op": "update", "id": note_id, "data": {"title": "note", "content": "batched"}}]},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    item = _list_item(client, headers, note_id)
+    assert (item["preview"], item["content_length"]) == ("batched", 7)
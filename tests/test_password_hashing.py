@@ -0,0 +1,48 @@
+"""
+Logins keep working when a hashing worker dies.
+"""
+
+import os
+import signal
+import uuid
+from concurrent.futures.process import BrokenProcessPool
+
+from app.services.password_hashing import hashing_pool
+
+
+def _register(client) -> dict:
+    name = f"user{uuid.uuid4().hex[:12]}"
+    credentials = {"email": f"{name}@example.com", "password": "password"}
+    response = client.post("/api/register/", json={"username": name, **credentials})
+    assert response.status_code == 201, response.text
+    return credentials
+
+
+def test_login_after_a_worker_is_killed(client):
+    credentials = _register(client)
+    executor = hashing_pool._get_executor()
+    for process in list(executor._processes.values()):
+        os.kill(process.pid, signal.SIGKILL)
+        process.join()
+
+    response = client.post("/api/login/", json=credentials)
+    assert response.status_code == 200, response.text
+    assert hashing_pool._executor is not executor
+    assert client.post("/api/login/", json=credentials).status_code == 200
+
+
+class _BrokenExecutor:
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("a worker died")
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def test_login_is_503_when_the_new_pool_breaks_too(client, monkeypatch):
+    credentials = _register(client)
+    monkeypatch.setattr(hashing_pool, "_get_executor", _BrokenExecutor)
+
+    response = client.post("/api/login/", json=credentials)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,33 @@
+"""
+The in-process response cache under concurrent use.
+"""
+
+import asyncio
+import threading
+
+from app.services.response_cache import MemoryBackend
+
+
+def test_concurrent_sets_and_evictions_do_not_deadlock():
+    # Room for a handful of entries, so nearly every set evicts another one
+    backend = MemoryBackend(max_bytes=4000)
+
+    def writer(worker: int):
+        async def fill():
+            for i in range(3000):
+                await backend.set((worker, "tasks"), f"{worker}:{i}", b"x" * 500)
+                if i % 50 == 0:
+                    await backend.invalidate((worker, "tasks"))
+
+        asyncio.run(fill())
+
+    threads = [threading.Thread(target=writer, args=(worker,), daemon=True) for worker in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+    assert not any(thread.is_alive() for thread in threads), "deadlocked"
+
+    stats = backend.stats()
+    assert stats["bytes"] <= stats["max_bytes"]
+    assert stats["evictions"] > 0
@@ -0,0 +1,203 @@
+"""
+GET /sync paged with a small limit must leave the client with the server's
+state, whatever writes happen between the pages.
+"""
+
+import random
+
+from sqlalchemy import func, select, update
+
+from app.models.tombstone import Tombstone
+from app.services.sync import purge_tombstones
+from database import session_scope
+
+RESOURCES = ("tasks", "habits", "notes")
+
+BODIES = {
+    "tasks": {"title": "task"},
+    "habits": {"title": "habit"},
+    "notes": {"title": "note", "content": "some content"},
+}
+
+
+class Client:
+    """
+    What a mobile client keeps: its copy of each list and the sync token.
+    """
+
+    def __init__(self):
+        self.items = {name: {} for name in RESOURCES}
+        self.token = None
+
+    def sync_page(self, client, headers, limit: int) -> bool:
+        params = {"limit": limit}
+        if self.token is not None:
+            params["since"] = self.token
+        response = client.get("/sync", params=params, headers=headers)
+        assert response.status_code == 200, response.text
+        body = response.json()
+        if body["full_resync"]:
+            self.items = {name: {} for name in RESOURCES}
+        for name in RESOURCES:
+            changed_ids = {item["id"] for item in body[name]["changed"]}
+            assert len(body[name]["changed"]) + len(body[name]["deleted"]) <= limit
+            assert not changed_ids & set(body[name]["deleted"])
+            for item_id in body[name]["deleted"]:
+                self.items[name].pop(item_id, None)
+            for item in body[name]["changed"]:
+                self.items[name][item["id"]] = item
+        self.token = body["next_token"]
+        return body["has_more"]
+
+    def sync(self, client, headers, limit: int) -> None:
+        while self.sync_page(client, headers, limit):
+            pass
+
+
+def _create(client, headers, name: str, title: str) -> int:
+    response = client.post(f"/{name}/", json={**BODIES[name], "title": title}, headers=headers)
+    assert response.status_code == 201, response.text
+    return response.json()["id"]
+
+
+def _update(client, headers, name: str, item_id: int, title: str) -> None:
+    response = client.put(f"/{name}/{item_id}", json={**BODIES[name], "title": title}, headers=headers)
+    assert response.status_code == 200, response.text
+
+
+def _delete(client, headers, name: str, item_id: int) -> None:
+    response = client.delete(f"/{name}/{item_id}", headers=headers)
+    assert response.status_code == 204, response.text
+
+
+def _assert_in_sync(client, headers, state: Client) -> None:
+    for name in RESOURCES:
+        response = client.get(f"/{name}/", params={"limit": 200}, headers=headers)
+        assert response.status_code == 200, response.text
+        items = {item["id"]: item for item in response.json()["items"]}
+        assert set(state.items[name]) == set(items), name
+        if name == "notes":
+            # The list has summaries; compare the full notes
+            for note_id, note in state.items[name].items():
+                assert note == client.get(f"/notes/{note_id}", headers=headers).json(), note_id
+        else:
+            assert state.items[name] == items, name
+
+
+def test_paged_sync_through_interleaved_writes(client, headers):
+    rng = random.Random(7)
+    state = Client()
+    live = {name: [] for name in RESOURCES}
+
+    for step in range(120):
+        name = rng.choice(RESOURCES)
+        action = rng.random()
+        if not live[name] or action < 0.45:
+            live[name].append(_create(client, headers, name, f"{name} {step}"))
+        elif action < 0.75:
+            _update(client, headers, name, rng.choice(live[name]), f"{name} {step} updated")
+        else:
+            item_id = live[name].pop(rng.randrange(len(live[name])))
+            _delete(client, headers, name, item_id)
+        # Read a single page now and then, so pages start and end between writes
+        if rng.random() < 0.3:
+            state.sync_page(client, headers, limit=3)
+
+    state.sync(client, headers, limit=3)
+    _assert_in_sync(client, headers, state)
+
+    # Nothing new: the token stays put and the pages are empty
+    token = state.token
+    assert not state.sync_page(client, headers, limit=3)
+    assert state.token == token
+
+
+def test_deleted_and_recreated_in_one_page(client, headers):
+    state = Client()
+    kept = _create(client, headers, "tasks", "kept")
+    state.sync(client, headers, limit=2)
+
+    # SQLite hands the highest rowid out again once it is deleted, so the
+    # new task gets the id of the deleted one
+    deleted = _create(client, headers, "tasks", "deleted")
+    _delete(client, headers, "tasks", deleted)
+    recreated = _create(client, headers, "tasks", "recreated")
+    assert recreated == deleted
+    # Created and deleted again before the client saw it
+    gone = _create(client, headers, "tasks", "gone")
+    _delete(client, headers, "tasks", gone)
+    _update(client, headers, "tasks", kept, "kept updated")
+
+    # Left to read: the tombstone and the row of the re-created id, the
+    # tombstone of `gone` (its row is gone) and the updated `kept`. The first
+    # page of two holds both entries of the re-created id.
+    assert state.sync_page(client, headers, limit=2)
+    assert state.items["tasks"][recreated]["title"] == "recreated"
+    assert state.items["tasks"][kept]["title"] == "kept"
+    state.sync(client, headers, limit=2)
+    assert {item_id: item["title"] for item_id, item in state.items["tasks"].items()} == {
+        kept: "kept updated",
+        recreated: "recreated",
+    }
+    _assert_in_sync(client, headers, state)
+
+
+def _purge_all(run) -> int:
+    async def purge():
+        async with session_scope() as db:
+            # A day ahead: every tombstone so far is old enough
+            purged = await purge_tombstones(db, -1)
+            await db.commit()
+            return purged
+
+    return run(purge)
+
+
+def test_token_older_than_purged_tombstones_resyncs(client, headers, run):
+    stale, current = Client(), Client()
+    task_ids = [_create(client, headers, "tasks", f"task {i}") for i in range(3)]
+    note_id = _create(client, headers, "notes", "note")
+    stale.sync(client, headers, limit=2)
+
+    _delete(client, headers, "tasks", task_ids[0])
+    current.sync(client, headers, limit=2)
+    assert _purge_all(run) >= 1
+
+    # Read past the purged tombstone: carries on as before
+    _update(client, headers, "notes", note_id, "note updated")
+    assert not current.sync_page(client, headers, limit=10)
+    assert set(current.items["tasks"]) == set(task_ids[1:])
+
+    # Never saw the delete, which is gone now: starts over
+    response = client.get("/sync", params={"since": stale.token, "limit": 2}, headers=headers)
+    assert response.json()["full_resync"]
+    stale.sync(client, headers, limit=2)
+    _assert_in_sync(client, headers, stale)
+    _assert_in_sync(client, headers, current)
+
+    # The new token is past the purge
+    _delete(client, headers, "tasks", task_ids[1])
+    response = client.get("/sync", params={"since": stale.token}, headers=headers)
+    assert not response.json()["full_resync"]
+    assert response.json()["tasks"]["deleted"] == [task_ids[1]]
+
+
+def test_purge_keeps_recent_tombstones(client, headers, run):
+    user_id = client.post("/tasks/", json={"title": "kept"}, headers=headers).json()["user_id"]
+    old_id, recent_id = (_create(client, headers, "tasks", title) for title in ("old", "recent"))
+    _delete(client, headers, "tasks", old_id)
+    _delete(client, headers, "tasks", recent_id)
+
+    async def purge():
+        async with session_scope() as db:
+            # Deleted two days ago (UTC, like the column default)
+            await db.execute(
+                update(Tombstone)
+                .where(Tombstone.user_id == user_id, Tombstone.item_id == old_id)
+                .values(deleted_at=func.datetime("now", "-2 days"))
+            )
+            await purge_tombstones(db, 1)
+            await db.commit()
+            return set(await db.scalars(select(Tombstone.item_id).where(Tombstone.user_id == user_id)))
+
+    assert run(purge) == {recent_id}